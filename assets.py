@@ -0,0 +1,146 @@
+# Images decoded once, with every scaled variant cached on disk as raw pixels keyed by source hash and size
+import os
+import time
+import hashlib
+
+import pygame
+
+ASSET_CACHE_DIR = '.asset_cache'  # Relative to the working directory, like the sprite paths
+CACHE_VERSION = 1  # Bump when the way variants are produced changes
+PLACEHOLDER_COLOR = (255, 255, 255, 60)  # Faint square standing in for a sprite that is still loading
+PLACEHOLDER_BACKGROUND = (58, 84, 52)  # Opaque stand-in for backgrounds
+
+tobytes = getattr(pygame.image, 'tobytes', None) or pygame.image.tostring  # tobytes is pygame 2.1.3+
+
+
+class AssetManager:
+    def __init__(self, cache_dir=ASSET_CACHE_DIR, use_cache=True):
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.surfaces = {}  # (path, size, alpha) -> Surface
+        self.hashes = {}  # path -> source file hash
+        self.decoded = {}  # path -> decoded Surface, dropped by release_sources()
+        self.sources = {}  # path -> file actually read, e.g. a downloaded copy; defaults to path itself
+        self.deferred = {}  # (path, size, alpha) -> placeholder Surface (or None until first asked for)
+        self.watchers = {}  # path -> callbacks run when a deferred variant of it becomes real
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.decodes = 0
+        self.load_seconds = 0.0
+
+    def image(self, path, size=None, alpha=True):
+        # Surface for path scaled to size; the same Surface is shared by every caller, so don't draw on it
+        key = (path, tuple(size) if size else None, alpha)
+        surface = self.surfaces.get(key)
+        if surface is None and key in self.deferred:
+            surface = self.deferred[key]
+            if surface is None:
+                surface = self.deferred[key] = self._placeholder(key[1], alpha)
+            return surface
+        if surface is None:
+            start = time.perf_counter()
+            surface = self.surfaces[key] = self._load(*key)
+            self.load_seconds += time.perf_counter() - start
+        return surface
+
+    def defer(self, path, size=None, alpha=True):
+        # Hand out a placeholder for this variant until resolve() loads it (see preload.Preloader)
+        key = (path, tuple(size) if size else None, alpha)
+        if key not in self.surfaces:
+            self.deferred.setdefault(key, None)
+
+    def resolve(self, path, size=None, alpha=True):
+        # Load a deferred variant now and tell anything holding on to its placeholder
+        key = (path, tuple(size) if size else None, alpha)
+        placeholder = key in self.deferred
+        self.deferred.pop(key, None)
+        surface = self.image(path, size, alpha)
+        if placeholder:
+            for callback in self.watchers.get(path, ()):
+                callback()
+        return surface
+
+    def watch(self, path, callback):
+        self.watchers.setdefault(path, []).append(callback)
+
+    def _placeholder(self, size, alpha):
+        if alpha:
+            surface = pygame.Surface(size or (1, 1), pygame.SRCALPHA)
+            surface.fill(PLACEHOLDER_COLOR)
+        else:
+            surface = pygame.Surface(size or (1, 1))
+            surface.fill(PLACEHOLDER_BACKGROUND)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+        return surface
+
+    def release_sources(self):
+        # Decoded originals are only needed to build variants that aren't cached yet; call once
+        # every variant has been asked for
+        self.decoded.clear()
+
+    def _source_hash(self, path):
+        digest = self.hashes.get(path)
+        if digest is None:
+            with open(self.sources.get(path, path), 'rb') as f:
+                digest = self.hashes[path] = hashlib.sha1(f.read()).hexdigest()[:16]
+        return digest
+
+    def _cache_path(self, path, size, alpha):
+        w, h = size
+        return os.path.join(self.cache_dir, f"v{CACHE_VERSION}-{self._source_hash(path)}-{w}x{h}-{'RGBA' if alpha else 'RGB'}.raw")
+
+    def _decode(self, path):
+        surface = self.decoded.get(path)
+        if surface is None:
+            surface = self.decoded[path] = pygame.image.load(self.sources.get(path, path))
+            self.decodes += 1
+        return surface
+
+    def _load(self, path, size, alpha):
+        fmt = 'RGBA' if alpha else 'RGB'
+        if size is None:
+            size = self._decode(path).get_size()
+        cache_path = self._cache_path(path, size, alpha) if self.use_cache else None
+        data = None
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+            if len(data) == size[0] * size[1] * len(fmt):
+                self.cache_hits += 1
+            else:
+                data = None  # Partial write from an interrupted run; rebuild it
+        if data is None:
+            self.cache_misses += 1
+            source = self._decode(path)
+            scaled = source if source.get_size() == tuple(size) else pygame.transform.scale(source, size)
+            data = tobytes(scaled, fmt)
+            if cache_path:
+                self._store(cache_path, data)
+        surface = pygame.image.frombuffer(data, size, fmt)  # Shares data, no copy
+        # Blits are much faster in the display's pixel format, so convert once a display exists
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        return surface
+
+    def _store(self, cache_path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = cache_path + '.tmp'
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, cache_path)
+        except OSError:
+            pass  # Read-only install or browser filesystem; the game still works uncached
+
+    def stats(self):
+        return {
+            'surfaces': len(self.surfaces),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'decodes': self.decodes,
+            'load_ms': self.load_seconds * 1000,
+        }
+
+
+assets = AssetManager()  # Shared by main, bullets and enemy
@@ -0,0 +1,170 @@
+# Co-op server load test over localhost UDP with simulated latency, jitter and loss. From the repo root:
+#   python -m benchmarks.netload --clients 8 16 32 --latency 40 --jitter 10 --loss 0.02
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import numpy as np
+
+from client import connect
+from server import CoopSimulation, serve, TICK_RATE
+from world import WAKE_CHUNKS
+
+WORLD = (4800, 3600)  # Several camera views across, so interest management has something to cut
+ENEMIES = 150
+WARMUP = 1.0  # Seconds of play before measuring, once everyone has joined
+SETTLE = 0.5  # Seconds bots keep playing after the measured window, so the server never runs without them
+POLL = 0.05  # Seconds between the server process's checks for commands
+
+
+async def _serve(conn, seed, tick_rate, world, enemies, network, spread):
+    # Server process: sends its address, ticks until the parent says stop, then sends stats for the ticks
+    # after the parent's 'mark'
+    sim = CoopSimulation(seed=seed, world_width=world[0], world_height=world[1], enemy_amount=enemies,
+                         wake_chunks=WAKE_CHUNKS, tick_rate=tick_rate)
+    server, transport = await serve(sim, port=0, seed=seed, spread=spread, **network)
+    conn.send(transport.get_extra_info('sockname'))
+    ticking = asyncio.ensure_future(server.run())
+    measured_from = 0
+    full_from = 0
+    while True:
+        await asyncio.sleep(POLL)
+        if not conn.poll():
+            continue
+        command = conn.recv()
+        if command == 'mark':
+            measured_from = len(server.tick_ms)
+            full_from = server.full_snapshots
+        elif command == 'stop':
+            break
+    server.stop()
+    await ticking
+    transport.close()
+    window = slice(measured_from, None)
+    tick_ms = np.array(server.tick_ms[window])
+    encode_ms = np.array(server.encode_ms[window])
+    tick_bytes = np.array(server.tick_bytes[window], dtype=np.float64)
+    conn.send({
+        'ticks': len(tick_ms),
+        'bytes_per_tick': float(tick_bytes.mean()),
+        'sim_ms': float(tick_ms.mean()),
+        'encode_ms': float(encode_ms.mean()),
+        'server_tick_ms': float((tick_ms + encode_ms).mean()),
+        'server_tick_p95_ms': float(np.percentile(tick_ms + encode_ms, 95)),
+        'full_snapshots': server.full_snapshots - full_from,
+        'sim_lag_ms': server.timestep.stats()['lag_ms'],
+        'boars': len(sim.boars),
+    })
+
+
+async def _bots(conn, addr, first, count, seed, network, duration):
+    # Client process: joins count bots, reports in, plays for duration seconds, then sends their stats
+    bots = [await connect(addr, seed=seed * 1000 + first + i, **network) for i in range(count)]
+    conn.send('joined')
+    await asyncio.gather(*[bot.run(duration) for bot, _ in bots])
+    for _, transport in bots:
+        transport.close()
+    conn.send([bot.stats() for bot, _ in bots])
+
+
+def _run(coroutine, *args):
+    asyncio.run(coroutine(*args))
+
+
+def run_load(clients, duration, seed, tick_rate, world, enemies, network, spread, client_processes):
+    # The server and the bots run in separate processes, so decoding and prediction on the bot side don't
+    # count toward server tick times (on a single core they still compete for it)
+    context = multiprocessing.get_context('spawn')
+    server_conn, child = context.Pipe()
+    server = context.Process(target=_run, args=(_serve, child, seed, tick_rate, world, enemies, network, spread),
+                             daemon=True)
+    server.start()
+    addr = server_conn.recv()
+    workers = []
+    for chunk in np.array_split(np.arange(clients), min(client_processes, clients)):
+        conn, child = context.Pipe()
+        process = context.Process(target=_run, args=(_bots, child, addr, int(chunk[0]), len(chunk), seed, network,
+                                                      WARMUP + duration + SETTLE), daemon=True)
+        process.start()
+        workers.append((conn, process))
+    for conn, _ in workers:
+        conn.recv()  # Joined
+    time.sleep(WARMUP)
+    server_conn.send('mark')
+    time.sleep(duration)
+    server_conn.send('stop')
+    result = server_conn.recv()
+    bot_stats = [stats for conn, _ in workers for stats in conn.recv()]
+    server.join()
+    for _, process in workers:
+        process.join()
+
+    reconciled = sum(s['reconciled'] for s in bot_stats)
+    corrections = sum(s['corrections'] for s in bot_stats)
+    rtts = [s['rtt_ms'] for s in bot_stats if s['rtt_ms'] is not None]
+    return {
+        'clients': clients,
+        'tick_rate': tick_rate,
+        **result,
+        'bytes_per_client_tick': result['bytes_per_tick'] / clients,
+        'kbit_per_client_s': result['bytes_per_tick'] / clients * tick_rate * 8 / 1000,
+        'reconciled': reconciled,
+        'corrections': corrections,
+        'correction_rate': corrections / reconciled if reconciled else 0.0,
+        'mean_correction_px': float(np.mean([s['mean_correction_px'] for s in bot_stats if s['corrections']]))
+        if corrections else 0.0,
+        'undecodable': sum(s['undecodable'] for s in bot_stats),
+        'rtt_ms': float(np.median(rtts)) if rtts else None,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Localhost load test for the co-op server")
+    parser.add_argument('--clients', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--duration', type=float, default=10.0, help="Measured seconds per run")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--tick-rate', type=int, default=TICK_RATE)
+    parser.add_argument('--world', type=int, nargs=2, default=WORLD, metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--enemies', type=int, default=ENEMIES)
+    parser.add_argument('--latency', type=float, default=40.0, help="One-way ms, both directions")
+    parser.add_argument('--jitter', type=float, default=10.0, help="ms")
+    parser.add_argument('--loss', type=float, default=0.02, help="Fraction of packets dropped, both directions")
+    parser.add_argument('--together', action='store_true', help="Spawn everyone at the usual point instead of spread out")
+    parser.add_argument('--client-processes', type=int, default=max((os.cpu_count() or 1) - 1, 1),
+                        help="Processes the bots are split across")
+    parser.add_argument('--output', help="Write JSON results here ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for clients in args.clients:
+        network = {'latency': args.latency / 1000, 'jitter': args.jitter / 1000, 'loss': args.loss}
+        result = run_load(clients, args.duration, args.seed, args.tick_rate, args.world, args.enemies, network,
+                          not args.together, args.client_processes)
+        results.append(result)
+        print(f"{clients:3d} clients: {result['bytes_per_tick']:8.0f} B/tick ({result['bytes_per_client_tick']:6.0f} "
+              f"per client, {result['kbit_per_client_s']:5.0f} kbit/s), server tick {result['server_tick_ms']:6.2f} ms "
+              f"(sim {result['sim_ms']:.2f}, encode {result['encode_ms']:.2f}, p95 {result['server_tick_p95_ms']:.2f}), "
+              f"corrections {result['correction_rate']:.1%}", file=sys.stderr)
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(os.path.join(CWD, args.output), 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,222 @@
+# Headless, seeded benchmarks. From the repo root:
+#   python -m benchmarks.run --output bench.json  (--baseline bench.json --fail-on-regression to compare)
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Headless on a plain Linux box
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Sprite paths are relative to the repo root
+
+import numpy as np
+import pygame
+
+import main
+from bullets import Projectile
+from enemy import Enemy, BabyBoar, EnemyBullet, ChildBullet
+from render import Renderer
+from sprites import sprite_variants
+from text import text_cache
+from profiler import SIM_PHASES
+from benchmarks.scenarios import SCENARIOS
+
+# Groups reported on top of the individually timed Simulation phases
+GROUPS = {
+    'enemy_move': ('move_enemies',),
+    'player_fire': ('handle_clicks', 'fire'),
+    'collisions': ('resolve_projectiles', 'index_entities', 'pickup_drops', 'resolve_enemy_bullets', 'resolve_child_bullets'),
+}
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.samples = {}
+        self.current = {}
+
+    def wrap(self, name, fn):
+        def timed(*args):
+            start = time.perf_counter()
+            result = fn(*args)
+            self.current[name] = self.current.get(name, 0.0) + time.perf_counter() - start
+            return result
+        return timed
+
+    def time(self, name, fn, *args):
+        start = time.perf_counter()
+        fn(*args)
+        self.current[name] = self.current.get(name, 0.0) + time.perf_counter() - start
+
+    def end_tick(self):
+        for name, members in GROUPS.items():
+            if any(m in self.current for m in members):
+                self.current[name] = sum(self.current.get(m, 0.0) for m in members)
+        for name, value in self.current.items():
+            self.samples.setdefault(name, []).append(value)
+        self.current = {}
+
+    def summary(self):
+        result = {}
+        for name, values in self.samples.items():
+            ms = np.array(values) * 1000
+            result[name] = {
+                'calls': len(ms),
+                'total_ms': float(ms.sum()),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+            }
+        return result
+
+
+def draw_families(timer, renderer, sim, camera, aim):
+    # Each draw() family rendered through the culling Renderer to an offscreen Surface, timed on its own
+    player = sim.player
+    surface = renderer.screen
+    timer.time('draw_background', renderer.begin, camera)
+    timer.time('draw_player', lambda: (renderer.draw(player, camera), player.draw_shield(aim, camera, surface)))
+    timer.time('draw_enemies', lambda: (renderer.draw_store(sim.boars, camera, Enemy, sim.boars.adults()), renderer.flush()))
+    timer.time('draw_babies', lambda: (renderer.draw_store(sim.boars, camera, BabyBoar, sim.boars.babies()), renderer.flush()))
+    # Batched families are queued then flushed on their own, so each flush is one blits call
+    timer.time('draw_projectiles', lambda: (renderer.draw_store(sim.projectiles, camera, Projectile), renderer.flush()))
+    timer.time('draw_enemy_bullets', lambda: (renderer.draw_store(sim.enemy_bullets, camera, EnemyBullet), renderer.flush()))
+    timer.time('draw_child_bullets', lambda: (renderer.draw_store(sim.child_bullets, camera, ChildBullet), renderer.flush()))
+    timer.time('draw_drops', lambda: (renderer.draw_sprites('drops', sim.drops, camera), renderer.flush()))
+    timer.time('draw_damage_texts', lambda: (renderer.draw_sprites('damage_texts', sim.damage_texts, camera), renderer.flush()))
+    timer.time('draw_hud', main.draw_hud, surface, sim)
+
+
+def run_scenario(name, seed, ticks=None, draw=True, **params):
+    if ticks is not None:
+        params['ticks'] = ticks
+    scenario = SCENARIOS[name](seed, **params)
+    sim = scenario.sim
+    timer = PhaseTimer()
+    for phase in SIM_PHASES:
+        setattr(sim, phase, timer.wrap(phase, getattr(sim, phase)))
+    text_cache.reset_stats()  # Fresh counters per scenario
+    camera = main.Camera(sim.player)
+    renderer = Renderer(pygame.Surface((main.WIDTH, main.HEIGHT)).convert(), main.world_background())
+    drawn = []
+    culled = []
+    blit_calls = []
+    peaks = {'projectiles': 0, 'enemy_bullets': 0, 'child_bullets': 0, 'enemies': 0, 'boars': 0}
+    start = time.perf_counter()
+    for tick in range(scenario.ticks):
+        scenario.before_tick(tick)
+        inputs = scenario.inputs(tick)
+        timer.time('step', sim.step, inputs)
+        camera.update(sim.player)
+        if draw:
+            draw_families(timer, renderer, sim, camera, inputs.aim)
+            drawn.append(renderer.drawn)
+            culled.append(renderer.culled)
+            blit_calls.append(renderer.batch.calls)
+        timer.end_tick()
+        peaks['projectiles'] = max(peaks['projectiles'], len(sim.projectiles))
+        peaks['enemy_bullets'] = max(peaks['enemy_bullets'], len(sim.enemy_bullets))
+        peaks['child_bullets'] = max(peaks['child_bullets'], len(sim.child_bullets))
+        peaks['enemies'] = max(peaks['enemies'], int(np.count_nonzero(sim.boars.adults())))
+        peaks['boars'] = max(peaks['boars'], len(sim.boars))
+        if sim.over:
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        'seed': seed,
+        'ticks': tick + 1,
+        'wall_s': elapsed,
+        'ticks_per_s': (tick + 1) / elapsed,
+        'peak_counts': peaks,
+        'phases': timer.summary(),
+        'render': {
+            'mean_drawn': float(np.mean(drawn)) if drawn else 0.0,
+            'mean_culled': float(np.mean(culled)) if culled else 0.0,
+            'mean_blit_calls': float(np.mean(blit_calls)) if blit_calls else 0.0,
+        },
+        'text_cache': text_cache.stats(),
+        'rotation_cache_bytes': {
+            'child_bullet': ChildBullet.load_sprite().memory_bytes(),
+            'shield': sim.player.load_shield_sprites().memory_bytes(),
+        },
+        'sprite_variant_bytes': sprite_variants.memory_bytes(),
+        'bullet_pools': sim.pool_stats(),
+    }
+
+
+def compare(results, baseline, threshold):
+    # Print mean-time ratios against a stored baseline; returns the regressed (scenario, phase) pairs
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            print(f"{name}: not in baseline")
+            continue
+        print(f"{name}:")
+        for phase, stats in sorted(result['phases'].items()):
+            if phase not in base['phases']:
+                continue
+            old = base['phases'][phase]['mean_ms']
+            new = stats['mean_ms']
+            ratio = new / old if old else float('inf')
+            flag = ''
+            if ratio > 1 + threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, phase))
+            elif ratio < 1 - threshold:
+                flag = '  faster'
+            print(f"  {phase:24s} {old:9.4f} ms -> {new:9.4f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Seeded headless benchmarks for the simulation and renderer")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="Run only these (repeatable)")
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--ticks', type=int, help="Override each scenario's tick count")
+    parser.add_argument('--no-draw', action='store_true', help="Skip the offscreen draw phases")
+    parser.add_argument('--output', help="Write JSON results here ('-' for stdout)")
+    parser.add_argument('--baseline', help="Compare against a previous --output file")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Relative slowdown that counts as a regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {},
+    }
+    for name in args.scenario or sorted(SCENARIOS):
+        result = run_scenario(name, args.seed, args.ticks, draw=not args.no_draw)
+        results['scenarios'][name] = result
+        print(f"{name}: {result['ticks']} ticks, {result['ticks_per_s']:.0f} ticks/s, step mean "
+              f"{result['phases']['step']['mean_ms']:.3f} ms", file=sys.stderr)
+
+    if args.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(os.path.join(CWD, args.output), 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(os.path.join(CWD, args.baseline)) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+import patterns
+from boars import CHARGE
+from enemy import Enemy, EnemyBullet
+from simulation import Simulation, FrameInput
+from waves import add_family
+
+TANK_HEALTH = 10 ** 6  # Enough that nothing dies mid-benchmark
+INVULNERABLE = 10 ** 6
+# Two walls across the default world with a gap in the middle, and a pillar above it (x, y, width, height)
+WALLS = ((150, 600, 550, 40), (900, 600, 550, 40), (780, 250, 40, 250))
+
+
+class Scenario:
+    # A seeded Simulation plus a scripted player; before_tick can top up load each tick
+    def __init__(self, name, sim, ticks, fire=True, shield=False, strafe=True):
+        self.name = name
+        self.sim = sim
+        self.ticks = ticks
+        self.fire = fire
+        self.shield = shield
+        self.strafe = strafe
+        sim.player.health = INVULNERABLE
+
+    def before_tick(self, tick):
+        pass
+
+    def aim(self):
+        player = self.sim.player
+        cx, cy = player.get_center()
+        boars = self.sim.boars
+        adults = np.flatnonzero(boars.adults())
+        if not len(adults):
+            return (cx, cy - 100)
+        target = adults[np.argmin(np.hypot(boars.x[adults] - cx, boars.y[adults] - cy))]
+        return (boars.x[target] + boars.size[target]/2, boars.y[target] + boars.size[target]/2)
+
+    def inputs(self, tick):
+        phase = (tick // 45) % 4  # Walk a small square so the camera keeps moving
+        return FrameInput(
+            up=self.strafe and phase == 0, right=self.strafe and phase == 1,
+            down=self.strafe and phase == 2, left=self.strafe and phase == 3,
+            fire=self.fire, shield=self.shield, aim=self.aim())
+
+
+def spawn_mother(sim, x, y, babies=3):
+    return add_family(sim.boars, Enemy(x, y, sim.rng, sim.time), babies)
+
+
+def spawn_tank(sim, x, y):
+    enemy = Enemy(x, y, sim.rng, sim.time)
+    enemy.health = TANK_HEALTH
+    return sim.boars.add(enemy)
+
+
+def mothers(seed, ticks=600, count=20):
+    # N mothers with 3 babies each, player plinking at the nearest one
+    sim = Simulation(seed=seed, enemy_amount=0)
+    for _ in range(count):
+        spawn_mother(sim, sim.rng.randint(50, sim.world_width - 130), sim.rng.randint(50, sim.world_height - 130))
+    return Scenario('mothers', sim, ticks)
+
+
+def bullet_hell(seed, ticks=600, count=20, pattern='RING'):
+    # The mothers scenario with every mother firing a dense pattern (patterns.RING: 24 bullets a volley)
+    scenario = mothers(seed, ticks, count)
+    scenario.name = 'bullet_hell'
+    scenario.sim.boars.adult_pattern = getattr(patterns, pattern)
+    return scenario
+
+
+def weapon_spam(seed, ticks=600, level=12):
+    # Weapon level spam (orange volleys every 5 ticks) into a row of tanky boars
+    sim = Simulation(seed=seed, enemy_amount=0)
+    sim.player.weapon_level = level
+    for i in range(6):
+        spawn_tank(sim, 200 + i * 200, 150)
+    return Scenario('weapon_spam', sim, ticks, strafe=False)
+
+
+class ShieldWall(Scenario):
+    # Keeps `bullets` enemy bullets converging on the player's raised shield
+    def __init__(self, sim, ticks, bullets):
+        super().__init__('shield_wall', sim, ticks, fire=False, shield=True, strafe=False)
+        self.bullets = bullets
+        self.anchor = spawn_tank(sim, 40, 40)  # Keeps the game from being won
+
+    def aim(self):
+        cx, cy = self.sim.player.get_center()
+        return (cx, cy - 100)
+
+    def before_tick(self, tick):
+        sim = self.sim
+        cx, cy = sim.player.get_center()
+        while len(sim.enemy_bullets) < self.bullets:
+            angle = -math.pi / 2 + sim.rng.uniform(-0.6, 0.6)
+            dist = sim.rng.uniform(120, 400)
+            x = cx + math.cos(angle) * dist
+            y = cy + math.sin(angle) * dist
+            sim.enemy_bullets.spawn(EnemyBullet, x, y, math.atan2(cy - y, cx - x), origin_x=self.anchor.x, origin_y=self.anchor.y)
+
+
+def shield_wall(seed, ticks=600, bullets=500):
+    sim = Simulation(seed=seed, enemy_amount=0)
+    return ShieldWall(sim, ticks, bullets)
+
+
+def stampede(seed, ticks=600, count=100, walls=True):
+    # Enraged tanks charging the player from all over the world, around WALLS through the flow field
+    sim = Simulation(seed=seed, enemy_amount=0, obstacles=WALLS if walls else ())
+    flow = sim.flow
+    for _ in range(count):
+        while True:
+            x = sim.rng.randint(0, sim.world_width - 80)
+            y = sim.rng.randint(0, sim.world_height - 80)
+            if not flow.blocked[flow.cells_of(x + 40, y + 40)]:
+                break
+        tank = spawn_tank(sim, x, y)
+        tank.state = CHARGE
+        tank.timer = sim.rng.uniform(-1, 0)  # Charges and rests out of step
+        tank.damage_boost = True
+    return Scenario('stampede', sim, ticks, fire=False)
+
+
+def storm(seed, ticks=1200, count=60, world=(8000, 8000)):
+    # Mothers firing rings in a world too big for bullets to leave soon, so the enemy bullet budget's cap
+    # and ttl (lifecycle.BUDGETS) are what keeps the store bounded; pool_stats shows the evictions
+    sim = Simulation(seed=seed, world_width=world[0], world_height=world[1], enemy_amount=0)
+    cx, cy = sim.player.get_center()
+    for _ in range(count):
+        spawn_mother(sim, cx + sim.rng.randint(-700, 700), cy + sim.rng.randint(-700, -200))
+    sim.boars.adult_pattern = patterns.RING
+    return Scenario('storm', sim, ticks)
+
+
+def horde(seed, ticks=600, families=800, waves=4, world=(4096, 4096)):
+    # Thousands of boars (about 2.8 per family) streamed in over the first waves, all awake, plinked at
+    sim = Simulation(seed=seed, world_width=world[0], world_height=world[1],
+                     waves=[(i * 60, families // waves) for i in range(waves)])
+    return Scenario('horde', sim, ticks)
+
+
+SCENARIOS = {
+    'mothers': mothers,
+    'bullet_hell': bullet_hell,
+    'weapon_spam': weapon_spam,
+    'shield_wall': shield_wall,
+    'stampede': stampede,
+    'storm': storm,
+    'horde': horde,
+}
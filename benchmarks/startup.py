@@ -0,0 +1,61 @@
+# Time-to-interactive of blocking vs progressive asset loading over a throttled local server:
+#   python -m benchmarks.startup --rate 200 --latency 150
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pygame
+
+import main
+from assets import AssetManager
+from preload import Preloader
+from benchmarks.throttled_server import serve
+
+
+def measure(url, progressive, use_cache):
+    # A fresh manager and download dir per run, so nothing carries over between modes
+    with tempfile.TemporaryDirectory() as temp:
+        manager = AssetManager(cache_dir=os.path.join(temp, 'cache'), use_cache=use_cache)
+        items = main.PRELOAD if progressive else [item[:4] + (True,) for item in main.PRELOAD]
+        preloader = Preloader(manager, items, url, download_dir=os.path.join(temp, 'downloads'))
+        asyncio.run(preloader.load_all())
+        return {
+            'mode': 'progressive' if progressive else 'blocking',
+            'time_to_interactive_ms': preloader.interactive_at * 1000,
+            'all_loaded_ms': preloader.finished_at * 1000,
+        }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Blocking vs progressive asset loading on a slow connection")
+    parser.add_argument('--rate', type=float, default=256, help="Server KiB/s per response")
+    parser.add_argument('--latency', type=float, default=100, help="Server ms per response")
+    parser.add_argument('--output', help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    pygame.display.set_mode((main.WIDTH, main.HEIGHT))
+    server = serve(ROOT, 0, args.rate, args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    results = [measure(url, progressive, use_cache=False) for progressive in (False, True)]
+    server.shutdown()
+    for result in results:
+        print(f"{result['mode']:12s} interactive {result['time_to_interactive_ms']:8.0f} ms   "
+              f"all assets {result['all_loaded_ms']:8.0f} ms", file=sys.stderr)
+    if args.output:
+        with open(os.path.join(CWD, args.output), 'w') as f:
+            json.dump({'rate_kib_s': args.rate, 'latency_ms': args.latency, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,60 @@
+# Static file server with a bandwidth cap and per-request latency, for main.py --asset-url:
+#   python -m benchmarks.throttled_server --rate 200 --latency 150
+import os
+import sys
+import time
+import argparse
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CHUNKS_PER_SECOND = 20  # Granularity of the bandwidth cap
+
+
+class ThrottledHandler(SimpleHTTPRequestHandler):
+    rate = 256 * 1024  # Bytes per second per response
+    latency = 0.1  # Seconds before the first byte
+
+    def copyfile(self, source, outputfile):
+        time.sleep(self.latency)
+        chunk = max(1024, self.rate // CHUNKS_PER_SECOND)
+        while True:
+            data = source.read(chunk)
+            if not data:
+                break
+            outputfile.write(data)
+            time.sleep(len(data) / self.rate)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory=ROOT, port=0, rate_kb=256, latency_ms=100):
+    # Starts the server on a daemon thread; returns it (server.server_address has the real port)
+    handler = type('Handler', (ThrottledHandler,), {'rate': int(rate_kb * 1024), 'latency': latency_ms / 1000})
+    server = ThreadingHTTPServer(('127.0.0.1', port), functools.partial(handler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the repo with throttled bandwidth and latency")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=256, help="KiB/s per response")
+    parser.add_argument('--latency', type=float, default=100, help="ms before each response body")
+    parser.add_argument('--directory', default=ROOT)
+    args = parser.parse_args(argv)
+    server = serve(args.directory, args.port, args.rate, args.latency)
+    print(f"serving {args.directory} at http://127.0.0.1:{server.server_address[1]} "
+          f"({args.rate:g} KiB/s, {args.latency:g} ms latency)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
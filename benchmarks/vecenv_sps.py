@@ -0,0 +1,74 @@
+# Steps-per-second of the batched training environment as worker processes are added. From the repo root:
+#   python -m benchmarks.vecenv_sps --envs 64 --steps 500
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from vecenv import VecEnv
+
+
+def measure(num_envs, workers, steps, seed):
+    rng = np.random.default_rng(seed)
+    with VecEnv(num_envs, seed=seed, workers=workers) as envs:
+        envs.reset()
+        envs.step(envs.sample_actions(rng))  # Let every worker finish starting up
+        episodes = 0
+        start = time.perf_counter()
+        for _ in range(steps):
+            _, _, terminated, truncated, _ = envs.step(envs.sample_actions(rng))
+            episodes += int(np.count_nonzero(terminated | truncated))
+        elapsed = time.perf_counter() - start
+    return {
+        'workers': workers,
+        'envs': num_envs,
+        'steps': steps,
+        'wall_s': elapsed,
+        'env_steps_per_s': num_envs * steps / elapsed,
+        'batch_steps_per_s': steps / elapsed,
+        'episodes_finished': episodes,
+    }
+
+
+def worker_counts(limit):
+    counts = [0, 1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Env-steps per second of VecEnv across worker counts")
+    parser.add_argument('--envs', type=int, default=64)
+    parser.add_argument('--steps', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--workers', type=int, action='append', help="Worker counts to try (repeatable; 0 is in-process)")
+    parser.add_argument('--output', help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    base = None
+    for workers in args.workers or worker_counts(os.cpu_count() or 1):
+        result = measure(args.envs, workers, args.steps, args.seed)
+        if base is None:
+            base = result['env_steps_per_s']
+        result['speedup'] = result['env_steps_per_s'] / base
+        results.append(result)
+        print(f"workers {workers:3d}: {result['env_steps_per_s']:9.0f} env-steps/s  x{result['speedup']:5.2f}", file=sys.stderr)
+    if args.output:
+        with open(os.path.join(CWD, args.output), 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,493 @@
+# Every boar in one structure-of-arrays store, updated per AI state with numpy; Enemy and BabyBoar
+# (enemy.py) are views onto a slot
+import math
+import numpy as np
+
+import patterns
+from bullets import Column
+from spatial import segments_hit_boxes
+
+# AI states in the state column
+WANDER = 0  # Random walk, sidestepping nearby projectiles
+CHARGE = 1  # Enraged mother running at the player
+REST = 2  # Enraged mother walking randomly between charges
+ORBIT = 3  # Baby circling its mother
+FLEE = 4  # A mother's last baby, running from the player
+
+NO_PARENT = -1
+
+# Speeds are pixels and timers ticks at 60 Hz; BoarStore.frame_scale converts them to the sim's tick rate
+BASE_SPEED = 1.5
+DODGE_SPEED = 2.5
+DODGE_RADIUS = 100  # Projectiles closer than this to a wandering boar's center make it sidestep
+DODGE_COOLDOWN = 30  # Ticks
+WALK_TICKS = (60, 120)  # A new random heading every this many ticks (inclusive)
+CHARGE_SPEED = 8  # Double bullet speed
+CHARGE_TIME = 1  # Seconds; a charge also ends within CHARGE_STOP of the player
+CHARGE_STOP = 10
+REST_TIME = 2  # Seconds of random walking between charges
+ORBIT_SPEED = 0.02  # Radians per tick
+FLEE_SPEED = 3
+MOTHER_HEALTH = 10
+ENRAGED_HEALTH = 30
+SHOT_DELAY = 1  # Seconds between volleys, for mothers and babies alike
+ENRAGED_SHOT_DELAY = 0.2
+BOOSTED_DAMAGE = 3  # Enraged mothers' bullets
+
+# Component columns and their types, with the value a view gets when it doesn't set one
+COLUMNS = {
+    'x': (np.float64, 0.0),
+    'y': (np.float64, 0.0),
+    'size': (np.int32, 0),
+    'health': (np.int64, 1),
+    'state': (np.int8, WANDER),
+    'parent': (np.int32, NO_PARENT),
+    'last_shot': (np.float64, 0.0),  # Simulation clock, in seconds
+    'volleys': (np.int32, 0),  # Volleys fired so far, to turn spiral patterns
+    'timer': (np.float64, 0.0),  # When the current charge or rest started
+    'random_walk_timer': (np.float64, 0),
+    'random_angle': (np.float64, 0.0),
+    'dodge_cooldown': (np.float64, 0),
+    'angle': (np.float64, 0.0),  # Babies: position on the orbit
+    'radius': (np.float64, 0.0),  # Babies: orbit radius
+    'initial_babies': (np.int16, 0),
+    'babies_left': (np.int16, 0),
+    'is_mother': (np.bool_, False),
+    'damage_boost': (np.bool_, False),
+    'flip': (np.bool_, False),  # Moved left last tick, so the sprite faces left
+}
+
+
+class BoarView:
+    # Per-boar handle like bullets.BulletView; the numbers live in a BoarStore once added
+    store = None
+    index = -1
+
+    x = Column('x')
+    y = Column('y')
+    size = Column('size', int)
+    health = Column('health', int)
+    state = Column('state', int)
+    parent = Column('parent', int)
+    last_shot = Column('last_shot')
+    timer = Column('timer')
+    random_walk_timer = Column('random_walk_timer')
+    random_angle = Column('random_angle')
+    dodge_cooldown = Column('dodge_cooldown')
+    angle = Column('angle')
+    radius = Column('radius')
+    initial_babies = Column('initial_babies', int)
+    is_mother = Column('is_mother', bool)
+    damage_boost = Column('damage_boost', bool)
+    flip = Column('flip', bool)
+
+    @property
+    def is_enraged(self):
+        return self.state in (CHARGE, REST)
+
+    @property
+    def flee(self):
+        return self.state == FLEE
+
+    @property
+    def babies(self):
+        return self.store.children(self.index) if self.store is not None else []
+
+    @property
+    def mother(self):
+        return self.store.views[self.parent] if self.store is not None and self.parent != NO_PARENT else None
+
+
+class BoarStore:
+    # Slots are stable while a boar lives (babies refer to their mother by slot); dead slots are reused
+    def __init__(self, capacity=256, seed=None, frame_scale=1.0):
+        self.count = 0  # Slots [0, count) have been used; alive marks the live ones
+        self.views = []
+        self.free = []  # Dead slots, reused by add()
+        self.rng = np.random.default_rng(seed)  # Random-walk headings for the whole herd at once
+        self.high_water = 0
+        self.frame_scale = frame_scale  # 60 Hz ticks per update(), like BulletStore.frame_scale
+        self.adult_pattern = patterns.MOTHER  # What shoot() fires; see patterns.py
+        self.baby_pattern = patterns.BABY
+        self.flow = None  # A flowfield.FlowField charges and flees steer by; None heads straight for the target
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        for name, (dtype, _) in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.awake = np.zeros(capacity, dtype=bool)  # Moves and shoots this tick, see wake()
+        self.last_x = np.zeros(capacity)  # Positions before the last update(), see previous()
+        self.last_y = np.zeros(capacity)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in tuple(COLUMNS) + ('alive', 'awake', 'last_x', 'last_y')}
+        self._allocate(self.capacity * 2)
+        for name, column in old.items():
+            getattr(self, name)[:self.count] = column[:self.count]
+
+    def add(self, view):
+        # A baby's mother has to be added first; view.parent is her slot
+        if self.free:
+            i = self.free.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow()
+            i = self.count
+            self.count += 1
+            self.views.append(None)
+        fields = view.__dict__
+        for name, (_, default) in COLUMNS.items():
+            getattr(self, name)[i] = fields.pop(name, default)
+        parent = self.parent[i]
+        if parent != NO_PARENT:
+            self.babies_left[parent] += 1
+        self.alive[i] = True
+        self.awake[i] = True
+        self.last_x[i] = self.x[i]
+        self.last_y[i] = self.y[i]
+        view.store = self
+        view.index = i
+        self.views[i] = view
+        live = len(self)
+        if live > self.high_water:
+            self.high_water = live
+        return view
+
+    def kill(self, idx):
+        # Remove boars by slot; a mother takes her babies with her. Returns every slot removed
+        idx = np.asarray(idx, dtype=np.intp)
+        if not len(idx):
+            return idx
+        n = self.count
+        orphans = np.flatnonzero(self.alive[:n] & np.isin(self.parent[:n], idx))
+        idx = np.union1d(idx, orphans)
+        parents = self.parent[idx]
+        np.subtract.at(self.babies_left, parents[parents != NO_PARENT], 1)
+        self.alive[idx] = False
+        self.awake[idx] = False
+        views = self.views
+        for i in idx.tolist():
+            self._release(views[i])
+            views[i] = None
+            self.free.append(i)
+        return idx
+
+    def _release(self, view):
+        # Detached views keep their last values
+        i = view.index
+        for name in COLUMNS:
+            view.__dict__[name] = getattr(self, name)[i].item()
+        view.store = None
+        view.index = -1
+
+    def previous(self):
+        # Positions one update() ago for slots [0, count), like BulletStore.previous, e.g. to interpolate drawing
+        n = self.count
+        return self.last_x[:n], self.last_y[:n]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __iter__(self):
+        views = self.views
+        return iter([views[i] for i in np.flatnonzero(self.alive[:self.count])])
+
+    def adults(self):
+        # Mask over slots [0, count): live mothers and childless boars
+        n = self.count
+        return self.alive[:n] & (self.parent[:n] == NO_PARENT)
+
+    def babies(self):
+        n = self.count
+        return self.alive[:n] & (self.parent[:n] != NO_PARENT)
+
+    def children(self, i):
+        n = self.count
+        return [self.views[j] for j in np.flatnonzero(self.alive[:n] & (self.parent[:n] == i))]
+
+    def stats(self):
+        adults = int(np.count_nonzero(self.adults()))
+        return {
+            'live': len(self),
+            'adults': adults,
+            'babies': len(self) - adults,
+            'capacity': self.capacity,
+            'high_water': self.high_water,
+        }
+
+    def wake(self, cx, cy, chunk_size, reach):
+        # Adults within reach chunks (Chebyshev) of the chunk holding (cx, cy) are awake, babies follow
+        # their mother; reach None wakes everyone
+        n = self.count
+        alive = self.alive[:n]
+        if reach is None:
+            self.awake[:n] = alive
+            return
+        pcx = cx // chunk_size
+        pcy = cy // chunk_size
+        half = self.size[:n] / 2
+        near = ((np.abs((self.x[:n] + half) // chunk_size - pcx) <= reach)
+                & (np.abs((self.y[:n] + half) // chunk_size - pcy) <= reach))
+        parent = self.parent[:n]
+        baby = parent != NO_PARENT
+        near[baby] = near[parent[baby]]
+        self.awake[:n] = alive & near
+
+    def update(self, projectiles, world_width, world_height, player, now):
+        # One tick of movement for every awake boar: adults per state, then family rules, then babies.
+        # projectiles is a SpatialGrid indexing projectile points
+        n = self.count
+        awake = self.awake[:n]
+        state = self.state[:n]
+        self.last_x[:n] = self.x[:n]
+        self.last_y[:n] = self.y[:n]
+        wander = np.flatnonzero(awake & (state == WANDER))
+        charge = np.flatnonzero(awake & (state == CHARGE))
+        rest = np.flatnonzero(awake & (state == REST))
+        if len(wander):
+            self._wander(wander, projectiles)
+        if len(charge):
+            self._charge(charge, *self._target(player, charge), now)
+        if len(rest):
+            self._rest(rest, now)
+        adults = np.concatenate((wander, charge, rest))
+        self._clamp(adults, world_width, world_height)
+        self._obstruct(adults)
+
+        self._families(np.flatnonzero(awake & self.is_mother[:n]), now)
+
+        orbit = np.flatnonzero(awake & (state == ORBIT))
+        flee = np.flatnonzero(awake & (state == FLEE))
+        if len(orbit):
+            mother = self.parent[orbit]
+            self.angle[orbit] += ORBIT_SPEED * self.frame_scale
+            self.x[orbit] = self.x[mother] + self.radius[orbit] * np.cos(self.angle[orbit])
+            self.y[orbit] = self.y[mother] + self.radius[orbit] * np.sin(self.angle[orbit])
+        if len(flee):
+            tx, ty = self._target(player, flee)
+            half = self.size[flee] / 2
+            hx, hy = self._steer(self.x[flee] + half, self.y[flee] + half, self.x[flee] - tx, self.y[flee] - ty,
+                                 away=True)
+            self.x[flee] += hx * (FLEE_SPEED * self.frame_scale)
+            self.y[flee] += hy * (FLEE_SPEED * self.frame_scale)
+        self._clamp(np.concatenate((orbit, flee)), world_width, world_height)
+        self._obstruct(flee)
+
+        moved = np.flatnonzero(awake)
+        self.flip[moved] = self.x[moved] < self.last_x[moved]
+
+    def _walk(self, idx):
+        # Random walk: a fresh heading whenever the boar's walk timer runs out
+        timer = self.random_walk_timer
+        timer[idx] -= self.frame_scale
+        expired = idx[timer[idx] <= 0]
+        if len(expired):
+            self.random_angle[expired] = self.rng.uniform(0, 2 * math.pi, len(expired))
+            timer[expired] = self.rng.integers(WALK_TICKS[0], WALK_TICKS[1] + 1, len(expired))
+        self.x[idx] += np.cos(self.random_angle[idx]) * (BASE_SPEED * self.frame_scale)
+        self.y[idx] += np.sin(self.random_angle[idx]) * (BASE_SPEED * self.frame_scale)
+
+    def _wander(self, idx, projectiles):
+        cooldown = self.dodge_cooldown
+        cx = self.x[idx] + self.size[idx] / 2
+        cy = self.y[idx] + self.size[idx] / 2
+        dodge_x = np.zeros(len(idx))
+        dodge_y = np.zeros(len(idx))
+        ready = np.flatnonzero(cooldown[idx] <= 0)
+        if len(ready) and len(projectiles.xs):
+            # Only boars with a projectile in a nearby cell need the exact query
+            r = DODGE_RADIUS
+            counts = projectiles.cell_counts_in_rects(cx[ready] - r, cy[ready] - r, cx[ready] + r, cy[ready] + r)
+            for j in ready[counts > 0].tolist():
+                near = projectiles.points_within(cx[j], cy[j], r)
+                if len(near):
+                    px, py = projectiles.xs[near[0]], projectiles.ys[near[0]]
+                    sidestep = math.atan2(cy[j] - py, cx[j] - px) + math.pi/2
+                    dodge_x[j] = math.cos(sidestep) * DODGE_SPEED * self.frame_scale
+                    dodge_y[j] = math.sin(sidestep) * DODGE_SPEED * self.frame_scale
+                    cooldown[idx[j]] = DODGE_COOLDOWN
+        cooldown[idx] -= self.frame_scale
+        self._walk(idx)
+        self.x[idx] += dodge_x
+        self.y[idx] += dodge_y
+
+    def _charge(self, idx, tx, ty, now):
+        cx = self.x[idx] + self.size[idx] / 2
+        cy = self.y[idx] + self.size[idx] / 2
+        dx = tx - cx
+        dy = ty - cy
+        hx, hy = self._steer(cx, cy, dx, dy)
+        self.x[idx] += hx * (CHARGE_SPEED * self.frame_scale)
+        self.y[idx] += hy * (CHARGE_SPEED * self.frame_scale)
+        done = idx[(np.hypot(dx, dy) < CHARGE_STOP) | (now - self.timer[idx] > CHARGE_TIME)]
+        self.state[done] = REST
+        self.timer[done] = now
+
+    def _steer(self, cx, cy, dx, dy, away=False):
+        # Unit headings for boars centered at cx, cy: the flow field's, or straight along (dx, dy) near
+        # the target, where the field has none, or without a field
+        if self.flow is None:
+            direct = slice(None)
+            hx = np.empty(len(dx))
+            hy = np.empty(len(dx))
+        else:
+            hx, hy, near = self.flow.steer(cx, cy, away)
+            direct = np.flatnonzero(near | ((hx == 0) & (hy == 0)))
+            if not len(direct):
+                return hx, hy
+        heading = np.arctan2(dy[direct], dx[direct])
+        hx[direct] = np.cos(heading)
+        hy[direct] = np.sin(heading)
+        return hx, hy
+
+    def _obstruct(self, idx):
+        # Boars whose center stepped from open ground into an obstacle cell of the flow field slide along
+        # whichever axis stays open, or go back
+        flow = self.flow
+        if flow is None or not flow.has_obstacles or not len(idx):
+            return
+        half = self.size[idx] / 2
+        x = self.x[idx] + half
+        y = self.y[idx] + half
+        last_x = self.last_x[idx] + half
+        last_y = self.last_y[idx] + half
+        blocked = flow.blocked
+        hit = blocked[flow.cells_of(x, y)] & ~blocked[flow.cells_of(last_x, last_y)]
+        if not hit.any():
+            return
+        idx = idx[hit]
+        half = half[hit]
+        x, y, last_x, last_y = x[hit], y[hit], last_x[hit], last_y[hit]
+        slide_x = ~blocked[flow.cells_of(x, last_y)]
+        slide_y = ~slide_x & ~blocked[flow.cells_of(last_x, y)]
+        self.x[idx] = np.where(slide_x, x, last_x) - half
+        self.y[idx] = np.where(slide_y, y, last_y) - half
+
+    def _rest(self, idx, now):
+        resting = now - self.timer[idx] < REST_TIME
+        self._walk(idx[resting])
+        again = idx[~resting]
+        self.state[again] = CHARGE
+        self.timer[again] = now
+
+    def _families(self, mothers, now):
+        # A mother who lost every baby enrages; one down to her last baby sends it running
+        left = self.babies_left[mothers]
+        initial = self.initial_babies[mothers]
+        enrage = mothers[(left == 0) & (initial > 0) & (self.state[mothers] == WANDER)]
+        self.state[enrage] = CHARGE
+        self.timer[enrage] = now
+        self.damage_boost[enrage] = True
+        self.health[enrage] = ENRAGED_HEALTH
+        lonely = mothers[(left == 1) & (initial > 1)]
+        if len(lonely):
+            self.health[lonely] = np.maximum(self.health[lonely], MOTHER_HEALTH)
+            n = self.count
+            last = np.flatnonzero(self.alive[:n] & (self.state[:n] == ORBIT) & np.isin(self.parent[:n], lonely))
+            self.state[last] = FLEE
+
+    def _clamp(self, idx, world_width, world_height):
+        size = self.size[idx]
+        self.x[idx] = np.maximum(0, np.minimum(self.x[idx], world_width - size))
+        self.y[idx] = np.maximum(0, np.minimum(self.y[idx], world_height - size))
+
+    def shoot(self, player, now, enemy_bullets, child_bullets):
+        # Fire this tick's volleys into the bullet stores, restarting the shooters' timers; returns how many
+        # bullets adults and babies fired
+        n = self.count
+        awake = self.awake[:n]
+        state = self.state[:n]
+        elapsed = now - self.last_shot[:n]
+        enraged = (state == CHARGE) | (state == REST)
+        adults = np.flatnonzero(awake & (self.parent[:n] == NO_PARENT)
+                                & (elapsed >= np.where(enraged, ENRAGED_SHOT_DELAY, SHOT_DELAY)))
+        babies = np.flatnonzero(awake & (state == ORBIT) & (elapsed >= SHOT_DELAY))
+        self.last_shot[adults] = now
+        self.last_shot[babies] = now
+        cx, cy, angles = self._aim(adults, *self._target(player, adults))
+        damage = np.where(self.damage_boost[adults], BOOSTED_DAMAGE, 1)
+        adult_shots = self.adult_pattern.at_level(1).fire(enemy_bullets, cx, cy, angles, damage, self.volleys[adults])
+        cx, cy, angles = self._aim(babies, *self._target(player, babies))
+        baby_shots = self.baby_pattern.at_level(1).fire(child_bullets, cx, cy, angles, fired=self.volleys[babies],
+                                                        source=babies)
+        self.volleys[adults] += 1
+        self.volleys[babies] += 1
+        return adult_shots, baby_shots
+
+    def _target(self, player, idx):
+        # Center the boars in idx go after: the player's, or with a list of players (co-op, see server.py)
+        # each boar's nearest
+        if not isinstance(player, list):
+            return player.get_center()
+        centers = np.array([p.get_center() for p in player]).reshape(-1, 2)
+        half = self.size[idx] / 2
+        dx = (self.x[idx] + half)[:, None] - centers[:, 0]
+        dy = (self.y[idx] + half)[:, None] - centers[:, 1]
+        nearest = centers[np.argmin(dx * dx + dy * dy, axis=1)]
+        return nearest[:, 0], nearest[:, 1]
+
+    def _aim(self, idx, tx, ty):
+        half = self.size[idx] / 2
+        cx = self.x[idx] + half
+        cy = self.y[idx] + half
+        return cx, cy, np.arctan2(ty - cy, tx - cx)
+
+    def hits(self, grid, x0, y0, x1, y1, select):
+        # For each segment (x0[k], y0[k])-(x1[k], y1[k]), e.g. a projectile's last step, the selected boar
+        # it reaches first (lowest slot on ties): (k, slot) pairs. Swept, so a fast bullet can't step over a
+        # boar between ticks. select is a mask over slots [0, count); grid is a SpatialGrid used to index the boars
+        n = self.count
+        if not len(x1) or not select.any():
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        x = self.x[:n]
+        y = self.y[:n]
+        grid.index_points(x, y, select)
+        # A rect meets the segment only if its top-left is at most one boar size up and left of the segment's box
+        reach = float(self.size[:n][select].max())
+        left = np.minimum(x0, x1)
+        top = np.minimum(y0, y1)
+        point, slot = grid.point_pairs_in_rects(left - reach, top - reach, np.maximum(x0, x1) - left + reach + 1,
+                                                np.maximum(y0, y1) - top + reach + 1)
+        size = self.size[slot]
+        inside, enter = segments_hit_boxes(x0[point], y0[point], x1[point], y1[point],
+                                           x[slot], y[slot], x[slot] + size, y[slot] + size)
+        point = point[inside]
+        slot = slot[inside]
+        order = np.lexsort((slot, enter[inside], point))
+        point = point[order]
+        slot = slot[order]
+        first = np.ones(len(point), dtype=bool)
+        first[1:] = point[1:] != point[:-1]
+        return point[first], slot[first]
+
+    def damage(self, point, slot):
+        # Apply hits from hits(); a boar absorbs hits until it dies and the rest pass through.
+        # Returns the points that landed and the slots that died (still alive, see kill())
+        order = np.lexsort((point, slot))
+        point = point[order]
+        slot = slot[order]
+        starts = np.ones(len(slot), dtype=bool)
+        starts[1:] = slot[1:] != slot[:-1]
+        position = np.arange(len(slot))
+        rank = position - np.maximum.accumulate(np.where(starts, position, 0))
+        landed = rank < self.health[slot]
+        point = point[landed]
+        slot = slot[landed]
+        np.subtract.at(self.health, slot, 1)
+        hit = np.unique(slot)
+        return point, hit[self.health[hit] <= 0]
+
+    def family_contains(self, slot, x, y):
+        # True if (x, y) is inside the rect of the live baby in slot, or its mother's
+        if slot == NO_PARENT:
+            return False
+        for i in (slot, self.parent[slot]):
+            if i != NO_PARENT:
+                left = self.x[i]
+                top = self.y[i]
+                size = self.size[i]
+                if left <= x < left + size and top <= y < top + size:
+                    return True
+        return False
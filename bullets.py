@@ -0,0 +1,591 @@
+import math
+
+import numpy as np
+import pygame
+
+from assets import assets
+from lifecycle import DROP_OLDEST, MERGE
+
+# Bullet kinds stored in the kind column
+GREEN = 0
+PURPLE = 1
+ORANGE = 2
+ENEMY = 3
+CHILD = 4
+
+SPEEDS = {GREEN: 7, PURPLE: 9, ORANGE: 12, ENEMY: 4, CHILD: 4}  # Pixels per 60 Hz tick, per kind
+REFLECT_SPEED = SPEEDS[ENEMY] * 1.3  # Reflected enemy bullets head home 30% faster
+ORANGE_TIME_STEP = 0.7  # Oscillation clock advance per tick
+
+BULLET_SPRITE = 'sprites/projectiles/bullet_main.png'
+
+# x and y are evaluated from the trajectory (x0, y0, t0, vx, vy) when first read each tick, see BulletStore.x
+FLOAT_COLUMNS = ('x', 'y', 'x0', 'y0', 'vx', 'vy', 'angle', 'speed', 'phase', 'time', 'damage', 'origin_x', 'origin_y')
+INT_COLUMNS = ('t0', 'expires', 'serial', 'source', 'born')  # serial: unique per bullet, follows it through compact()
+NEVER = -1  # expires value of a bullet that never leaves the world on its own (stationary, or numeric) or expires
+NO_SOURCE = -1  # source value of a bullet without a live shooter to ignore (see ChildBullet)
+VIEW_CLASSES = {}  # kind -> BulletView subclass, for views made on demand (see BulletStore.view)
+
+
+class Column:
+    # Reads and writes one store column for an attached view, or the instance dict while detached.
+    # update names a store method called with the view's index after a write, e.g. to re-aim a bullet
+    def __init__(self, name, cast=float, update=None):
+        self.name = name
+        self.cast = cast
+        self.update = update
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        if view.store is None:
+            return view.__dict__[self.name]
+        return self.cast(getattr(view.store, self.name)[view.index])
+
+    def __set__(self, view, value):
+        if view.store is None:
+            view.__dict__[self.name] = value
+            return
+        getattr(view.store, self.name)[view.index] = value
+        if self.update:
+            getattr(view.store, self.update)(view.index)
+
+
+class BulletView:
+    # Thin per-bullet handle; the numbers live in a BulletStore once added
+    store = None
+    index = -1
+
+    x = Column('x', update='rebase')
+    y = Column('y', update='rebase')
+    angle = Column('angle', update='aim')
+    speed = Column('speed', update='aim')
+    phase = Column('phase')
+    time = Column('time')
+    damage = Column('damage', int)
+    origin_x = Column('origin_x')
+    origin_y = Column('origin_y')
+    kind = Column('kind', int)
+
+
+class BulletStore:
+    # Straight-moving bullets are closed-form: position = spawn point + velocity * age. They are not
+    # stepped; x and y are evaluated at most once per tick when something reads them, and each
+    # bullet's world-exit tick is worked out at spawn so step() retires it from a timer wheel without
+    # bounds-checking the rest. Orange shots and reflected or deflected bullets are numeric: they are
+    # integrated and bounds-checked every step as before.
+    # speed is in pixels per 60 Hz tick; frame_scale is how many of those one step covers (3 at 20 Hz).
+    # Bullets come in one at a time through add()/spawn(), or a volley at a time through emit()
+    # (see patterns.py), which writes the columns directly and leaves the views to view(). limit() puts
+    # the store on a lifecycle.Budget: bullets past their ttl go on the timer wheel like ones leaving the
+    # world, and spawns past the cap evict the oldest live bullets or are refused
+    def __init__(self, capacity=256, world_width=None, world_height=None, frame_scale=1.0):
+        self.count = 0  # Slots [0, count) are in use, dead ones are compacted away each step
+        self.views = []  # Per slot; None until view() is asked for a slot emit() filled
+        self.free = {}  # View class -> released views, reused by spawn()
+        self.high_water = 0  # Most slots in use at once, to size capacity for the worst waves
+        self.allocated = 0  # Views created by spawn() because the free list was empty
+        self.reused = 0
+        self.world_width = world_width  # Without bounds every bullet is numeric
+        self.world_height = world_height
+        self.tick = 0  # Steps taken; trajectories are in these units
+        self.evaluated = -1  # Tick x and y were last evaluated for
+        self.wheel = {}  # Tick -> bullets scheduled to leave the world then (some may be dead or rescheduled)
+        self.queued = {}  # Tick -> emit() arguments for burst volleys due then
+        self.retired = 0  # Bullets the wheel removed, expired ones included
+        self.frame_scale = frame_scale
+        self.serials = 0  # Bullets ever added, the next serial
+        self.ttl = None  # Steps a bullet may live, see limit()
+        self.cap = None  # Most live bullets
+        self.overflow = DROP_OLDEST
+        self.expired = 0  # Bullets retired for their age, evicted to make room, and never added
+        self.evicted = 0
+        self.refused = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        for name in FLOAT_COLUMNS:
+            self.__dict__[name] = np.zeros(capacity)  # Bypasses the x and y properties
+        for name in INT_COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.numeric = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        old = {name: self.__dict__[name] for name in FLOAT_COLUMNS + INT_COLUMNS + ('kind', 'numeric', 'alive')}
+        self._allocate(self.capacity * 2)
+        for name, column in old.items():
+            self.__dict__[name][:self.count] = column[:self.count]
+
+    def _evaluate(self):
+        # Bring x and y up to self.tick for the analytic bullets; numeric ones are already there
+        n = self.count
+        analytic = ~self.numeric[:n]
+        age = self.tick - self.t0[:n]
+        positions = self.__dict__
+        positions['x'][:n] = np.where(analytic, self.x0[:n] + self.vx[:n] * age, positions['x'][:n])
+        positions['y'][:n] = np.where(analytic, self.y0[:n] + self.vy[:n] * age, positions['y'][:n])
+        self.evaluated = self.tick
+
+    # Current positions; reading either evaluates both once per tick
+    @property
+    def x(self):
+        if self.evaluated != self.tick:
+            self._evaluate()
+        return self.__dict__['x']
+
+    @property
+    def y(self):
+        if self.evaluated != self.tick:
+            self._evaluate()
+        return self.__dict__['y']
+
+    def limit(self, budget):
+        # Apply a lifecycle.Budget (ttl in ticks at 60 Hz) to bullets added from now on
+        if budget.overflow == MERGE:
+            raise ValueError("bullets can't merge; use DROP_OLDEST or REFUSE")
+        self.ttl = None if budget.ttl is None else math.ceil(budget.ttl / self.frame_scale)
+        self.cap = budget.cap
+        self.overflow = budget.overflow
+
+    def _room(self, k):
+        # How many of k new bullets the cap lets in, after evicting the oldest live ones if that's the policy
+        if self.cap is None or self.count + k <= self.cap:
+            return k
+        live = np.flatnonzero(self.alive[:self.count])
+        over = len(live) + k - self.cap
+        if over <= 0:
+            return k
+        if self.overflow == DROP_OLDEST:
+            evict = min(over, len(live))
+            if evict < len(live):
+                live = live[np.argpartition(self.serial[live], evict - 1)[:evict]]
+            self.alive[live] = False
+            self.evicted += evict
+            over -= evict
+        refused = min(over, k)
+        self.refused += refused
+        return k - refused
+
+    def add(self, view):
+        # Returns the view, now attached, or None if the cap refused it
+        if not self._room(1):
+            return None
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        fields = view.__dict__
+        columns = self.__dict__  # A new bullet's raw x and y are current; no need to evaluate the rest
+        x = columns['x'][i] = self.x0[i] = fields.pop('x')
+        y = columns['y'][i] = self.y0[i] = fields.pop('y')
+        self.t0[i] = self.born[i] = self.tick
+        self.serial[i] = self.serials
+        self.serials += 1
+        self.source[i] = fields.pop('source', NO_SOURCE)
+        self.angle[i] = fields.pop('angle')
+        self.speed[i] = fields.pop('speed')
+        self.phase[i] = fields.pop('phase', 0)
+        self.time[i] = fields.pop('time', 0)
+        self.damage[i] = fields.pop('damage', 1)
+        origin_x = fields.pop('origin_x', None)
+        origin_y = fields.pop('origin_y', None)
+        self.origin_x[i] = x if origin_x is None else origin_x
+        self.origin_y[i] = y if origin_y is None else origin_y
+        self.kind[i] = fields.pop('kind')
+        self.numeric[i] = self.kind[i] == ORANGE or self.world_width is None
+        self.alive[i] = True
+        view.store = self
+        view.index = i
+        self.views.append(view)
+        self.count += 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        self.aim(i)
+        return view
+
+    def spawn(self, cls, *args, **kwargs):
+        # Like add(cls(*args, **kwargs)), but re-initialises a released view of that class when one is free
+        pool = self.free.get(cls)
+        reused = bool(pool)
+        view = pool.pop() if reused else cls.__new__(cls)
+        view.__init__(*args, **kwargs)
+        if self.add(view) is None:
+            self.free.setdefault(cls, []).append(view)  # Refused by the cap; keep the view for the next spawn
+            return None
+        if reused:
+            self.reused += 1
+        else:
+            self.allocated += 1
+        return view
+
+    def extend(self, views):
+        for view in views:
+            self.add(view)
+
+    def emit(self, kind, x, y, angle, speed, damage=1, phase=0.0, origin_x=None, origin_y=None, source=NO_SOURCE,
+             delay=0):
+        # Add a batch of bullets of one kind from arrays (scalars broadcast) without making their views.
+        # delay > 0 queues them for that many steps later instead. Returns the slots added now; past the cap
+        # with REFUSE, the last ones of the batch are left out
+        if delay > 0:
+            self.queued.setdefault(self.tick + delay, []).append(
+                (kind, x, y, angle, speed, damage, phase, origin_x, origin_y, source))
+            return np.zeros(0, dtype=np.intp)
+        x, y, angle, speed, damage, phase, source = np.broadcast_arrays(x, y, angle, speed, damage, phase, source)
+        k = self._room(x.size)
+        if not k:
+            return np.zeros(0, dtype=np.intp)
+        if k < x.size:
+            origin_x = x if origin_x is None else np.broadcast_to(origin_x, x.shape)
+            origin_y = y if origin_y is None else np.broadcast_to(origin_y, y.shape)
+            x, y, angle, speed, damage, phase, source, origin_x, origin_y = (
+                column[:k] for column in (x, y, angle, speed, damage, phase, source, origin_x, origin_y))
+        while self.count + k > self.capacity:
+            self._grow()
+        idx = np.arange(self.count, self.count + k)
+        columns = self.__dict__  # Raw x and y, like add()
+        columns['x'][idx] = self.x0[idx] = x
+        columns['y'][idx] = self.y0[idx] = y
+        self.t0[idx] = self.born[idx] = self.tick
+        self.serial[idx] = np.arange(self.serials, self.serials + k)
+        self.serials += k
+        self.source[idx] = source
+        self.angle[idx] = angle
+        self.speed[idx] = speed
+        self.phase[idx] = phase
+        self.time[idx] = 0
+        self.damage[idx] = damage
+        self.origin_x[idx] = x if origin_x is None else origin_x
+        self.origin_y[idx] = y if origin_y is None else origin_y
+        self.kind[idx] = kind
+        self.numeric[idx] = kind == ORANGE or self.world_width is None
+        self.alive[idx] = True
+        self.views.extend([None] * k)
+        self.count += k
+        if self.count > self.high_water:
+            self.high_water = self.count
+        self.aim(idx)
+        return idx
+
+    def view(self, i):
+        # The view for slot i, made (or taken from the free list) the first time one is asked for
+        view = self.views[i]
+        if view is None:
+            cls = VIEW_CLASSES[int(self.kind[i])]
+            pool = self.free.get(cls)
+            if pool:
+                view = pool.pop()
+                self.reused += 1
+            else:
+                view = cls.__new__(cls)
+                self.allocated += 1
+            view.store = self
+            view.index = i
+            self.views[i] = view
+        return view
+
+    def aim(self, idx):
+        # Recompute cached velocity from angle and speed; the trajectory restarts from here
+        if isinstance(idx, int):
+            angle = float(self.angle[idx])
+            speed = float(self.speed[idx]) * self.frame_scale
+            self.vx[idx] = math.cos(angle) * speed
+            self.vy[idx] = math.sin(angle) * speed
+        else:
+            speed = self.speed[idx] * self.frame_scale
+            self.vx[idx] = np.cos(self.angle[idx]) * speed
+            self.vy[idx] = np.sin(self.angle[idx]) * speed
+        self.rebase(idx)
+
+    def rebase(self, idx):
+        # Start a new straight segment at the current position and reschedule its exit
+        if isinstance(idx, int):
+            self._rebase_one(idx)
+            return
+        idx = np.asarray(idx, dtype=np.intp)
+        x = self.x[idx]
+        y = self.y[idx]
+        self.x0[idx] = x
+        self.y0[idx] = y
+        self.t0[idx] = self.tick
+        due = np.full(len(idx), NEVER, dtype=np.int64)
+        analytic = ~self.numeric[idx]
+        if analytic.any():
+            straight = idx[analytic]
+            steps = self._exit_steps(self.x0[straight], self.y0[straight], self.vx[straight], self.vy[straight])
+            due[analytic] = np.where(steps >= 0, self.tick + steps, NEVER)
+        if self.ttl is not None:
+            # Whichever comes first, leaving the world or running out of time
+            deadline = np.maximum(self.born[idx] + self.ttl, self.tick)
+            due = np.where(due == NEVER, deadline, np.minimum(due, deadline))
+        self.expires[idx] = due
+        due = due[due != NEVER]
+        wheel = self.wheel
+        for tick, count in zip(*(values.tolist() for values in np.unique(due, return_counts=True))):
+            wheel[tick] = wheel.get(tick, 0) + count
+
+    def _rebase_one(self, i):
+        # rebase() for one slot in plain Python, the common case from add() and view writes
+        x, y = self._position(i)
+        self.x0[i] = x
+        self.y0[i] = y
+        self.t0[i] = self.tick
+        due = NEVER
+        if not self.numeric[i]:
+            vx = float(self.vx[i])
+            vy = float(self.vy[i])
+            width = self.world_width
+            height = self.world_height
+            if x < 0 or x > width or y < 0 or y > height:
+                due = self.tick
+            else:
+                k = min((width - x) / vx if vx > 0 else x / -vx if vx < 0 else math.inf,
+                        (height - y) / vy if vy > 0 else y / -vy if vy < 0 else math.inf)
+                if k != math.inf:
+                    due = self.tick + math.floor(k) + 1
+        if self.ttl is not None:
+            deadline = max(int(self.born[i]) + self.ttl, self.tick)
+            due = deadline if due == NEVER else min(due, deadline)
+        self.expires[i] = due
+        if due == NEVER:
+            return
+        self.wheel[due] = self.wheel.get(due, 0) + 1
+
+    def _position(self, i):
+        # Current position of one slot without evaluating the whole store
+        columns = self.__dict__
+        if self.evaluated == self.tick or self.numeric[i]:
+            return float(columns['x'][i]), float(columns['y'][i])
+        age = self.tick - int(self.t0[i])
+        x = float(self.x0[i] + self.vx[i] * age)
+        y = float(self.y0[i] + self.vy[i] * age)
+        columns['x'][i] = x
+        columns['y'][i] = y
+        return x, y
+
+    def _exit_steps(self, x, y, vx, vy):
+        # Steps until (x, y) + k * (vx, vy) is first outside the world, or NEVER. step() culls a bullet
+        # whose current position is outside before moving it, so that is when it is retired
+        width = self.world_width
+        height = self.world_height
+        with np.errstate(divide='ignore', invalid='ignore'):
+            kx = np.where(vx > 0, (width - x) / vx, np.where(vx < 0, x / -vx, np.inf))
+            ky = np.where(vy > 0, (height - y) / vy, np.where(vy < 0, y / -vy, np.inf))
+        k = np.minimum(kx, ky)
+        steps = np.where(np.isfinite(k), np.floor(k) + 1, NEVER).astype(np.int64)
+        steps[(x < 0) | (x > width) | (y < 0) | (y > height)] = 0
+        return steps
+
+    def kill(self, target):
+        # A view, or slots
+        self.alive[target.index if isinstance(target, BulletView) else target] = False
+
+    def orphan(self, sources):
+        # Shooters in these slots died: bullets they fired, or have queued, no longer refer to them
+        n = self.count
+        self.source[:n][np.isin(self.source[:n], sources)] = NO_SOURCE
+        for volleys in self.queued.values():
+            for k, volley in enumerate(volleys):
+                source = np.asarray(volley[-1])
+                volleys[k] = volley[:-1] + (np.where(np.isin(source, sources), NO_SOURCE, source),)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __iter__(self):
+        return iter([self.view(i) for i in np.flatnonzero(self.alive[:self.count])])
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.compact()
+
+    def compact(self):
+        # Swap-remove: live bullets from the tail fill the holes, so the cost is O(dead) not O(count).
+        # Slot order is not preserved
+        n = self.count
+        dead = np.flatnonzero(~self.alive[:n])
+        if not len(dead):
+            return
+        live = n - len(dead)
+        holes = dead[dead < live]
+        movers = np.flatnonzero(self.alive[live:n]) + live  # As many as there are holes
+        columns = self.__dict__  # Raw x and y; moving them doesn't need them evaluated
+        for name in FLOAT_COLUMNS + INT_COLUMNS + ('kind', 'numeric'):
+            column = columns[name]
+            column[holes] = column[movers]
+        views = self.views
+        for i in dead.tolist():
+            if views[i] is not None:
+                self._release(views[i])
+        for hole, mover in zip(holes.tolist(), movers.tolist()):
+            view = views[mover]
+            if view is not None:
+                view.index = hole
+            views[hole] = view
+        del views[live:]
+        self.alive[:live] = True
+        self.alive[live:n] = False
+        self.count = live
+
+    def _release(self, view):
+        # Dead views go back on their class's free list; holding on to one after it died is a bug
+        view.store = None
+        view.index = -1
+        self.free.setdefault(type(view), []).append(view)
+
+    def stats(self):
+        return {
+            'live': len(self),
+            'capacity': self.capacity,
+            'high_water': self.high_water,
+            'allocated': self.allocated,
+            'reused': self.reused,
+            'free': sum(len(pool) for pool in self.free.values()),
+            'retired': self.retired,
+            'cap': self.cap,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'refused': self.refused,
+            'queued': sum(np.size(volley[1]) for volleys in self.queued.values() for volley in volleys),
+            'numeric': int(np.count_nonzero(self.numeric[:self.count] & self.alive[:self.count])),
+        }
+
+    def step(self):
+        tick = self.tick
+        n = self.count
+        if self.wheel.pop(tick, 0):
+            # Bullets rebased since they were scheduled have a different expires
+            due = self.alive[:n] & (self.expires[:n] == tick)
+            self.alive[:n] &= ~due
+            self.retired += int(np.count_nonzero(due))
+            if self.ttl is not None:
+                self.expired += int(np.count_nonzero(due & (self.born[:n] + self.ttl <= tick)))
+        numeric = np.flatnonzero(self.numeric[:n])
+        columns = self.__dict__  # Numeric bullets' x and y are always current
+        if len(numeric) and self.world_width is not None:
+            # Cull out-of-world numeric bullets before moving, like the old list filters did
+            x = columns['x'][numeric]
+            y = columns['y'][numeric]
+            self.alive[numeric] &= (x >= 0) & (x <= self.world_width) & (y >= 0) & (y <= self.world_height)
+        self.compact()
+        n = self.count
+        numeric = np.flatnonzero(self.numeric[:n])
+        orange = numeric[self.kind[numeric] == ORANGE]
+        if len(orange):
+            self.time[orange] += ORANGE_TIME_STEP * self.frame_scale
+            speed = self.speed[orange]
+            angle = self.angle[orange] + np.sin(self.time[orange] + self.phase[orange]) * (speed / 20)
+            self.vx[orange] = np.cos(angle) * speed * self.frame_scale
+            self.vy[orange] = np.sin(angle) * speed * self.frame_scale
+        if len(numeric):
+            columns['x'][numeric] += self.vx[numeric]
+            columns['y'][numeric] += self.vy[numeric]
+        self.tick += 1  # Analytic positions follow from the new tick when next read
+        for volley in self.queued.pop(self.tick, ()):
+            self.emit(*volley)  # Burst shots due this tick, ready before anything fires
+
+    def previous(self):
+        # Positions one step ago for slots [0, count); from there to x, y is the segment each bullet swept
+        # through, which is what hit tests use. Every bullet moved by its current velocity last step unless
+        # it was added, aimed or moved since, which restarts its trajectory (t0) where it is now
+        n = self.count
+        moved = self.t0[:n] < self.tick
+        return self.x[:n] - self.vx[:n] * moved, self.y[:n] - self.vy[:n] * moved
+
+    def index_into(self, grid):
+        # Segment-index live bullets (last step's sweep) in a SpatialGrid; query results are store slots
+        n = self.count
+        x0, y0 = self.previous()
+        grid.index_segments(x0, y0, self.x[:n], self.y[:n], self.alive[:n])
+
+    def reflect(self, idx):
+        # Send bullets back toward where they were fired from, then take one step; they stay numeric
+        idx = np.asarray(idx, dtype=np.intp)
+        self.numeric[idx] = True
+        dx = self.origin_x[idx] - self.x[idx]
+        dy = self.origin_y[idx] - self.y[idx]
+        moving = np.hypot(dx, dy) > 0
+        idx = idx[moving]
+        self.angle[idx] = np.arctan2(dy[moving], dx[moving])
+        self.speed[idx] = REFLECT_SPEED
+        self.aim(idx)
+        x = self.x
+        y = self.y
+        x[idx] += self.vx[idx]
+        y[idx] += self.vy[idx]
+
+    def deflect(self, idx, cx, cy, boost):
+        # Push bullets directly away from (cx, cy) and speed them up; they stay numeric
+        idx = np.asarray(idx, dtype=np.intp)
+        self.numeric[idx] = True
+        self.angle[idx] = np.arctan2(self.y[idx] - cy, self.x[idx] - cx)
+        self.speed[idx] *= boost
+        self.aim(idx)
+
+
+class Projectile(BulletView):
+    KINDS = {'green': GREEN, 'purple': PURPLE, 'orange': ORANGE}
+    COLORS = {kind: color for color, kind in KINDS.items()}
+    base_angle = BulletView.angle  # Orange shots oscillate around this in BulletStore.step
+    radius = 5  # Used for collision, not drawing
+
+    BULLET_MAIN = None  # Sprites, loaded by load_sprites
+    BULLET_PURPLE = None
+    BULLET_ORANGE = None
+    SPRITE_TABLE = None  # Sprite per kind, for batch_sprites
+    DRAW_EXTENT = 40  # Sprites are drawn from (x - 5, y - 5) and are at most 40 px wide
+
+    def __init__(self, x, y, angle, color='green', phase=0):
+        self.x = x
+        self.y = y
+        self.base_angle = angle
+        self.kind = Projectile.KINDS[color]
+        self.speed = SPEEDS[self.kind]
+        self.phase = phase
+        self.time = 0
+
+    @property
+    def color(self):
+        return Projectile.COLORS[self.kind]
+
+    @classmethod
+    def load_sprites(cls):
+        if cls.BULLET_MAIN is None:
+            # One decode of bullet_main.png; purple and orange share the same 20x20 variant
+            cls.BULLET_MAIN = assets.image(BULLET_SPRITE, (40, 40))
+            cls.BULLET_PURPLE = assets.image(BULLET_SPRITE, (20, 20))
+            cls.BULLET_ORANGE = assets.image(BULLET_SPRITE, (20, 20))
+            cls.SPRITE_TABLE = np.empty(3, dtype=object)
+            cls.SPRITE_TABLE[GREEN] = cls.BULLET_MAIN
+            cls.SPRITE_TABLE[PURPLE] = cls.BULLET_PURPLE
+            cls.SPRITE_TABLE[ORANGE] = cls.BULLET_ORANGE
+
+    @classmethod
+    def reset_sprites(cls):
+        # Reload on next use, e.g. once the preloader replaces a placeholder
+        cls.BULLET_MAIN = cls.BULLET_PURPLE = cls.BULLET_ORANGE = cls.SPRITE_TABLE = None
+
+    @classmethod
+    def batch_sprites(cls, store, idx):
+        # Sprites and world top-lefts for store slots idx, same placement as draw()
+        if cls.SPRITE_TABLE is None:
+            cls.load_sprites()
+        return cls.SPRITE_TABLE[store.kind[idx]].tolist(), store.x[idx] - 5, store.y[idx] - 5
+
+    def draw(self, camera, surface=None):
+        if Projectile.BULLET_MAIN is None:
+            Projectile.load_sprites()
+        pos = camera.apply((self.x, self.y))
+        screen = surface or pygame.display.get_surface()
+        if self.color == 'green':
+            screen.blit(Projectile.BULLET_MAIN, (pos[0] - 5, pos[1] - 5))  # Center on position
+        elif self.color == 'purple':
+            screen.blit(Projectile.BULLET_PURPLE, (pos[0] - 5, pos[1] - 5))
+        elif self.color == 'orange':
+            screen.blit(Projectile.BULLET_ORANGE, (pos[0] - 5, pos[1] - 5))
+
+
+VIEW_CLASSES.update(dict.fromkeys((GREEN, PURPLE, ORANGE), Projectile))
+assets.watch(BULLET_SPRITE, Projectile.reset_sprites)
@@ -0,0 +1,240 @@
+# Headless co-op bot client for server.py, with client-side prediction and reconciliation:
+#   python client.py --server 127.0.0.1:7777 --duration 30
+import os
+import sys
+import math
+import time
+import random
+import asyncio
+import argparse
+from collections import OrderedDict
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Bots never open a window
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+
+import netcode
+from player import Player
+from simulation import FrameInput, TICK_RATE as BASE_TICK_RATE
+from timestep import FixedTimestep
+
+JOIN_RETRY = 0.25  # Seconds between JOINs until the WELCOME arrives
+CORRECTION_EPSILON = 0.01  # Pixels; smaller reconciliation moves are float noise, not corrections
+TURN_TICKS = (15, 60)  # The bot picks a new heading every this many ticks (inclusive)
+AIM_DISTANCE = 100
+
+
+class BotClient(asyncio.DatagramProtocol):
+    def __init__(self, server_addr, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.server_addr = server_addr
+        self.network = (latency, jitter, loss, seed)
+        self.rng = random.Random(seed)
+        self.transport = None
+        self.welcome = asyncio.get_running_loop().create_future()  # Protocols are built inside the loop
+        self.pid = None
+        self.tick_rate = None
+        self.player = None  # Predicted own player, from the first snapshot on
+        self.seq = 0
+        self.pending = OrderedDict()  # seq -> (FrameInput, sent at) not yet applied by the server
+        self.entries = ()  # Newest inputs as sent, REDUNDANT_INPUTS of them
+        self.history = OrderedDict()  # tick -> decoded tables, baselines for the next deltas
+        self.tick = -1  # Newest snapshot decoded
+        self.tables = None
+        self.own = None
+        self.heading = None
+        self.turn = 0
+        self.running = False
+        self.snapshots = 0
+        self.received_bytes = 0
+        self.undecodable = 0  # Deltas whose baseline was no longer in the history
+        self.stale = 0  # Snapshots older than one already decoded
+        self.corrections = []  # Pixels, one per reconciliation that moved the prediction
+        self.reconciled = 0
+        self.rtt = []  # Seconds from sending an input to the snapshot that applied it
+
+    def connection_made(self, transport):
+        latency, jitter, loss, seed = self.network
+        self.transport = netcode.LossyTransport(transport, asyncio.get_running_loop(), latency, jitter, loss, seed)
+
+    def datagram_received(self, data, addr):
+        self.received_bytes += len(data)
+        kind = data[:1]
+        if kind == b'W' and self.pid is None:
+            _, self.pid, self.tick_rate, self.world_width, self.world_height, _ = netcode.WELCOME.unpack(data)
+            self.welcome.set_result(self.pid)
+        elif kind == b'S' and self.pid is not None:
+            self.receive_snapshot(data)
+
+    def receive_snapshot(self, data):
+        decoded = netcode.decode_snapshot(data, self.history)
+        if decoded is None:
+            self.undecodable += 1
+            return
+        tick, ack, own, tables = decoded
+        self.snapshots += 1
+        self.history[tick] = tables
+        while len(self.history) > netcode.HISTORY:
+            self.history.popitem(last=False)
+        if tick <= self.tick:
+            self.stale += 1  # Still a baseline the server may use, but older than what we show
+            return
+        self.tick = tick
+        self.tables = tables
+        self.own = own
+        self.reconcile(ack, own)
+
+    def reconcile(self, ack, own):
+        x, y, health, weapon_level, flags, _ = own
+        now = time.perf_counter()
+        for seq in [seq for seq in self.pending if seq <= ack]:
+            _, sent = self.pending.pop(seq)
+            if seq == ack:
+                self.rtt.append(now - sent)
+        player = self.player
+        if player is None:
+            player = self.player = Player(x, y, self.world_width, self.world_height)
+            predicted = (x, y)
+        else:
+            predicted = (player.x, player.y)
+        player.x = x
+        player.y = y
+        player.health = health
+        player.weapon_level = weapon_level
+        for inputs, _ in self.pending.values():
+            player.move(inputs.keys(), self.scale)
+        self.reconciled += 1
+        error = math.hypot(player.x - predicted[0], player.y - predicted[1])
+        if error > CORRECTION_EPSILON:
+            self.corrections.append(error)
+
+    @property
+    def scale(self):
+        return BASE_TICK_RATE / self.tick_rate
+
+    @property
+    def down(self):
+        return self.own is not None and bool(self.own[4] & (netcode.DOWN | netcode.LOST | netcode.WON))
+
+    def boar_positions(self):
+        rows = self.tables['boars'] if self.tables else netcode.empty('boars')
+        half = rows[:, 4] / 2
+        return rows[:, 1] / netcode.QUANTIZE['x'] + half, rows[:, 2] / netcode.QUANTIZE['y'] + half
+
+    def choose_input(self):
+        # Wander, hold fire and aim at the nearest boar in view
+        rng = self.rng
+        if self.turn <= 0:
+            self.heading = (rng.randint(-1, 1), rng.randint(-1, 1))
+            self.turn = rng.randint(*TURN_TICKS)
+        self.turn -= 1
+        cx, cy = self.player.get_center()
+        x, y = self.boar_positions()
+        if len(x):
+            nearest = int(np.argmin((x - cx) ** 2 + (y - cy) ** 2))
+            aim = (float(x[nearest]), float(y[nearest]))
+        else:
+            angle = rng.uniform(-math.pi, math.pi)
+            aim = (cx + math.cos(angle) * AIM_DISTANCE, cy + math.sin(angle) * AIM_DISTANCE)
+        move_x, move_y = self.heading
+        return FrameInput(up=move_y < 0, down=move_y > 0, left=move_x < 0, right=move_x > 0, fire=True, aim=aim)
+
+    def send_input(self, inputs):
+        self.seq += 1
+        self.pending[self.seq] = (inputs, time.perf_counter())
+        cx, cy = self.player.get_center()
+        entry = (self.seq, netcode.buttons_of(inputs), netcode.clamp16(inputs.aim[0] - cx), netcode.clamp16(inputs.aim[1] - cy))
+        self.entries = (self.entries + (entry,))[-netcode.REDUNDANT_INPUTS:]
+        self.transport.sendto(netcode.encode_input(self.tick, self.entries), self.server_addr)
+
+    def step(self):
+        # One client tick: predict and send an input once there is a player to move, else just ack
+        if self.player is None or self.down:
+            self.transport.sendto(netcode.encode_input(self.tick, ()), self.server_addr)
+            return
+        inputs = self.choose_input()
+        self.player.move(inputs.keys(), self.scale)
+        self.send_input(inputs)
+
+    async def join(self, timeout=10.0):
+        end = time.perf_counter() + timeout
+        while not self.welcome.done():
+            if time.perf_counter() > end:
+                raise TimeoutError("no WELCOME from " + str(self.server_addr))
+            self.transport.sendto(netcode.JOIN, self.server_addr)
+            await asyncio.wait([self.welcome], timeout=JOIN_RETRY)
+        return self.pid
+
+    async def run(self, duration=None):
+        # Tick at the server's rate until stop(), or for duration seconds
+        self.running = True
+        timestep = FixedTimestep(self.tick_rate)
+        end = None if duration is None else time.perf_counter() + duration
+        while self.running and (end is None or time.perf_counter() < end):
+            for _ in range(timestep.advance()):
+                self.step()
+            await asyncio.sleep(max(timestep.dt - timestep.accumulator, 0.0))
+
+    def stop(self):
+        self.running = False
+
+    def stats(self):
+        corrections = self.corrections
+        return {
+            'pid': self.pid,
+            'snapshots': self.snapshots,
+            'received_bytes': self.received_bytes,
+            'sent_bytes': self.transport.sent_bytes if self.transport else 0,
+            'undecodable': self.undecodable,
+            'stale': self.stale,
+            'reconciled': self.reconciled,
+            'corrections': len(corrections),
+            'mean_correction_px': float(np.mean(corrections)) if corrections else 0.0,
+            'max_correction_px': float(np.max(corrections)) if corrections else 0.0,
+            'rtt_ms': float(np.median(self.rtt)) * 1000 if self.rtt else None,
+        }
+
+
+async def connect(server_addr, **network):
+    # Opens a BotClient's socket and joins; returns (BotClient, datagram transport)
+    loop = asyncio.get_running_loop()
+    transport, client = await loop.create_datagram_endpoint(lambda: BotClient(server_addr, **network),
+                                                            remote_addr=server_addr)
+    await client.join()
+    return client, transport
+
+
+def parse_addr(text):
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+async def main_async(args):
+    client, transport = await connect(parse_addr(args.server), latency=args.latency / 1000,
+                                      jitter=args.jitter / 1000, loss=args.loss, seed=args.seed)
+    try:
+        await client.run(args.duration)
+    finally:
+        transport.close()
+    for key, value in client.stats().items():
+        print(f"{key}: {value}")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Headless bot client for server.py")
+    parser.add_argument('--server', default='127.0.0.1:7777')
+    parser.add_argument('--duration', type=float, default=30.0, help="Seconds")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--latency', type=float, default=0.0, help="Added one-way latency for outgoing packets, ms")
+    parser.add_argument('--jitter', type=float, default=0.0, help="ms")
+    parser.add_argument('--loss', type=float, default=0.0, help="Fraction of outgoing packets dropped")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
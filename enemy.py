@@ -1,10 +1,19 @@
 import math
-import time
 import random
 import pygame
 
+import numpy as np
+
+import boars
+import bullets
+from assets import assets
+from boars import BoarView
+from bullets import BulletView, Column
+from sprites import RotationCache, ROTATION_STEPS, sprite_variants, disc, bar
+
 # Enemy-specific configurations
 ENEMY_SIZE = 80
+BABY_SIZE = 40
 ENEMY_HEALTH = 1
 ENEMY_COLOR = (255, 0, 0)  # Red
 HEALTH_COLOR = (0, 255, 0)  # Green for health bar
@@ -17,237 +26,148 @@ YELLOW = (255, 255, 0)
 DROP_COLOR = (255, 105, 180)  # Pink for drop
 DROP_SIZE = 20  # Medium-size circle
 ENEMY_IMAGE = None
+BOAR_SPRITE = 'sprites/enemies/boar.png'
+BABY_BOAR_SPRITE = 'sprites/enemies/baby_boar.png'
 
 
-class Enemy:
-    def __init__(self, x, y):
+class Enemy(BoarView):
+    # Mothers and plain boars; behaviour lives in boars.BoarStore, this is a handle onto one slot
+    def __init__(self, x, y, rng=random, now=0.0):
         self.x = x
         self.y = y
         self.size = ENEMY_SIZE
         self.health = ENEMY_HEALTH
-        self.last_shot = time.time()
-        self.base_speed = 1.5
-        self.dodge_speed = 2.5
+        self.rng = rng  # Seeded random.Random from the Simulation, or the random module itself
+        self.last_shot = now  # Simulation clock, in seconds
         self.random_walk_timer = 0
-        self.random_angle = random.uniform(0, 2 * math.pi)
+        self.random_angle = rng.uniform(0, 2 * math.pi)
         self.dodge_cooldown = 0
-        self.babies = []
         self.damage_boost = False
         self.is_mother = False
-        self.is_enraged = False
         self.initial_babies = 0
-    
+        self.state = boars.WANDER
+
     ENEMY_IMAGE = None
 
     @classmethod
     def load_sprite(cls):
         if cls.ENEMY_IMAGE is None:
-            cls.ENEMY_IMAGE = pygame.image.load('sprites/enemies/boar.png').convert_alpha()
-            cls.ENEMY_IMAGE = pygame.transform.scale(cls.ENEMY_IMAGE, (ENEMY_SIZE, ENEMY_SIZE))
+            cls.ENEMY_IMAGE = assets.image(BOAR_SPRITE, (ENEMY_SIZE, ENEMY_SIZE))
         return cls.ENEMY_IMAGE
+
+    @classmethod
+    def reset_sprite(cls):
+        cls.ENEMY_IMAGE = None
+        sprite_variants.invalidate('boar')
     
 
-    def aim_at_player(self, player):
-        dx = player.x + player.size/2 - (self.x + self.size/2)
-        dy = player.y + player.size/2 - (self.y + self.size/2)
-        return math.atan2(dy, dx)
-
-    def shoot(self, player):
-        current_time = time.time()
-        shot_delay = 0.2 if self.is_enraged else 1  # 1.5x faster when enraged
-        if current_time - self.last_shot >= shot_delay:
-            angle = self.aim_at_player(player)
-            self.last_shot = current_time
-            damage = 3 if self.damage_boost else 1
-            color = BLACK if self.damage_boost else RED
-            return [
-                EnemyBullet(self.x + self.size/2, self.y + self.size/2, angle, damage, color),
-                EnemyBullet(self.x + self.size/2, self.y + self.size/2, angle + 0.2, damage, color),
-                EnemyBullet(self.x + self.size/2, self.y + self.size/2, angle - 0.2, damage, color)
-            ]
-        return []
-
-    def move(self, projectiles, world_width, world_height, player=None):
-        if self.is_enraged:
-            current_time = time.time()
-            if not hasattr(self, 'charge_timer') or self.charge_timer is None:
-                self.charge_timer = current_time
-                self.charging = True
-                self.rest_start = None
-
-            if self.charging:
-                # Charge toward player at double bullet speed (8)
-                dx = player.x + player.size/2 - (self.x + self.size/2)
-                dy = player.y + player.size/2 - (self.y + self.size/2)
-                angle = math.atan2(dy, dx)
-                self.x += math.cos(angle) * 8
-                self.y += math.sin(angle) * 8
-                # Stop charging if close to player or after 1 second
-                dist = math.hypot(dx, dy)
-                if dist < 10 or current_time - self.charge_timer > 1:
-                    self.charging = False
-                    self.rest_start = current_time
-            else:
-                # Rest for 2 seconds with random movement
-                if current_time - self.rest_start < 2:
-                    self.random_walk_timer -= 1
-                    if self.random_walk_timer <= 0:
-                        self.random_angle = random.uniform(0, 2 * math.pi)
-                        self.random_walk_timer = random.randint(60, 120)
-                    dx = math.cos(self.random_angle) * self.base_speed
-                    dy = math.sin(self.random_angle) * self.base_speed
-                    self.x += dx
-                    self.y += dy
-                else:
-                    # Reset for next charge
-                    self.charging = True
-                    self.charge_timer = current_time
-
-            # Clamp to world bounds
-            self.x = max(0, min(self.x, world_width - self.size))
-            self.y = max(0, min(self.y, world_height - self.size))
-        else:
-            self.random_walk_timer -= 1
-            if self.random_walk_timer <= 0:
-                self.random_angle = random.uniform(0, 2 * math.pi)
-                self.random_walk_timer = random.randint(60, 120)
-
-            dodge_dx = dodge_dy = 0
-            if self.dodge_cooldown <= 0:
-                for p in projectiles:
-                    dist = math.hypot(p.x - (self.x + self.size/2), p.y - (self.y + self.size/2))
-                    if dist < 100:
-                        angle_to_proj = math.atan2(self.y + self.size/2 - p.y, self.x + self.size/2 - p.x)
-                        dodge_dx += math.cos(angle_to_proj + math.pi/2) * self.dodge_speed
-                        dodge_dy += math.sin(angle_to_proj + math.pi/2) * self.dodge_speed
-                        self.dodge_cooldown = 30
-                        break
-
-            self.dodge_cooldown -= 1
-
-            dx = math.cos(self.random_angle) * self.base_speed + dodge_dx
-            dy = math.sin(self.random_angle) * self.base_speed + dodge_dy
-
-            self.x += dx
-            self.y += dy
-
-            # Clamp to world bounds
-            self.x = max(0, min(self.x, world_width - self.size))
-            self.y = max(0, min(self.y, world_height - self.size))
-
-        # Update babies
-        alive_babies = [b for b in self.babies if b.health > 0]
-        self.babies = alive_babies
-        if self.is_mother:
-            if len(self.babies) == 0 and self.initial_babies > 0 and not self.is_enraged:
-                self.is_enraged = True
-                self.damage_boost = True
-                self.health = 30
-            elif len(self.babies) == 1 and self.initial_babies > 1:
-                self.babies[0].flee = True
-                self.health = max(self.health, 10 if self.babies else 3)
-
-        for baby in self.babies:
-            baby.move(world_width, world_height, player=player)
-
-
-    def draw(self, camera):
-        if Enemy.ENEMY_IMAGE is None:
-            Enemy.load_sprite()
+    def draw(self, camera, surface=None):
         pos = camera.apply((self.x, self.y))
-        screen = pygame.display.get_surface()
-        if not hasattr(self, 'last_x'):
-            self.last_x = self.x  # Initialize last_x
-        dx = self.x - self.last_x
-        # Flip sprite if moving left (dx < 0), keep default if moving right (dx >= 0)
-        sprite = pygame.transform.flip(Enemy.ENEMY_IMAGE, dx < 0, False) if dx != 0 else Enemy.ENEMY_IMAGE
-        # Tint red if enraged
-        if self.is_enraged:
-            tinted_image = Enemy.ENEMY_IMAGE.copy()
-            tinted_image.fill((255, 0, 0, 128), special_flags=pygame.BLEND_RGBA_MULT)
-            screen.blit(tinted_image, (pos[0], pos[1]))
-        else:
-            screen.blit(sprite, (pos[0], pos[1]))
-        health_width = (self.size * self.health) // (30 if self.is_enraged else 10 if self.is_mother else ENEMY_HEALTH)
-        pygame.draw.rect(screen, HEALTH_COLOR, (pos[0], pos[1] - 10, health_width, 5))
-        for baby in self.babies:
-            baby.draw(camera)
-        self.last_x = self.x
+        screen = surface or pygame.display.get_surface()
+        # Faces left after moving left (see BoarStore.update); tinted red if enraged
+        sprite = sprite_variants.get('boar', flip=self.flip, tint='enraged' if self.is_enraged else None)
+        screen.blit(sprite, (pos[0], pos[1]))
+        pygame.draw.rect(screen, HEALTH_COLOR, (pos[0], pos[1] - 10, self.health_width(), 5))
+
+    def health_width(self):
+        return (self.size * self.health) // (30 if self.is_enraged else 10 if self.is_mother else ENEMY_HEALTH)
+
+    DRAW_EXTENT = ENEMY_SIZE + 10  # Sprite from (x, y), health bar 10 px above it
+
+    @classmethod
+    def batch_sprites(cls, store, idx):
+        # Sprites and world top-lefts for store slots idx: every body, then every health bar
+        enraged = (store.state[idx] == boars.CHARGE) | (store.state[idx] == boars.REST)
+        table = np.empty(4, dtype=object)
+        for i, (flip, tint) in enumerate(((False, None), (True, None), (False, 'enraged'), (True, 'enraged'))):
+            table[i] = sprite_variants.get('boar', flip=flip, tint=tint)
+        bodies = table[store.flip[idx] + 2 * enraged].tolist()
+        size = store.size[idx]
+        full = np.where(enraged, 30, np.where(store.is_mother[idx], 10, ENEMY_HEALTH))
+        widths = np.clip(size * store.health[idx] // full, 0, size)  # Tanks' bars stop at the sprite's width
+        bars = [bar(width, 5, HEALTH_COLOR) for width in widths.tolist()]
+        x = store.x[idx]
+        y = store.y[idx]
+        return bodies + bars, np.concatenate((x, x)), np.concatenate((y, y - 10))
+
+    def bounds(self):
+        # World-space area draw() touches: sprite plus the health bar above it (babies draw themselves)
+        return pygame.Rect(self.x, self.y - 10, max(self.size, self.health_width()), self.size + 10)
 
     def spawn_drop(self):
-        if random.random() < 0.9:  # 10% chance
+        if self.rng.random() < 0.9:  # 10% chance
             return Drop(self.x + self.size/2, self.y + self.size/2)
         return None
 
-    @classmethod
-    def spawn_enemies(cls, num_enemies, world_width, world_height):
-        enemies = []
-        for _ in range(num_enemies):
-            x = random.randint(50, world_width - 50)
-            y = random.randint(50, world_height - 50)
-            enemy = cls(x, y)
-            if random.random() < 0.9:  # 10% chance for babies
-                num_babies = random.randint(1, 3)  # 1-3 babies
-                enemy.babies.extend([BabyBoar(enemy) for _ in range(num_babies)])
-                enemy.is_mother = True
-                enemy.initial_babies = num_babies
-                enemy.health = 10  # Set mother HP
-            enemies.append(enemy)
-        return enemies
-
-class EnemyBullet:
-    def __init__(self, x, y, angle, damage=1, color='red', origin_x=None, origin_y=None):
+class EnemyBullet(BulletView):
+    radius = 5
+
+    def __init__(self, x, y, angle, damage=1, origin_x=None, origin_y=None):
         self.x = x
         self.y = y
-        self.speed = 4
-        self.radius = 5
+        self.speed = bullets.SPEEDS[bullets.ENEMY]
         self.angle = angle
         self.damage = damage  # Store damage
-        self.color = BLACK if color == 'black' else RED
         self.origin_x = origin_x if origin_x is not None else x  # Default to spawn position
         self.origin_y = origin_y if origin_y is not None else y
+        self.kind = bullets.ENEMY
+
+    @property
+    def color(self):
+        return BLACK if self.damage > 1 else RED  # Enraged mothers' boosted shots are the black ones
+
+    DRAW_EXTENT = 5  # Circle radius around (x, y)
 
-    def move(self, reflected=False):
-        if not reflected:
-            self.x += math.cos(self.angle) * self.speed
-            self.y += math.sin(self.angle) * self.speed
-        else:
-            # Reflect back to origin at 30% faster speed
-            dx = self.origin_x - self.x
-            dy = self.origin_y - self.y
-            dist = math.hypot(dx, dy)
-            if dist > 0:
-                self.angle = math.atan2(dy, dx)
-                self.speed = 4 * 1.3  # 30% faster
-                self.x += math.cos(self.angle) * self.speed
-                self.y += math.sin(self.angle) * self.speed
-
-    def draw(self, camera):
+    def draw(self, camera, surface=None):
         pos = camera.apply((self.x, self.y))
-        pygame.draw.circle(pygame.display.get_surface(), ENEMY_COLOR, (int(pos[0]), int(pos[1])), self.radius)
+        (surface or pygame.display.get_surface()).blit(disc(self.radius, ENEMY_COLOR), (int(pos[0]) - self.radius, int(pos[1]) - self.radius))
+
+    @classmethod
+    def batch_sprites(cls, store, idx):
+        # Sprites and world top-lefts for store slots idx, same placement as draw()
+        return [disc(5, ENEMY_COLOR)] * len(idx), store.x[idx] - 5, store.y[idx] - 5
+
+class ChildBullet(BulletView):
+    width = 20  # Long stick shape
+    height = 5
+    source = Column('source', int)  # BoarStore slot of the baby that fired it, or NO_SOURCE once it died
 
-class ChildBullet:
     def __init__(self, x, y, angle, source):
+        # source: the BabyBoar firing it
         self.x = x
         self.y = y
-        self.speed = 4  # 30% of EnemyBullet speed (4 * 0.3 = 1.2)
+        self.speed = bullets.SPEEDS[bullets.CHILD]
         self.angle = angle
-        self.width = 20  # Long stick shape
-        self.height = 5
         self.damage = 1
-        self.source = source
+        self.source = source.index if source.store is not None else bullets.NO_SOURCE
+        self.kind = bullets.CHILD
 
-    def move(self):
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
+    ROTATIONS = None  # RotationCache of the stick sprite, built by load_sprite
+    DRAW_EXTENT = 25  # Rotated stick drawn from (x - 10, y - 2.5), at most ~21 px square
 
-    def draw(self, camera):
+    @classmethod
+    def load_sprite(cls, steps=ROTATION_STEPS, prerender=False):
+        if cls.ROTATIONS is None or cls.ROTATIONS.steps != steps:
+            bullet_surface = pygame.Surface((20, 5), pygame.SRCALPHA)  # Long stick shape
+            pygame.draw.rect(bullet_surface, YELLOW, (0, 0, 20, 5))
+            cls.ROTATIONS = RotationCache(bullet_surface, steps)
+        if prerender:
+            cls.ROTATIONS.prerender()
+        return cls.ROTATIONS
+
+    def draw(self, camera, surface=None):
+        if ChildBullet.ROTATIONS is None:
+            ChildBullet.load_sprite()
         pos = camera.apply((self.x - self.width/2, self.y - self.height/2))  # Center the stick
-        screen = pygame.display.get_surface()
-        bullet_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        pygame.draw.rect(bullet_surface, YELLOW, (0, 0, self.width, self.height))
-        rotated_bullet = pygame.transform.rotate(bullet_surface, -math.degrees(self.angle))
-        screen.blit(rotated_bullet, (pos[0], pos[1]))
+        screen = surface or pygame.display.get_surface()
+        screen.blit(ChildBullet.ROTATIONS.get(self.angle), (pos[0], pos[1]))
+
+    @classmethod
+    def batch_sprites(cls, store, idx):
+        # Sprites and world top-lefts for store slots idx, same placement as draw()
+        if cls.ROTATIONS is None:
+            cls.load_sprite()
+        return cls.ROTATIONS.get_many(store.angle[idx]), store.x[idx] - 10, store.y[idx] - 2.5
 
 class Drop:
     def __init__(self, x, y):
@@ -255,19 +175,30 @@ class Drop:
         self.y = y
         self.size = DROP_SIZE
 
-    def draw(self, camera):
-        pos = camera.apply((self.x, self.y))
-        pygame.draw.circle(pygame.display.get_surface(), DROP_COLOR, (int(pos[0]), int(pos[1])), self.size//2)
+    def draw(self, camera, surface=None):
+        sprite, pos = self.sprite()
+        (surface or pygame.display.get_surface()).blit(sprite, camera.apply(pos))
+
+    def sprite(self):
+        # Cached disc and its world top-left, so drops can be batched
+        radius = self.size//2
+        return disc(radius, DROP_COLOR), (self.x - radius, self.y - radius)
 
-class BabyBoar:
+    def bounds(self):
+        return pygame.Rect(self.x - self.size/2, self.y - self.size/2, self.size, self.size)
+
+class BabyBoar(BoarView):
     def __init__(self, mother, radius=100):
-        self.mother = mother  # Reference to parent Enemy
+        self.parent = mother.index  # Slot of the parent Enemy, which must already be in the store
         self.radius = radius  # Circle radius around mother
-        self.angle = random.uniform(0, 2 * math.pi)  # Initial angle
-        self.size = 40  # Smaller size for baby
+        self.angle = mother.rng.uniform(0, 2 * math.pi)  # Initial angle
+        # On the orbit from the start, so a baby whose mother is asleep still has somewhere to be drawn
+        self.x = mother.x + radius * math.cos(self.angle)
+        self.y = mother.y + radius * math.sin(self.angle)
+        self.size = BABY_SIZE
         self.health = 5
-        self.flee = False
-        self.last_shot = time.time()
+        self.state = boars.ORBIT
+        self.last_shot = mother.last_shot
 
         # After imports:
     BABY_BOAR_IMAGE = None  # Placeholder for lazy loading
@@ -275,50 +206,41 @@ class BabyBoar:
     @classmethod
     def load_baby_sprite(cls):
         if cls.BABY_BOAR_IMAGE is None:
-            cls.BABY_BOAR_IMAGE = pygame.image.load('sprites/enemies/baby_boar.png').convert_alpha()
-            cls.BABY_BOAR_IMAGE = pygame.transform.scale(cls.BABY_BOAR_IMAGE, (40, 40))  # Smaller size
+            cls.BABY_BOAR_IMAGE = assets.image(BABY_BOAR_SPRITE, (40, 40))  # Smaller size
         return cls.BABY_BOAR_IMAGE
 
-    def move(self, world_width, world_height, player=None):
-        if self.flee and player:
-            # Run away from player
-            dx = self.x - (player.x + player.size/2)
-            dy = self.y - (player.y + player.size/2)
-            angle = math.atan2(dy, dx)
-            self.x += math.cos(angle) * 3  # Move at speed 3
-            self.y += math.sin(angle) * 3
-        else:
-            self.angle += 0.02
-            self.x = self.mother.x + self.radius * math.cos(self.angle)
-            self.y = self.mother.y + self.radius * math.sin(self.angle)
-        self.x = max(0, min(self.x, world_width - self.size))
-        self.y = max(0, min(self.y, world_height - self.size))
-
-    def draw(self, camera):
-        if BabyBoar.BABY_BOAR_IMAGE is None:
-            BabyBoar.load_baby_sprite()
+    @classmethod
+    def reset_baby_sprite(cls):
+        cls.BABY_BOAR_IMAGE = None
+        sprite_variants.invalidate('baby_boar')
+
+    def draw(self, camera, surface=None):
         pos = camera.apply((self.x, self.y))
-        screen = pygame.display.get_surface()
-        if not hasattr(self, 'last_x'):
-            self.last_x = self.x  # Initialize last_x
-        dx = self.x - self.last_x
-        # Flip sprite if moving left (dx < 0), keep default if moving right (dx >= 0)
-        sprite = pygame.transform.flip(BabyBoar.BABY_BOAR_IMAGE, dx < 0, False) if dx != 0 else BabyBoar.BABY_BOAR_IMAGE
+        screen = surface or pygame.display.get_surface()
+        # Faces left after moving left (see BoarStore.update)
+        sprite = sprite_variants.get('baby_boar', flip=self.flip)
         screen.blit(sprite, (pos[0], pos[1]))
-        self.last_x = self.x  # Update last_x for next frame
 
-    def take_damage(self):
-        self.health -= 1
-        return self.health <= 0  # Return True if dead
-    
-    def shoot(self, player):
-        if self.flee:
-            return []
-        current_time = time.time()
-        if current_time - self.last_shot >= 1:
-            self.last_shot = current_time
-            angle = math.atan2(player.y + player.size/2 - (self.y + self.size/2), player.x + player.size/2 - (self.x + self.size/2))
-            offset_x = self.x + self.size/2 + 10 * math.cos(angle)
-            offset_y = self.y + self.size/2 + 10 * math.sin(angle)
-            return [ChildBullet(offset_x, offset_y, angle, source=self)]
-        return []   
\ No newline at end of file
+    def bounds(self):
+        return pygame.Rect(self.x, self.y, self.size, self.size)
+
+    DRAW_EXTENT = BABY_SIZE
+
+    @classmethod
+    def batch_sprites(cls, store, idx):
+        # Sprites and world top-lefts for store slots idx, same placement as draw()
+        table = np.empty(2, dtype=object)
+        table[0] = sprite_variants.get('baby_boar')
+        table[1] = sprite_variants.get('baby_boar', flip=True)
+        return table[store.flip[idx].astype(np.intp)].tolist(), store.x[idx], store.y[idx]
+
+
+bullets.VIEW_CLASSES[bullets.ENEMY] = EnemyBullet
+bullets.VIEW_CLASSES[bullets.CHILD] = ChildBullet
+
+# Every facing/tint variant of the boar sprites is derived from these loaders once
+sprite_variants.register('boar', Enemy.load_sprite)
+sprite_variants.register('baby_boar', BabyBoar.load_baby_sprite)
+# Rebuild them when the preloader swaps a placeholder for the real image
+assets.watch(BOAR_SPRITE, Enemy.reset_sprite)
+assets.watch(BABY_BOAR_SPRITE, BabyBoar.reset_baby_sprite)
@@ -0,0 +1,192 @@
+# Shared steering fields over a coarse world grid: headings toward (or away from) the nearest player
+# around obstacles, looked up per boar by cell
+import math
+
+import numpy as np
+
+FLOW_CELL = 40  # World pixels per cell side; half a boar
+NEAR_CELLS = 1.5  # Agents closer than this (in cells of travel) to their target steer straight at it
+BAND = math.sqrt(0.5)  # Cells; the least a cell's distance can exceed the lowest neighbour it comes from
+
+
+def _unit(dx, dy):
+    # Scales (dx, dy) pairs to length 1 in place, leaving zeros alone
+    length = np.hypot(dx, dy)
+    moving = length > 0
+    dx[moving] /= length[moving]
+    dy[moving] /= length[moving]
+    return dx, dy
+
+
+class FlowField:
+    # obstacles: (x, y, width, height) rects in world pixels that agents path around, grown by clearance
+    # (e.g. half an agent, since agents look up the cell under their center)
+    def __init__(self, world_width, world_height, obstacles=(), clearance=0, cell_size=FLOW_CELL):
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(world_width / cell_size))
+        self.rows = max(1, math.ceil(world_height / cell_size))
+        cells = self.cols * self.rows
+        grid = np.arange(cells).reshape(self.rows, self.cols)
+        self.row, self.col = np.divmod(grid.ravel(), self.cols)
+        # Left, right, up and down neighbour of each cell; off the grid is cell `cells`, always inf
+        padded = np.pad(grid, 1, constant_values=cells)
+        self.links = np.stack((padded[1:-1, :-2], padded[1:-1, 2:], padded[:-2, 1:-1], padded[2:, 1:-1]),
+                              axis=-1).reshape(cells, 4)
+        self.blocked = np.zeros(cells, dtype=bool)
+        self.walls = None  # Per links entry, whether it leads into an obstacle or off the grid
+        self.has_obstacles = False
+        self.targets = None  # Sorted target cells, None until the first update()
+        self.generation = 0  # Bumped whenever the targets change cell
+        self.built = -1  # Newest generation any cell was filled in for
+        self.filled = np.full(cells, -1)  # Generation each cell's values below are for
+        self.toward = np.full(cells, np.inf)  # Travel distance to the nearest target, in cells
+        self.toward_x = np.zeros(cells)  # Unit headings down the toward field; 0, 0 where it gives none
+        self.toward_y = np.zeros(cells)
+        for x, y, width, height in obstacles:
+            self.block(x - clearance, y - clearance, width + 2 * clearance, height + 2 * clearance)
+        self._find_walls()
+        self.rebuilds = 0  # Generations looked up at least once
+        self.filled_cells = 0  # Cells computed, over every rebuild
+
+    def block(self, x, y, width, height):
+        # Marks the cells a world rect touches as obstacles
+        col0 = max(int(x // self.cell_size), 0)
+        row0 = max(int(y // self.cell_size), 0)
+        col1 = min(int(math.ceil((x + width) / self.cell_size)), self.cols)
+        row1 = min(int(math.ceil((y + height) / self.cell_size)), self.rows)
+        if col0 < col1 and row0 < row1:
+            self.blocked.reshape(self.rows, self.cols)[row0:row1, col0:col1] = True
+            self.has_obstacles = True
+            self._find_walls()
+            self.generation += 1
+
+    def _find_walls(self):
+        self.walls = np.append(self.blocked, True)[self.links]
+
+    def cells_of(self, x, y):
+        col = np.clip((np.asarray(x) // self.cell_size).astype(np.intp), 0, self.cols - 1)
+        row = np.clip((np.asarray(y) // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        return row * self.cols + col
+
+    def update(self, targets):
+        # targets: a Player, or a list of them (co-op). Marks the field stale if the set of cells they are
+        # in changed; returns whether it did
+        if not isinstance(targets, list):
+            targets = [targets]
+        if not targets:
+            return False
+        centers = np.array([player.get_center() for player in targets])
+        cells = np.unique(self.cells_of(centers[:, 0], centers[:, 1]))
+        if self.targets is not None and np.array_equal(cells, self.targets):
+            return False
+        self.targets = cells
+        self.generation += 1
+        return True
+
+    def _refresh(self, cells):
+        # Brings the values of cells up to date with the targets
+        if self.targets is None:
+            return
+        stale = cells[self.filled[cells] != self.generation]
+        if not len(stale):
+            return
+        if self.built != self.generation:
+            self.built = self.generation
+            self.rebuilds += 1
+        if self.has_obstacles:
+            self.toward = np.full(len(self.blocked), np.inf)
+            self.toward[self.targets] = 0.0
+            self._solve(self.toward, self.targets)
+            self.toward_x, self.toward_y = self._downhill(self.toward)
+            self.filled[:] = self.generation
+            self.filled_cells += len(self.blocked)
+            return
+        stale = np.unique(stale)
+        target_row, target_col = np.divmod(self.targets, self.cols)
+        dx = target_col - self.col[stale, None]
+        dy = target_row - self.row[stale, None]
+        distance = np.hypot(dx, dy)
+        nearest = np.argmin(distance, axis=1)[:, None]
+        hx = np.take_along_axis(dx, nearest, 1)[:, 0].astype(np.float64)
+        hy = np.take_along_axis(dy, nearest, 1)[:, 0].astype(np.float64)
+        self.toward[stale] = np.take_along_axis(distance, nearest, 1)[:, 0]
+        self.toward_x[stale], self.toward_y[stale] = _unit(hx, hy)
+        self.filled[stale] = self.generation
+        self.filled_cells += len(stale)
+
+    def _solve(self, values, sources):
+        # Fast marching in bands: fills in values (in place) for every open cell reachable from the source
+        # cells, which hold 0; the rest start at inf. A cell's eikonal update is at least BAND above its
+        # lowest neighbour, so pending cells within BAND of the lowest one can't lower each other much and
+        # are accepted together, one numpy pass per band instead of a heap operation per cell. Blocked
+        # cells stay inf
+        cells = len(values)
+        links = self.links
+        known = np.full(cells + 1, np.inf)  # Accepted values; the extra cell is off the grid and stays inf
+        closed = np.append(self.blocked, True)  # Accepted or blocked
+        order = np.zeros(cells, dtype=np.intp)
+        pending = np.unique(sources)
+        while len(pending):
+            tentative = values[pending]
+            band = tentative < tentative.min() + BAND
+            done = pending[band]
+            pending = pending[~band]
+            closed[done] = True
+            known[done] = values[done]
+            around = links[done].ravel()
+            around = around[~closed[around]]  # May repeat a cell, which gets the same update twice
+            if not len(around):
+                continue
+            near = known[links[around]]
+            a = np.minimum(near[:, 0], near[:, 1])
+            b = np.minimum(near[:, 2], near[:, 3])
+            with np.errstate(invalid='ignore'):
+                gap = np.abs(a - b)  # nan with one side unknown, which takes the one-sided branch
+                candidate = np.where(gap < 1.0, (a + b + np.sqrt(np.maximum(2.0 - gap * gap, 0.0))) / 2,
+                                     np.minimum(a, b) + 1.0)
+            fresh = np.flatnonzero(values[around] == np.inf)
+            values[around] = np.minimum(values[around], candidate)
+            if len(fresh):
+                # Newly reached cells join pending once each: the last copy of each cell wins the slot
+                order[around[fresh]] = fresh
+                pending = np.concatenate((pending, around[fresh[order[around[fresh]] == fresh]]))
+
+    def _downhill(self, values):
+        # Unit headings down values per cell: central differences, one-sided next to walls and edges
+        left, right, up, down = np.append(values, np.inf)[self.links].T
+        with np.errstate(invalid='ignore'):
+            dx = np.where(np.isfinite(left) & np.isfinite(right), (left - right) / 2,
+                          np.where(np.isfinite(left), left - values, np.where(np.isfinite(right), values - right, 0.0)))
+            dy = np.where(np.isfinite(up) & np.isfinite(down), (up - down) / 2,
+                          np.where(np.isfinite(up), up - values, np.where(np.isfinite(down), values - down, 0.0)))
+        dx[~np.isfinite(values)] = 0.0
+        dy[~np.isfinite(values)] = 0.0
+        return _unit(dx, dy)
+
+    def steer(self, x, y, away=False):
+        # Headings for agents whose centers are at x, y: (hx, hy, near). near marks agents close enough
+        # to a target to aim at it directly; hx and hy are 0 where the field gives no heading (walled in,
+        # or a target out of reach), which callers also treat as aim directly. away=True runs up the
+        # field instead, less any part of the heading that runs into a wall or the world's edge next to
+        # the agent's cell, so a fleeing agent slides along them instead of pushing in
+        cells = self.cells_of(x, y)
+        self._refresh(cells)
+        hx = self.toward_x[cells]
+        hy = self.toward_y[cells]
+        near = self.toward[cells] < NEAR_CELLS
+        if away:
+            hx = -hx
+            hy = -hy
+            walls = self.walls[cells]
+            hx[((hx < 0) & walls[:, 0]) | ((hx > 0) & walls[:, 1])] = 0.0
+            hy[((hy < 0) & walls[:, 2]) | ((hy > 0) & walls[:, 3])] = 0.0
+            hx, hy = _unit(hx, hy)
+        return hx, hy, near
+
+    def stats(self):
+        return {
+            'cells': len(self.blocked),
+            'blocked': int(np.count_nonzero(self.blocked)),
+            'rebuilds': self.rebuilds,
+            'filled_cells': self.filled_cells,
+        }
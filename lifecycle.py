@@ -0,0 +1,76 @@
+# Time to live, hard cap and overflow policy per entity class, so long sessions and spawn storms stay bounded
+
+# What happens to a spawn over the cap
+DROP_OLDEST = 'drop_oldest'  # The oldest live one makes room
+REFUSE = 'refuse'  # The new one is never added
+MERGE = 'merge'  # The new one is folded into one already alive (damage texts add up)
+POLICIES = (DROP_OLDEST, REFUSE, MERGE)
+
+
+class Budget:
+    # ttl: ticks at TICK_RATE an entity may live, None for as long as the game keeps it. cap: most alive
+    # at once, None for no limit. overflow: one of POLICIES
+    def __init__(self, ttl=None, cap=None, overflow=DROP_OLDEST):
+        if overflow not in POLICIES:
+            raise ValueError(f"unknown overflow policy {overflow!r}")
+        self.ttl = ttl
+        self.cap = cap
+        self.overflow = overflow
+
+
+# Caps are a few times the worst benchmark high-water marks. Bullet stores apply theirs with
+# BulletStore.limit, which can't merge
+BUDGETS = {
+    'projectiles': Budget(ttl=600, cap=4096, overflow=DROP_OLDEST),
+    'enemy_bullets': Budget(ttl=1800, cap=8192, overflow=DROP_OLDEST),
+    'child_bullets': Budget(ttl=1800, cap=4096, overflow=DROP_OLDEST),
+    'damage_texts': Budget(cap=64, overflow=MERGE),
+    'drops': Budget(ttl=7200, cap=32, overflow=DROP_OLDEST),
+}
+
+
+class Lifecycle:
+    # Applies budgets (overriding some or all of BUDGETS) to lists of plain objects, kept in admission
+    # order with item.born set. MERGE calls item.merge_into(items), which returns the item it folded into,
+    # or None to have the oldest make room instead, as it does for items without merge_into
+    def __init__(self, budgets=None, frame_scale=1.0):
+        self.budgets = {**BUDGETS, **(budgets or {})}
+        self.frame_scale = frame_scale  # TICK_RATE ticks per step, like Simulation.frame_scale
+        self.counts = {name: {'expired': 0, 'evicted': 0, 'refused': 0, 'merged': 0} for name in self.budgets}
+
+    def admit(self, name, items, item, now):
+        # Append item to items at step now, within name's budget. Returns the item that holds it now:
+        # item, the one it merged into, or None if it was refused
+        budget = self.budgets[name]
+        counts = self.counts[name]
+        if budget.cap is not None and len(items) >= budget.cap:
+            if budget.overflow == REFUSE or budget.cap == 0:
+                counts['refused'] += 1
+                return None
+            merge_into = getattr(item, 'merge_into', None)
+            if budget.overflow == MERGE and merge_into is not None:
+                into = merge_into(items)
+                if into is not None:
+                    counts['merged'] += 1
+                    return into
+            over = len(items) - budget.cap + 1
+            del items[:over]
+            counts['evicted'] += over
+        item.born = now
+        items.append(item)
+        return item
+
+    def expire(self, name, items, now):
+        # Remove items older than name's ttl, in place
+        ttl = self.budgets[name].ttl
+        if ttl is None or not items:
+            return
+        oldest = now - ttl / self.frame_scale
+        if items[0].born > oldest:
+            return  # Admission order: nothing later is older
+        kept = [item for item in items if item.born > oldest]
+        self.counts[name]['expired'] += len(items) - len(kept)
+        items[:] = kept
+
+    def stats(self, name, items):
+        return {'live': len(items), 'cap': self.budgets[name].cap, **self.counts[name]}
@@ -1,12 +1,24 @@
-import pygame
-import math
+import sys
 import time
 import random
+import pygame
 import asyncio
 
-from player import Player
-from enemy import Enemy, EnemyBullet, BabyBoar
-
+from bullets import Projectile
+from bullets import BULLET_SPRITE
+from enemy import Enemy, BabyBoar, EnemyBullet, ChildBullet, ENEMY_SIZE, BOAR_SPRITE, BABY_BOAR_SPRITE
+from render import Renderer
+from sprites import sprite_variants
+from simulation import Simulation, FrameInput, WORLD_WIDTH, WORLD_HEIGHT, TICK_RATE
+from world import ChunkedBackground, tiled, WAKE_CHUNKS
+from text import text_cache
+from replay import ReplayRecorder
+from profiler import FrameProfiler
+from snapshot import SimulationThread
+from assets import assets
+from preload import Preloader, draw_progress
+
+START = time.perf_counter()  # For the time-to-first-frame report
 pygame.font.init()
 
 # Initialize Pygame
@@ -15,13 +27,24 @@ pygame.init()
 # Screen settings
 WIDTH = 1440
 HEIGHT = 800
-WORLD_WIDTH = 1600  # Larger world dimensions
-WORLD_HEIGHT = 1200
+DIRTY_RECTS = False  # Push only changed areas with display.update() while the camera is still
+MAX_FPS = 120  # Render cap; the simulation keeps its own tick rate either way (see timestep.py)
+THREADED = sys.platform != 'emscripten'  # pygbag has no threads, the simulation runs between frames there
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
-background_image = pygame.image.load('sprites/background.png').convert()  # Load image
-background_image = pygame.transform.scale(background_image, (WORLD_WIDTH, WORLD_HEIGHT))  # Scale to world size
+BACKGROUND = 'sprites/background.png'
+BACKGROUND_TILE = (1600, 1200)  # Size the background art is drawn at; larger worlds repeat it
 pygame.display.set_caption("Boardom")
 
+# (priority, path, size, alpha, critical) for the Preloader; sizes match the loaders that use them.
+# Gameplay starts once the critical ones are in, the rest show placeholders until they arrive
+PRELOAD = (
+    (0, BULLET_SPRITE, (40, 40), True, True),
+    (1, BULLET_SPRITE, (20, 20), True, True),
+    (2, BOAR_SPRITE, (ENEMY_SIZE, ENEMY_SIZE), True, True),
+    (3, BABY_BOAR_SPRITE, (40, 40), True, False),
+    (4, BACKGROUND, BACKGROUND_TILE, False, False),
+)
+
 # Colors
 WHITE = (255, 255, 255)
 RED = (255, 0, 0)
@@ -30,7 +53,6 @@ GREEN = (0, 255, 0)
 BLACK = (0, 0, 0)
 PURPLE = (128, 0, 128)  # Purple color
 ORANGE = (255, 165, 0)
-ENEMY_AMOUNT = 1
 
 # Camera class
 class Camera:
@@ -38,10 +60,11 @@ class Camera:
         self.x = target.x + target.size/2 - WIDTH/2
         self.y = target.y + target.size/2 - HEIGHT/2
 
-    def update(self, target):
-        # Center camera on player
-        self.x = target.x + target.size/2 - WIDTH/2
-        self.y = target.y + target.size/2 - HEIGHT/2
+    def update(self, target, at=None):
+        # Center camera on player, or on where it is drawn (at, a world top-left)
+        x, y = at or (target.x, target.y)
+        self.x = x + target.size/2 - WIDTH/2
+        self.y = y + target.size/2 - HEIGHT/2
         # Clamp camera to world bounds
         self.x = max(0, min(self.x, WORLD_WIDTH - WIDTH))
         self.y = max(0, min(self.y, WORLD_HEIGHT - HEIGHT))
@@ -50,308 +73,213 @@ class Camera:
         # Apply camera offset to object positions
         return (pos[0] - self.x, pos[1] - self.y)
 
-# Projectile class
-class Projectile:
-    def __init__(self, x, y, angle, color='green', phase=0):
-        self.x = x
-        self.y = y
-        self.base_angle = angle
-        self.speed = 7 + (2 if color == 'purple' else 5 if color == 'orange' else 0)
-        self.radius = 5  # Used for collision, not drawing
-        self.color = color
-        self.phase = phase
-        self.time = 0
-
-    def move(self):
-        if self.color == 'orange':
-            self.time += 0.7
-            oscillation = math.sin(self.time + self.phase) * (self.speed / 20)
-            angle = self.base_angle + oscillation
-            self.x += math.cos(angle) * self.speed
-            self.y += math.sin(angle) * self.speed
-        else:
-            self.x += math.cos(self.base_angle) * self.speed
-            self.y += math.sin(self.base_angle) * self.speed
-
-    def draw(self, camera):
-        pos = camera.apply((self.x, self.y))
-        if self.color == 'green':
-            screen.blit(BULLET_MAIN, (pos[0] - 5, pos[1] - 5))  # Center on position
-        elif self.color == 'purple':
-            screen.blit(BULLET_PURPLE, (pos[0] - 5, pos[1] - 5))
-        elif self.color == 'orange':
-            screen.blit(BULLET_ORANGE, (pos[0] - 5, pos[1] - 5))
-
-class DamageText:
-    def __init__(self, x, y, text, color):
-        self.x = x
-        self.y = y
-        self.text = text
-        self.color = color
-        self.lifetime = 60  # Frames (1 second at 60 FPS)
-        self.speed = -2  # Move upwards
-
-    def update(self):
-        self.y += self.speed  # Move up
-        self.lifetime -= 1
-        return self.lifetime > 0  # Return True if still alive
-
-    def draw(self, camera):
-        pos = camera.apply((self.x, self.y))
-        text_surface = pygame.font.Font(None, 36).render(self.text, True, self.color)
-        screen.blit(text_surface, pos)
-
-def load_bullet_sprites():
-    global BULLET_MAIN, BULLET_PURPLE, BULLET_ORANGE
-    BULLET_MAIN = pygame.image.load('sprites/projectiles/bullet_main.png').convert_alpha()
-    BULLET_PURPLE = pygame.image.load('sprites/projectiles/bullet_main.png').convert_alpha()
-    BULLET_ORANGE = pygame.image.load('sprites/projectiles/bullet_main.png').convert_alpha()
-    BULLET_MAIN = pygame.transform.scale(BULLET_MAIN, (40, 40))
-    BULLET_PURPLE = pygame.transform.scale(BULLET_PURPLE, (20, 20))
-    BULLET_ORANGE = pygame.transform.scale(BULLET_ORANGE, (20, 20))
-
-async def game_loop():
-    load_bullet_sprites()  # Load assets before the loop
-    player = Player(WORLD_WIDTH//2, WORLD_HEIGHT - 100, WORLD_WIDTH, WORLD_HEIGHT)
-    enemies = Enemy.spawn_enemies(ENEMY_AMOUNT, WORLD_WIDTH, WORLD_HEIGHT)
+    def to_world(self, pos):
+        # Convert screen coordinates (e.g. the mouse) to world coordinates
+        return (pos[0] + self.x, pos[1] + self.y)
+
+def interpolated(player, previous, alpha):
+    # World top-left alpha of the way from the player's previous tick's position to the current one
+    return (previous[0] + (player.x - previous[0]) * alpha, previous[1] + (player.y - previous[1]) * alpha)
+
+def draw_world(renderer, snapshot, camera, aim, alpha=1.0, player_at=None):
+    # snapshot: a FrameSnapshot (or anything with the same attributes, e.g. a Simulation replaying on this
+    # thread). alpha below 1 draws boars and bullets that far along their last tick's movement, and
+    # player_at is where to draw the player, see interpolated()
+    player = snapshot.player
+    renderer.draw(player, camera, player_at)
+    player.draw_shield(aim, camera, renderer.screen, player_at)
+    renderer.draw_store(snapshot.boars, camera, Enemy, snapshot.boars.adults(), alpha)
+    renderer.draw_store(snapshot.boars, camera, BabyBoar, snapshot.boars.babies(), alpha)
+    renderer.draw_store(snapshot.projectiles, camera, Projectile, alpha=alpha)
+    renderer.draw_store(snapshot.enemy_bullets, camera, EnemyBullet, alpha=alpha)
+    renderer.draw_store(snapshot.child_bullets, camera, ChildBullet, alpha=alpha)
+    renderer.draw_sprites('drops', snapshot.drops, camera)
+    renderer.draw_sprites('damage_texts', snapshot.damage_texts, camera)
+    renderer.flush()  # One blits call per layer, before the HUD goes on top
+
+def draw_hud(surface, snapshot):
+    # Returns the screen rects it touched, for dirty-rect presentation
+    player = snapshot.player
+    rects = []
+    if snapshot.message and snapshot.message_timer > 0:
+        text = text_cache.render(snapshot.message, 36, BLACK)
+        text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
+        rects.append(surface.blit(text, text_rect))
+
+    # HP bar (upper-right corner, reducing width, red at 1 HP)
+    hp_box_width = 200
+    hp_box_height = 50
+    hp_box_x = WIDTH - hp_box_width - 10  # 10 pixels from right edge
+    hp_box_y = 10  # 10 pixels from top
+    max_health = 5  # Player can take 5 hits
+    health_ratio = player.health / max_health
+    bar_color = RED if player.health == 1 else GREEN  # Red at 1 HP, green otherwise
+    bar_width = int(hp_box_width * health_ratio)  # Reduce width based on health
+    # Draw dark gray outline first (sleek and thin, 2 pixels)
+    outline_color = (50, 50, 50)  # Dark gray
+    outline_width = 2
+    rects.append(pygame.draw.rect(surface, outline_color, (hp_box_x - outline_width, hp_box_y - outline_width, hp_box_width + 2 * outline_width, hp_box_height + 2 * outline_width), outline_width))
+    # Draw health bar inside outline
+    rects.append(pygame.draw.rect(surface, bar_color, (hp_box_x, hp_box_y, bar_width, hp_box_height)))
+    # "HP" on left side of bar, larger text
+    hp_label = text_cache.render("HP", 48, BLACK)  # Larger font for "HP"
+    rects.append(surface.blit(hp_label, (hp_box_x + 10, hp_box_y + (hp_box_height - hp_label.get_height()) // 2)))  # Center vertically
+    # Keep EXP and Bullets in top-left
+    exp_text = text_cache.render(f"EXP: {snapshot.exp}", 36, BLACK)  # Smaller font for other stats
+    bullets_text = text_cache.render(f"Bullets: {snapshot.bullets_shot}", 36, BLACK)
+    rects.append(surface.blit(exp_text, (10, 10)))  # EXP at top-left
+    rects.append(surface.blit(bullets_text, (10, 40)))  # Bullets below EXP
+
+    if snapshot.game_won:
+        text = text_cache.render("You Win! Press SPACE to restart", 74, BLACK)
+        text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
+        rects.append(surface.blit(text, text_rect))
+    elif snapshot.game_lost:
+        text = text_cache.render("You Lose! Press SPACE to restart", 74, BLACK)
+        text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
+        rects.append(surface.blit(text, text_rect))
+    return rects
+
+def load_background():
+    return assets.image(BACKGROUND, BACKGROUND_TILE, alpha=False)
+
+def world_background():
+    # Chunks of the repeated background art, built around the camera within a memory budget
+    return ChunkedBackground(WORLD_WIDTH, WORLD_HEIGHT, tiled(load_background()))
+
+def load_assets():
+    Projectile.load_sprites()
+    ChildBullet.load_sprite(prerender=True)
+    sprite_variants.prewarm('boar', tints=(None, 'enraged'))
+    sprite_variants.prewarm('baby_boar')
+    assets.release_sources()  # Every variant is built by now
+
+def cli_option(name):
+    # Value following --name on the command line, if any
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv[:-1] else None
+
+async def show_loading(preloader):
+    # Progress screen until the critical assets are in; False if the window was closed
+    loading = asyncio.create_task(preloader.load_critical())
+    first_frame = None
+    while not loading.done():
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            loading.cancel()
+            return False
+        draw_progress(screen, preloader.progress(), preloader.current)
+        pygame.display.flip()
+        if first_frame is None:
+            first_frame = time.perf_counter() - START
+            print(f"time to first frame: {first_frame * 1000:.0f} ms")
+        await asyncio.sleep(1 / TICK_RATE)
+    loading.result()
+    return True
+
+async def game_loop(record_path=None, profile_path=None, asset_url=None, tick_rate=TICK_RATE):
+    preloader = Preloader(assets, PRELOAD, asset_url)
+    if not await show_loading(preloader):
+        return False
+    load_assets()  # Everything critical is real now, the rest are placeholders
+    streaming = asyncio.create_task(preloader.load_rest())
+    # Explicit seed so a recording can name it
+    sim = Simulation(seed=random.randrange(2 ** 63), wake_chunks=WAKE_CHUNKS, tick_rate=tick_rate)
+    player = sim.player
+    player.load_shield_sprites(prerender=True)
+    recorder = ReplayRecorder(record_path, sim) if record_path else None
     camera = Camera(player)
-    projectiles = []
-    enemy_bullets = []
-    child_bullets = []
-    drops = []  # Track active drops
-    message = None  # For "Stellanator unlocked"
-    message_timer = 3  # Display duration
-    damage_texts = []
     clock = pygame.time.Clock()
-    game_won = False
-    game_lost = False
-    spam_timer = 0
-    exp = 0  # Experience points
-    bullets_shot = 0  # Track bullets fired
+    background = world_background()
+    renderer = Renderer(screen, background, dirty_rects=DIRTY_RECTS)
+
+    def background_loaded():
+        background.reset(tiled(load_background()))
+        renderer.set_background(background)
+    assets.watch(BACKGROUND, background_loaded)
+    # The simulation runs at its own tick rate and publishes snapshots; frames draw the newest one,
+    # in between its tick and the one before
+    runner = SimulationThread(sim, recorder)
+    profiler = FrameProfiler(enabled=profile_path is not None, export=profile_path is not None)  # F3 shows the overlay
+    profiler.attach(runner)
+    if THREADED:
+        runner.start()
 
     running = True
+    first_frame = True
+    snapshot = runner.buffer.acquire()
     while running:
+        profiler.begin_frame()
+        clicks = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            if event.type == pygame.MOUSEBUTTONDOWN and not (game_won or game_lost):
-                mx, my = pygame.mouse.get_pos()
-                # Convert screen coordinates to world coordinates
-                world_mx = mx + camera.x
-                world_my = my + camera.y
-                dx = world_mx - (player.x + player.size/2)
-                dy = world_my - (player.y + player.size/2)
-                angle = math.atan2(dy, dx)
-                projectiles.append(Projectile(player.x + player.size/2, player.y + player.size/2, angle))
-                bullets_shot += 1  # Increment bullet count
-            if event.type == pygame.KEYDOWN and (game_won or game_lost) and event.key == pygame.K_SPACE:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+            if event.type == pygame.MOUSEBUTTONDOWN and not snapshot.over:
+                clicks.append(camera.to_world(pygame.mouse.get_pos()))
+            if event.type == pygame.KEYDOWN and snapshot.over and event.key == pygame.K_SPACE:
                 running = False
 
-        if not (game_won or game_lost):
-            keys = pygame.key.get_pressed()
-            player.move(keys)
-            camera.update(player)
-
-            mx, my = pygame.mouse.get_pos()
-            spam_timer -= 1
-            if keys[pygame.K_SPACE] and spam_timer <= 0:
-                bullet_data = player.shoot_spam((mx, my), camera)
-                for data in bullet_data:
-                    if len(data) == 5:  # Orange with phase
-                        x, y, angle, color, phase = data
-                        # Speed scales with weapon_level
-                        proj = Projectile(x, y, angle, color, phase)
-                        proj.speed += (player.weapon_level - 3) * 2  # +2 speed per level past 3
-                        projectiles.append(proj)
-                    elif len(data) == 4:  # Purple
-                        x, y, angle, color = data
-                        projectiles.append(Projectile(x, y, angle, color))
-                    else:  # Green
-                        x, y, angle = data
-                        projectiles.append(Projectile(x, y, angle))
-                    bullets_shot += 1
-                spam_timer = 5
-
-            for enemy in enemies[:]:
-                enemy.move(projectiles, WORLD_WIDTH, WORLD_HEIGHT, player)
-                enemy_bullets.extend(enemy.shoot(player))
-
-            for enemy in enemies[:]:
-                for baby in enemy.babies:
-                    child_bullets.extend(baby.shoot(player))
-
-            projectiles = [p for p in projectiles if 0 <= p.x <= WORLD_WIDTH and 0 <= p.y <= WORLD_HEIGHT]
-            to_remove = []  # Collect projectiles to remove
-            for p in projectiles[:]:
-                p.move()
-                hit = False  # Track if projectile hit something
-                # Check enemy collisions
-                for enemy in enemies[:]:
-                    enemy_rect = pygame.Rect(enemy.x, enemy.y, enemy.size, enemy.size)
-                    if enemy_rect.collidepoint(p.x, p.y):
-                        enemy.health -= 1
-                        hit = True
-                        if enemy.health <= 0:
-                            enemies.remove(enemy)
-                            exp += 100
-                            old_health = player.health
-                            player.health += 1
-                            if player.health > old_health:
-                                damage_texts.append(DamageText(player.x + player.size/2, player.y, "+1", GREEN))
-                            drop = enemy.spawn_drop()
-                            if drop:
-                                drops.append(drop)
-                        break  # Only hit one enemy per projectile
-                # Check baby collisions
-                for mother in enemies[:]:
-                    for baby in mother.babies[:]:
-                        baby_rect = pygame.Rect(baby.x, baby.y, baby.size, baby.size)
-                        if baby_rect.collidepoint(p.x, p.y):
-                            if baby.take_damage():
-                                mother.babies.remove(baby)
-                            hit = True
-                            break  # Only hit one baby per projectile
-                if hit:
-                    to_remove.append(p)  # Mark for removal
-            for p in set(to_remove):  # Remove duplicates
-                projectiles.remove(p)
-            game_won = len(enemies) == 0
-
-            enemy_bullets = [b for b in enemy_bullets if 0 <= b.x <= WORLD_WIDTH and 0 <= b.y <= WORLD_HEIGHT]
-
-            player_rect = pygame.Rect(player.x, player.y, player.size, player.size)
-
-            for drop in drops[:]:
-                drop_rect = pygame.Rect(drop.x - drop.size/2, drop.y - drop.size/2, drop.size, drop.size)
-                if player_rect.colliderect(drop_rect):
-                    drops.remove(drop)
-                    player.weapon_level += 1  # Upgrade to level 2
-                    damage_texts.append(DamageText(player.x + player.size/2, player.y, "+1", GREEN))
-                    player.health += 1
-                    message = f"Stellanator level {player.weapon_level} unlocked"
-                    message_timer = 120  # Show for 2 seconds at 60 FPS
-
-            for b in enemy_bullets[:]:
-                b.move()
-                player_rect = pygame.Rect(player.x, player.y, player.size, player.size)
-                shield_rect, _, _ = player.get_shield_rect((mx, my), camera)  # Unpack all three values
-                if shield_rect and shield_rect.collidepoint(b.x, b.y):
-                    # Set origin before reflecting
-                    if b.origin_x is None or b.origin_y is None:
-                        b.origin_x, b.origin_y = b.x, b.y
-                    b.move(reflected=True)
-                elif player_rect.collidepoint(b.x, b.y):
-                    if player.take_damage(b.damage):
-                        game_lost = True
-                    else:
-                        damage_texts.append(DamageText(player.x + player.size/2, player.y, f"-{b.damage}", RED))
-                    enemy_bullets.remove(b)
-
-            # After enemy_bullets handling:
-            child_bullets = [b for b in child_bullets if 0 <= b.x <= WORLD_WIDTH and 0 <= b.y <= WORLD_HEIGHT]
-            for b in child_bullets[:]:
-                b.move()
-                # Skip collision with source baby and its mother
-                if hasattr(b, 'source'):
-                    baby_rect = pygame.Rect(b.source.x, b.source.y, b.source.size, b.source.size)
-                    mother_rect = pygame.Rect(b.source.mother.x, b.source.mother.y, b.source.mother.size, b.source.mother.size)
-                    if baby_rect.collidepoint(b.x, b.y) or mother_rect.collidepoint(b.x, b.y):
-                        continue  # Skip this bullet for now to avoid self-collision
-                shield_rect, _, _ = player.get_shield_rect((mx, my), camera)
-                if shield_rect and shield_rect.collidepoint(b.x, b.y):
-                    dx = b.x - (player.x + player.size/2)
-                    dy = b.y - (player.y + player.size/2)
-                    b.angle = math.atan2(dy, dx)
-                    b.speed *= 1.3
-                elif player_rect.collidepoint(b.x, b.y):
-                    if player.take_damage(b.damage):
-                        game_lost = True
-                    else:
-                        damage_texts.append(DamageText(player.x + player.size/2, player.y, f"-{b.damage}", RED))
-                    child_bullets.remove(b)
-
-        # Draw everything
-        bg_x = -camera.x % WORLD_WIDTH  # Tile horizontally
-        bg_y = -camera.y % WORLD_HEIGHT  # Tile vertically
-        screen.blit(background_image, (bg_x, bg_y))
-        # Tile additional sections if camera exceeds image bounds
-        if bg_x > 0:
-            screen.blit(background_image, (bg_x - WORLD_WIDTH, bg_y))
-        if bg_y > 0:
-            screen.blit(background_image, (bg_x, bg_y - WORLD_HEIGHT))
-        if bg_x > 0 and bg_y > 0:
-            screen.blit(background_image, (bg_x - WORLD_WIDTH, bg_y - WORLD_HEIGHT))
-
-        player.draw(camera)
-        player.draw_shield((mx, my), camera)
-        for enemy in enemies:
-            enemy.draw(camera)
-        for p in projectiles:
-            p.draw(camera)
-        for b in enemy_bullets:
-            b.draw(camera)
-        for b in child_bullets:
-            b.draw(camera)
-        for drop in drops:
-            drop.draw(camera)
-        for text in damage_texts[:]:
-            if not text.update():  # Remove if lifetime expired
-                damage_texts.remove(text)
-            else:
-                text.draw(camera)
-
-        mx, my = pygame.mouse.get_pos()
-
-        if message and message_timer > 0:
-            font = pygame.font.Font(None, 36)
-            text = font.render(message, True, BLACK)
-            text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
-            screen.blit(text, text_rect)
-            message_timer -= 1
-
-        font = pygame.font.Font(None, 48)  # Larger font for "HP"
-        # HP bar (upper-right corner, reducing width, red at 1 HP)
-        hp_box_width = 200
-        hp_box_height = 50
-        hp_box_x = WIDTH - hp_box_width - 10  # 10 pixels from right edge
-        hp_box_y = 10  # 10 pixels from top
-        max_health = 5  # Player can take 5 hits
-        health_ratio = player.health / max_health
-        bar_color = RED if player.health == 1 else GREEN  # Red at 1 HP, green otherwise
-        bar_width = int(hp_box_width * health_ratio)  # Reduce width based on health
-        # Draw dark gray outline first (sleek and thin, 2 pixels)
-        outline_color = (50, 50, 50)  # Dark gray
-        outline_width = 2
-        pygame.draw.rect(screen, outline_color, (hp_box_x - outline_width, hp_box_y - outline_width, hp_box_width + 2 * outline_width, hp_box_height + 2 * outline_width), outline_width)
-        # Draw health bar inside outline
-        pygame.draw.rect(screen, bar_color, (hp_box_x, hp_box_y, bar_width, hp_box_height))
-        # "HP" on left side of bar, larger text
-        hp_label = font.render("HP", True, BLACK)
-        screen.blit(hp_label, (hp_box_x + 10, hp_box_y + (hp_box_height - hp_label.get_height()) // 2))  # Center vertically
-        # Keep EXP and Bullets in top-left
-        exp_font = pygame.font.Font(None, 36)  # Smaller font for other stats
-        exp_text = exp_font.render(f"EXP: {exp}", True, BLACK)
-        bullets_text = exp_font.render(f"Bullets: {bullets_shot}", True, BLACK)
-        screen.blit(exp_text, (10, 10))  # EXP at top-left
-        screen.blit(bullets_text, (10, 40))  # Bullets below EXP
-
-        if game_won:
-            font = pygame.font.Font(None, 74)
-            text = font.render("You Win! Press SPACE to restart", True, BLACK)
-            text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
-            screen.blit(text, text_rect)
-        elif game_lost:
-            font = pygame.font.Font(None, 74)
-            text = font.render("You Lose! Press SPACE to restart", True, BLACK)
-            text_rect = text.get_rect(center=(WIDTH/2, HEIGHT/2))
-            screen.blit(text, text_rect)
-
-        pygame.display.flip()
-        clock.tick(60)
+        keys = pygame.key.get_pressed()
+        aim = camera.to_world(pygame.mouse.get_pos())
+        # Held keys and aim apply to every tick until the next frame's; clicks go to the next tick
+        runner.set_input(FrameInput(
+            up=keys[pygame.K_w], down=keys[pygame.K_s], left=keys[pygame.K_a], right=keys[pygame.K_d],
+            fire=keys[pygame.K_SPACE], shield=keys[pygame.K_k], aim=aim, clicks=clicks))
+        profiler.lap('events')
+        if THREADED:
+            runner.check()
+        else:
+            runner.run_due()
+        profiler.lap('step')
+
+        # Draw everything the camera can see, from the newest snapshot only
+        snapshot = runner.buffer.acquire()
+        alpha = runner.alpha(snapshot)
+        player_at = interpolated(snapshot.player, snapshot.player_previous, alpha)
+        camera.update(snapshot.player, player_at)
+        profiler.lap('camera')
+        renderer.begin(camera)
+        profiler.lap('background')
+        draw_world(renderer, snapshot, camera, aim, alpha, player_at)
+        profiler.lap('world')
+        renderer.add_dirty(draw_hud(screen, snapshot))
+        profiler.lap('hud')
+        renderer.add_dirty(profiler.draw_overlay(screen))
+        profiler.lap('overlay')
+        renderer.present()
+        profiler.lap('present')
+        if first_frame:
+            first_frame = False
+            print(f"time to interactive: {(time.perf_counter() - START) * 1000:.0f} ms")
+        if streaming and streaming.done():
+            streaming.result()
+            streaming = None
+            stats = assets.stats()
+            print(f"all assets loaded: {(time.perf_counter() - START) * 1000:.0f} ms (assets {stats['load_ms']:.0f} ms, "
+                  f"{stats['cache_hits']} cached, {stats['cache_misses']} built)")
+        clock.tick(MAX_FPS)
+        profiler.lap('wait')
+        profiler.end_frame(snapshot)
         await asyncio.sleep(0)  # Yield control to browser
 
+    runner.stop()
+    if streaming:
+        streaming.cancel()
+    if recorder:
+        recorder.close()
+    if profile_path:
+        profiler.export(profile_path)
+        stats = runner.timestep.stats()
+        buffer = runner.buffer
+        print(f"{profiler.frames} frames, {stats['ticks']} ticks, {stats['skipped_frames']} skipped frames, "
+              f"sim lag {stats['lag_ms']:.0f} ms, {buffer.published - buffer.acquired} snapshots not drawn")
     return False
 
 # Entry point
 if __name__ == "__main__":
-    asyncio.run(game_loop())
\ No newline at end of file
+    # --record FILE saves a replay, --profile FILE.csv|.json exports per-frame timings on exit,
+    # --asset-url URL fetches sprites from a server (see benchmarks/throttled_server.py),
+    # --tick-rate N simulates N ticks per second instead of TICK_RATE
+    tick_rate = cli_option('--tick-rate')
+    asyncio.run(game_loop(cli_option('--record'), cli_option('--profile'), cli_option('--asset-url'),
+                          int(tick_rate) if tick_rate else TICK_RATE))
\ No newline at end of file
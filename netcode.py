@@ -0,0 +1,194 @@
+# UDP wire format shared by server.py and client.py: little-endian structs, and per-client snapshots
+# delta-compressed against an acknowledged baseline
+import zlib
+import struct
+import random
+
+import numpy as np
+
+VIEW_WIDTH = 1440  # main.WIDTH and main.HEIGHT; main opens a window on import
+VIEW_HEIGHT = 800
+INTEREST_MARGIN = 200  # World pixels around a client's camera that still reach it
+HISTORY = 64  # Ticks of sent (server) or received (client) tables kept as delta baselines
+REDUNDANT_INPUTS = 3  # Inputs per INPUT packet, so one lost packet costs nothing
+FULL = -1  # Baseline tick of a snapshot that isn't a delta
+
+JOIN = b'J'
+WELCOME = struct.Struct('<cIHIIi')  # b'W', pid, tick rate, world width, world height, tick
+INPUT = struct.Struct('<ciB')  # b'I', acked snapshot tick, input count, then count INPUT_ENTRY
+INPUT_ENTRY = struct.Struct('<IBhh')  # seq, BUTTONS bits, aim relative to the player's center
+SNAPSHOT = struct.Struct('<ciiI')  # b'S', tick, baseline tick, last input seq applied, then zlib(body)
+OWN = struct.Struct('<ddhhBi')  # x, y, health, weapon level, OWN_FLAGS bits, shared exp
+SECTION = struct.Struct('<HHH')  # removed, added and changed row counts
+
+BUTTONS = ('up', 'down', 'left', 'right', 'fire', 'shield')  # FrameInput attributes, bit 0 first
+SHIELD, DOWN, WON, LOST = 1, 2, 4, 8  # OWN_FLAGS
+
+# Fields after the id column, per section; at most 8 so a row's change mask fits a byte
+SECTIONS = {
+    'players': ('x', 'y', 'health', 'weapon_level', 'flags'),  # Other players
+    'boars': ('x', 'y', 'health', 'size', 'flags'),
+    'projectiles': ('x0', 'y0', 'vx', 'vy', 'start', 'kind', 'damage'),
+    'enemy_bullets': ('x0', 'y0', 'vx', 'vy', 'start', 'kind', 'damage'),
+    'child_bullets': ('x0', 'y0', 'vx', 'vy', 'start', 'kind', 'damage'),
+    'drops': ('x', 'y'),
+}
+QUANTIZE = {'x': 4, 'y': 4, 'x0': 4, 'y0': 4, 'vx': 256, 'vy': 256}  # Steps per pixel (per tick); others are whole
+# Boar flags: state in the low 3 bits, then these
+FLIP, MOTHER, BABY, BOOSTED = 8, 16, 32, 64
+
+
+def quantize(name, values):
+    return np.round(np.asarray(values, dtype=np.float64) * QUANTIZE.get(name, 1)).astype(np.int32)
+
+
+def empty(section):
+    return np.empty((0, len(SECTIONS[section]) + 1), dtype=np.int32)
+
+
+def bullet_positions(rows, tick):
+    # World positions of bullet rows at snapshot tick
+    age = tick - rows[:, 5]
+    return (rows[:, 1] / QUANTIZE['x0'] + rows[:, 3] / QUANTIZE['vx'] * age,
+            rows[:, 2] / QUANTIZE['y0'] + rows[:, 4] / QUANTIZE['vy'] * age)
+
+
+def _matches(ids, other):
+    # Mask over sorted ids of the ones also in sorted other, and where they are in it
+    if not len(other):
+        return np.zeros(len(ids), dtype=bool), np.zeros(len(ids), dtype=np.intp)
+    at = np.minimum(np.searchsorted(other, ids), len(other) - 1)
+    return other[at] == ids, at
+
+
+def encode_delta(base, rows):
+    # One section's rows as a delta against base (None for a full table)
+    if base is None or not len(base):
+        return SECTION.pack(0, len(rows), 0) + rows.tobytes()
+    ids = rows[:, 0]
+    base_ids = base[:, 0]
+    kept, at = _matches(ids, base_ids)
+    removed = base_ids[~_matches(base_ids, ids)[0]]
+    added = rows[~kept]
+    diff = rows[kept, 1:] - base[at[kept], 1:]
+    nonzero = diff != 0
+    changed = nonzero.any(axis=1)
+    nonzero = nonzero[changed]
+    masks = np.packbits(nonzero, axis=1, bitorder='little')[:, 0] if len(nonzero) else np.empty(0, dtype=np.uint8)
+    return b''.join((SECTION.pack(len(removed), len(added), len(masks)), removed.astype(np.int32).tobytes(),
+                     added.tobytes(), ids[kept][changed].tobytes(), masks.tobytes(), diff[changed][nonzero].tobytes()))
+
+
+def decode_delta(section, base, data, offset):
+    # Inverse of encode_delta; returns the section's rows and the offset after them
+    width = len(SECTIONS[section]) + 1
+    n_removed, n_added, n_changed = SECTION.unpack_from(data, offset)
+    offset += SECTION.size
+
+    def take(count, dtype):
+        nonlocal offset
+        values = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += values.nbytes
+        return values
+    removed = take(n_removed, np.int32)
+    added = take(n_added * width, np.int32).reshape(n_added, width)
+    ids = take(n_changed, np.int32)
+    masks = take(n_changed, np.uint8)
+    nonzero = np.unpackbits(masks[:, None], axis=1, count=width - 1, bitorder='little').astype(bool)
+    values = take(int(nonzero.sum()), np.int32)
+    rows = empty(section) if base is None else base[~_matches(base[:, 0], np.sort(removed))[0]]
+    if n_changed:
+        rows = rows.copy()
+        diff = np.zeros((n_changed, width - 1), dtype=np.int32)
+        diff[nonzero] = values
+        rows[np.searchsorted(rows[:, 0], ids), 1:] += diff
+    if n_added:
+        rows = np.concatenate((rows, added))
+        rows = rows[np.argsort(rows[:, 0], kind='stable')]
+    return rows, offset
+
+
+def encode_snapshot(tick, baseline, ack, own, tables, base_tables):
+    # own: OWN fields; tables and base_tables: section -> rows (base_tables None for a full snapshot)
+    body = [OWN.pack(*own)]
+    for section in SECTIONS:
+        body.append(encode_delta(None if base_tables is None else base_tables[section], tables[section]))
+    return SNAPSHOT.pack(b'S', tick, baseline, ack) + zlib.compress(b''.join(body), 1)
+
+
+def decode_snapshot(data, history):
+    # history: tick -> tables the client decoded before. Returns (tick, ack, own, tables), or None when the
+    # baseline has already left the history
+    _, tick, baseline, ack = SNAPSHOT.unpack_from(data)
+    base_tables = None
+    if baseline != FULL:
+        base_tables = history.get(baseline)
+        if base_tables is None:
+            return None
+    body = zlib.decompress(data[SNAPSHOT.size:])
+    own = OWN.unpack_from(body)
+    offset = OWN.size
+    tables = {}
+    for section in SECTIONS:
+        tables[section], offset = decode_delta(section, None if base_tables is None else base_tables[section],
+                                               body, offset)
+    return tick, ack, own, tables
+
+
+def encode_input(ack, entries):
+    # entries: (seq, buttons, aim_dx, aim_dy), oldest first
+    return INPUT.pack(b'I', ack, len(entries)) + b''.join(INPUT_ENTRY.pack(*entry) for entry in entries)
+
+
+def decode_input(data):
+    _, ack, count = INPUT.unpack_from(data)
+    return ack, [INPUT_ENTRY.unpack_from(data, INPUT.size + i * INPUT_ENTRY.size) for i in range(count)]
+
+
+def buttons_of(inputs):
+    return sum(1 << bit for bit, name in enumerate(BUTTONS) if getattr(inputs, name))
+
+
+def clamp16(value):
+    return max(-32768, min(32767, int(round(value))))
+
+
+def camera_rect(cx, cy, world_width, world_height, margin=INTEREST_MARGIN):
+    # main.Camera's view around a player center, clamped like Camera.update, grown by margin: (x0, y0, x1, y1)
+    x = max(0, min(cx - VIEW_WIDTH / 2, world_width - VIEW_WIDTH))
+    y = max(0, min(cy - VIEW_HEIGHT / 2, world_height - VIEW_HEIGHT))
+    return x - margin, y - margin, x + VIEW_WIDTH + margin, y + VIEW_HEIGHT + margin
+
+
+class LossyTransport:
+    # Wraps a datagram transport to delay, jitter and drop outgoing packets, for testing on localhost.
+    # latency and jitter are one-way seconds; packets can arrive out of order, like on a real network
+    def __init__(self, transport, loop, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.transport = transport
+        self.loop = loop
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+
+    def sendto(self, data, addr=None):
+        self.sent += 1
+        self.sent_bytes += len(data)
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay <= 0:
+            self._send(data, addr)
+        else:
+            self.loop.call_later(delay, self._send, data, addr)
+
+    def _send(self, data, addr):
+        if not self.transport.is_closing():
+            self.transport.sendto(data, addr)
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,135 @@
+# Firing patterns as data, compiled per level into Volleys that emit straight into a BulletStore
+import math
+
+import numpy as np
+
+from bullets import GREEN, PURPLE, ORANGE, ENEMY, CHILD, SPEEDS, NO_SOURCE
+
+# Fields per_level can scale, and whether they stay whole numbers
+SCALABLE = {'count': True, 'burst': True, 'burst_gap': True, 'spread': False, 'speed': False, 'spin': False,
+            'muzzle': False, 'damage': True}
+
+
+class Volley:
+    # A Pattern at one level: one row per bullet, burst repeats included
+    def __init__(self, kind, offsets, speeds, phases, delays, muzzle, damage, spin):
+        self.kind = kind
+        self.offsets = offsets  # Radians from the aim angle
+        self.speeds = speeds
+        self.phases = phases  # Orange oscillation phases
+        self.delays = delays  # 60 Hz ticks after firing each bullet leaves the muzzle (bursts)
+        self.muzzle = muzzle  # Bullets start this far out along their own angle
+        self.damage = damage
+        self.spin = spin  # Radians the whole volley turns per volley the shooter fired before
+        self.size = len(offsets)
+        self.bursts = [(int(delay), delays == delay) for delay in np.unique(delays)]
+
+    def fire(self, store, x, y, angle, damage=None, fired=0, source=NO_SOURCE, origin_x=None, origin_y=None):
+        # One volley per shooter. x, y, angle (the aim) and the optional damage, fired (volleys the shooter
+        # fired before, for spin), source and origin are scalars or one value per shooter. Returns how
+        # many bullets the store took: the ones its cap let in now, plus burst repeats queued for later
+        shooters = max(np.size(x), np.size(y), np.size(angle))
+        if not shooters or not self.size:
+            return 0
+
+        def per_bullet(value):
+            # Shooter values repeated for each of their bullets, shooter by shooter
+            return np.repeat(np.broadcast_to(value, shooters), self.size)
+        offsets = self.offsets
+        if self.spin:
+            offsets = offsets + self.spin * np.broadcast_to(fired, shooters)[:, None]
+        angles = (np.broadcast_to(angle, shooters)[:, None] + offsets).ravel()
+        x = per_bullet(x)
+        y = per_bullet(y)
+        if self.muzzle:
+            x = x + self.muzzle * np.cos(angles)
+            y = y + self.muzzle * np.sin(angles)
+        columns = (x, y, angles, np.tile(self.speeds, shooters), per_bullet(self.damage if damage is None else damage),
+                   np.tile(self.phases, shooters), x if origin_x is None else per_bullet(origin_x),
+                   y if origin_y is None else per_bullet(origin_y), per_bullet(source))
+        taken = 0
+        for delay, rows in self.bursts:
+            if len(self.bursts) > 1:
+                rows = np.tile(rows, shooters)
+                selected = [column[rows] for column in columns]
+            else:
+                selected = columns
+            # delay is in 60 Hz ticks, the store steps frame_scale of them at a time
+            steps = round(delay / store.frame_scale)
+            added = store.emit(self.kind, *selected, delay=steps)
+            taken += len(added) if steps <= 0 else len(selected[0])
+        return taken
+
+
+class Pattern:
+    # count bullets `spread` radians apart centred on the aim, or at explicit `offsets`, or with ring=True
+    # evenly round the circle starting at the aim. Each later volley turns by `spin` (spirals). burst
+    # repeats the volley that many times, burst_gap 60 Hz ticks apart. phased gives orange bullets evenly
+    # spread oscillation phases. per_level adds that much to a field for every level past base_level,
+    # e.g. {'count': 1} for a bullet more per level
+    def __init__(self, kind, speed=None, count=1, spread=0.0, offsets=None, ring=False, spin=0.0, muzzle=0.0,
+                 damage=1, phased=False, burst=1, burst_gap=0, per_level=None, base_level=1):
+        self.kind = kind
+        self.speed = SPEEDS[kind] if speed is None else speed
+        self.count = count if offsets is None else len(offsets)
+        self.spread = spread
+        self.offsets = offsets
+        self.ring = ring
+        self.spin = spin
+        self.muzzle = muzzle
+        self.damage = damage
+        self.phased = phased
+        self.burst = burst
+        self.burst_gap = burst_gap
+        self.per_level = per_level or {}
+        self.base_level = base_level
+        self.compiled = {}  # level -> Volley
+
+    def at_level(self, level=1):
+        volley = self.compiled.get(level)
+        if volley is None:
+            volley = self.compiled[level] = self.compile(level)
+        return volley
+
+    def compile(self, level=1):
+        fields = {name: getattr(self, name) for name in SCALABLE}
+        for name, step in self.per_level.items():
+            fields[name] += step * max(level - self.base_level, 0)
+            if SCALABLE[name]:
+                fields[name] = int(fields[name])
+        count = fields['count']
+        i = np.arange(count)
+        if self.offsets is not None:
+            offsets = np.array(self.offsets, dtype=np.float64)
+        elif self.ring:
+            offsets = 2 * math.pi * i / count
+        else:
+            offsets = (i - (count - 1) / 2) * fields['spread']
+        phases = i / count if self.phased else np.zeros(count)
+        burst = fields['burst']
+        delays = np.repeat(np.arange(burst) * fields['burst_gap'], count)
+        return Volley(self.kind, np.tile(offsets, burst), np.full(count * burst, float(fields['speed'])),
+                      np.tile(phases, burst), delays, fields['muzzle'], fields['damage'], fields['spin'])
+
+
+def weapon(level):
+    # The player's volley at a weapon level
+    return WEAPON[max(base for base in WEAPON if base <= level)].at_level(level)
+
+
+# The player's weapon: one green shot, a purple three-way, then orange fans one bullet wider and 2 faster
+# per level from 3 on, with their oscillation phases spread out
+WEAPON = {
+    1: Pattern(GREEN),
+    2: Pattern(PURPLE, offsets=(0, 0.2, -0.2)),
+    3: Pattern(ORANGE, count=3, spread=0.2, phased=True, per_level={'count': 1, 'speed': 2}, base_level=3),
+}
+# Boars: a mother's three-way volley and a baby's single shot from just outside its body
+SPREAD = 0.2  # Radians between the three bullets of a mother's volley
+CHILD_MUZZLE = 10
+MOTHER = Pattern(ENEMY, offsets=(0, SPREAD, -SPREAD))
+BABY = Pattern(CHILD, muzzle=CHILD_MUZZLE)
+# Denser patterns for bullet-hell waves (see benchmarks/scenarios.py)
+RING = Pattern(ENEMY, count=24, ring=True)
+SPIRAL = Pattern(ENEMY, count=6, ring=True, spin=0.25)
+BURST = Pattern(ENEMY, count=5, spread=0.15, burst=3, burst_gap=6)
@@ -1,6 +1,9 @@
 import math
 import pygame
 
+from patterns import weapon
+from sprites import RotationCache, ROTATION_STEPS
+
 # Player-specific configurations
 PLAYER_SIZE = 20
 PLAYER_SPEED = 5
@@ -23,10 +26,12 @@ class Player:
         self.shield_radius = 25  # Distance from player
         self.shield_width = 20  # Shield width
         self.shield_height = 40  # Shield height (taller for shield shape)
+        self.shield_sprites = None  # RotationCache, built on first draw
 
-    def move(self, keys):
+    def move(self, keys, scale=1.0):
+        # scale: 60 Hz ticks this move stands for, see Simulation.frame_scale
         speed_boost = 1 + (self.weapon_level - 1) * 0.3
-        speed = self.base_speed * (speed_boost if keys[pygame.K_SPACE] else 1.0)
+        speed = self.base_speed * (speed_boost if keys[pygame.K_SPACE] else 1.0) * scale
         self.toggle_shield(keys)  # Update shield state
         if keys[pygame.K_w] and self.y > 0:
             self.y -= speed
@@ -37,45 +42,36 @@ class Player:
         if keys[pygame.K_d] and self.x < self.world_width - self.size:
             self.x += speed
 
-    def draw(self, camera):
-        pos = camera.apply((self.x, self.y))
-        pygame.draw.rect(pygame.display.get_surface(), PLAYER_COLOR, (pos[0], pos[1], self.size, self.size))
+    def draw(self, camera, surface=None, at=None):
+        # at: world top-left to draw at instead of x, y (e.g. interpolated between ticks)
+        screen = surface or pygame.display.get_surface()
+        pos = camera.apply(at or (self.x, self.y))
+        pygame.draw.rect(screen, PLAYER_COLOR, (pos[0], pos[1], self.size, self.size))
         health_width = (self.size * self.health) // 3
-        pygame.draw.rect(pygame.display.get_surface(), GREEN, (pos[0], pos[1] - 10, health_width, 5))
+        pygame.draw.rect(screen, GREEN, (pos[0], pos[1] - 10, health_width, 5))
+
+    def bounds(self, at=None):
+        # World-space area draw() and draw_shield() can touch
+        x, y = at or (self.x, self.y)
+        rect = pygame.Rect(x, y - 10, max(self.size, (self.size * self.health) // 3), self.size + 10)
+        if self.shield_active:
+            reach = self.shield_radius + self.shield_height
+            rect.union_ip(pygame.Rect(x - reach, y - reach, 2 * reach, 2 * reach))
+        return rect
 
     def get_center(self):
         return (self.x + self.size/2, self.y + self.size/2)
 
-    def shoot_spam(self, mouse_pos, camera):
-        if pygame.key.get_pressed()[pygame.K_SPACE]:
-            world_mx = mouse_pos[0] + camera.x
-            world_my = mouse_pos[1] + camera.y
-            center = self.get_center()
-            dx = world_mx - center[0]
-            dy = world_my - center[1]
-            base_angle = math.atan2(dy, dx)
-            bullets = []
-            if self.weapon_level == 1:
-                bullets.append((center[0], center[1], base_angle))
-            elif self.weapon_level == 2:
-                bullets.extend([
-                    (center[0], center[1], base_angle, 'purple'),
-                    (center[0], center[1], base_angle + 0.2, 'purple'),
-                    (center[0], center[1], base_angle - 0.2, 'purple')
-                ])
-            else:  # Level 3+
-                for i in range(self.weapon_level):
-                    phase = i / self.weapon_level  # Spread phases evenly
-                    angle_offset = (i - (self.weapon_level - 1) / 2) * 0.2  # Spread angles
-                    bullets.append((center[0], center[1], base_angle + angle_offset, 'orange', phase))
-            return bullets
-        return []
-    
-    def get_shield_rect(self, mouse_pos, camera):
+    def shoot(self, store, target):
+        # One volley of the weapon_level pattern (patterns.WEAPON) at target, the aim point in world
+        # coordinates, into a BulletStore; returns the bullets the store took (see BulletStore.limit)
+        cx, cy = self.get_center()
+        return weapon(self.weapon_level).fire(store, cx, cy, math.atan2(target[1] - cy, target[0] - cx))
+
+    def get_shield_rect(self, target):
         if not self.shield_active:
             return None, 0, 0
-        world_mx = mouse_pos[0] + camera.x
-        world_my = mouse_pos[1] + camera.y
+        world_mx, world_my = target
         dx = world_mx - self.x
         dy = world_my - self.y
         angle = math.atan2(dy, dx)
@@ -87,15 +83,39 @@ class Player:
         shield_rect = pygame.Rect(shield_x - self.shield_width/2, shield_y - self.shield_height/2, self.shield_width, self.shield_height)
         return shield_rect, angle_deg, angle
     
-    def draw_shield(self, mouse_pos, camera):
-        shield_rect, angle_deg, angle = self.get_shield_rect(mouse_pos, camera)
-        if shield_rect:
-            screen = pygame.display.get_surface()
+    def get_shield_box(self, target):
+        # The shield as hit tests see it: (center x, center y, width, height, angle), turned like draw_shield
+        # draws it, or None while it's down
+        shield_rect, _, angle = self.get_shield_rect(target)
+        if not shield_rect:
+            return None
+        return (self.x + self.shield_radius * math.cos(angle), self.y + self.shield_radius * math.sin(angle),
+                self.shield_width, self.shield_height, angle)
+
+    def draw_shield(self, target, camera, surface=None, at=None):
+        if not self.shield_active:
+            return
+        x, y = at or (self.x, self.y)
+        angle = math.atan2(target[1] - y, target[0] - x)  # Like get_shield_rect, from where it's drawn
+        screen = surface or pygame.display.get_surface()
+        rotated_shield = self.load_shield_sprites().get(angle)
+        pos = camera.apply((x + self.shield_radius * math.cos(angle), y + self.shield_radius * math.sin(angle)))
+        screen.blit(rotated_shield, (pos[0] - rotated_shield.get_width()/2, pos[1] - rotated_shield.get_height()/2))
+
+    def load_shield_sprites(self, steps=ROTATION_STEPS, prerender=False):
+        if self.shield_sprites is None or self.shield_sprites.steps != steps:
             shield_surface = pygame.Surface((self.shield_width, self.shield_height), pygame.SRCALPHA)
             pygame.draw.rect(shield_surface, (100, 100, 255, 128), (0, 0, self.shield_width, self.shield_height))
-            rotated_shield = pygame.transform.rotate(shield_surface, -angle_deg)
-            pos = camera.apply((self.x + self.shield_radius * math.cos(angle), self.y + self.shield_radius * math.sin(angle)))
-            screen.blit(rotated_shield, (pos[0] - rotated_shield.get_width()/2, pos[1] - rotated_shield.get_height()/2))
+            self.shield_sprites = RotationCache(shield_surface, steps)
+        if prerender:
+            self.shield_sprites.prerender()
+        return self.shield_sprites
+
+    def __getstate__(self):
+        # Surfaces don't pickle; replay keyframes rebuild the shield sprites on first draw
+        state = self.__dict__.copy()
+        state['shield_sprites'] = None
+        return state
 
     def take_damage(self, damage=1):
         self.health -= damage  # Reduce health by damage amount (default 1)
@@ -0,0 +1,100 @@
+# Progressive asset loading for the browser build: critical assets behind a progress screen, the rest
+# one per frame with placeholders until then
+import os
+import sys
+import time
+import shutil
+import asyncio
+import urllib.request
+
+import pygame
+
+from text import text_cache
+
+DOWNLOAD_DIR = os.path.join('.asset_cache', 'downloads')
+PROGRESS_BACKGROUND = (20, 24, 20)
+PROGRESS_COLOR = (0, 255, 0)
+PROGRESS_OUTLINE = (50, 50, 50)
+PROGRESS_TEXT = (230, 230, 230)
+
+
+class Preloader:
+    # items are (priority, path, size, alpha, critical); critical ones load first, then by priority.
+    # With base_url, each file is downloaded (in a worker thread) before it is decoded; this is for
+    # desktop testing against a slow server, the pygbag bundle already has the files locally
+    def __init__(self, manager, items, base_url=None, download_dir=DOWNLOAD_DIR):
+        self.manager = manager
+        self.items = sorted(items, key=lambda item: (not item[4], item[0]))
+        self.base_url = None if sys.platform == 'emscripten' else base_url
+        self.download_dir = download_dir
+        self.loaded = 0
+        self.current = None  # Path being fetched or decoded, for the progress screen
+        self.started = time.perf_counter()
+        self.interactive_at = None  # Seconds from start until every critical item was loaded
+        self.finished_at = None
+        self.downloaded = set()
+        for _, path, size, alpha, _ in self.items:
+            manager.defer(path, size, alpha)
+
+    @property
+    def total(self):
+        return len(self.items)
+
+    @property
+    def critical(self):
+        return sum(1 for item in self.items if item[4])
+
+    @property
+    def done(self):
+        return self.loaded == self.total
+
+    def progress(self):
+        # Fraction of the critical items loaded, which is what the progress screen waits for
+        return min(self.loaded / self.critical, 1.0) if self.critical else 1.0
+
+    def _download(self, path):
+        target = os.path.join(self.download_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(f"{self.base_url.rstrip('/')}/{path}") as response, open(target + '.part', 'wb') as f:
+            shutil.copyfileobj(response, f)
+        os.replace(target + '.part', target)
+        return target
+
+    async def _load(self, item):
+        _, path, size, alpha, _ = item
+        self.current = path
+        if self.base_url and path not in self.downloaded:
+            self.manager.sources[path] = await asyncio.to_thread(self._download, path)
+            self.downloaded.add(path)
+        self.manager.resolve(path, size, alpha)
+        self.loaded += 1
+        await asyncio.sleep(0)  # Let the browser paint between items
+
+    async def load_critical(self):
+        for item in self.items[self.loaded:self.critical]:
+            await self._load(item)
+        self.interactive_at = time.perf_counter() - self.started
+
+    async def load_rest(self):
+        for item in self.items[self.loaded:]:
+            await self._load(item)
+        self.current = None
+        self.finished_at = time.perf_counter() - self.started
+
+    async def load_all(self):
+        await self.load_critical()
+        await self.load_rest()
+
+
+def draw_progress(surface, fraction, label=None):
+    surface.fill(PROGRESS_BACKGROUND)
+    width, height = surface.get_size()
+    bar = pygame.Rect(0, 0, width // 3, 24)
+    bar.center = (width // 2, height // 2)
+    pygame.draw.rect(surface, PROGRESS_OUTLINE, bar.inflate(4, 4), 2)
+    pygame.draw.rect(surface, PROGRESS_COLOR, (bar.x, bar.y, int(bar.width * fraction), bar.height))
+    title = text_cache.render(f"Loading {int(fraction * 100)}%", 36, PROGRESS_TEXT)
+    surface.blit(title, title.get_rect(midbottom=(width // 2, bar.y - 12)))
+    if label:
+        detail = text_cache.render(label, 24, PROGRESS_TEXT)
+        surface.blit(detail, detail.get_rect(midtop=(width // 2, bar.bottom + 12)))
@@ -0,0 +1,195 @@
+# Per-phase frame timing for game_loop; simulation phase times come through the FrameSnapshots
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from text import text_cache
+
+# Simulation methods step() calls, in order; each is timed on its own when profiling
+SIM_PHASES = ('spawn_waves', 'handle_clicks', 'move_player', 'fire', 'move_enemies', 'enemies_shoot', 'resolve_projectiles',
+              'index_entities', 'pickup_drops', 'resolve_enemy_bullets', 'resolve_child_bullets', 'update_effects')
+# lap() names used by game_loop, in frame order
+LOOP_PHASES = ('events', 'step', 'camera', 'background', 'world', 'hud', 'overlay', 'present', 'wait')
+COUNTS = ('projectiles', 'enemy_bullets', 'child_bullets', 'enemies', 'babies', 'collision_tests')
+# From the game loop's FixedTimestep: ticks run this frame, then running totals of skipped frames and lag
+TIMESTEP_COUNTS = ('ticks', 'skipped_frames', 'sim_lag_ms')
+COLUMNS = ('frame', 'tick', 'frame_ms') + tuple(f'{p}_ms' for p in LOOP_PHASES + SIM_PHASES) + COUNTS + TIMESTEP_COUNTS
+
+ROLLING_WINDOW = 300  # Frames behind the overlay percentiles (5 s at 60 FPS)
+OVERLAY_REFRESH = 15  # Frames between overlay text updates, so the numbers are readable
+OVERLAY_FONT_SIZE = 22
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+class PhaseTimer:
+    # Running totals of seconds spent in each of a Simulation's SIM_PHASES, kept by wrapping them on the
+    # instance. Only the thread that steps the Simulation may attach or detach it
+    def __init__(self):
+        self.totals = dict.fromkeys(SIM_PHASES, 0.0)
+        self.sim = None
+
+    def attach(self, sim):
+        self.detach()
+        self.sim = sim
+        for name in SIM_PHASES:
+            setattr(sim, name, self._timed(name, getattr(type(sim), name).__get__(sim)))
+
+    def detach(self):
+        if self.sim is not None:
+            for name in SIM_PHASES:
+                self.sim.__dict__.pop(name, None)
+            self.sim = None
+
+    def _timed(self, name, fn):
+        totals = self.totals
+
+        def timed(*args):
+            start = time.perf_counter()
+            result = fn(*args)
+            totals[name] += time.perf_counter() - start
+            return result
+        return timed
+
+
+class FrameProfiler:
+    # export=True keeps every frame's record for export(); otherwise only the last window of them
+    def __init__(self, enabled=False, window=ROLLING_WINDOW, export=False):
+        self.enabled = False
+        self.overlay = False
+        self.runner = None
+        self.exporting = export
+        self.records = [] if export else deque(maxlen=window)  # One row per profiled frame, in COLUMNS order
+        self.frame_times = deque(maxlen=window)
+        self.phase_times = {name: deque(maxlen=window) for name in LOOP_PHASES + SIM_PHASES}
+        self.current = {}  # Loop phase times this frame
+        self.frames = 0
+        self.frame_start = 0.0
+        self.last = 0.0
+        self.before = None  # (phase totals, collision tests, ticks) of the snapshot the last record was built from
+        self.overlay_lines = []
+        self.enable(enabled)
+
+    def attach(self, runner):
+        # Profile the Simulation a snapshot.SimulationThread steps; call again after a restart creates a
+        # new one
+        if self.runner is not None:
+            self.runner.profile(False)
+        self.runner = runner
+        self.before = None
+        runner.profile(self.enabled)
+
+    def enable(self, flag=True):
+        if flag == self.enabled:
+            return
+        self.enabled = flag
+        self.before = None
+        if self.runner is not None:
+            self.runner.profile(flag)
+
+    def toggle_overlay(self):
+        # The overlay needs samples, so showing it turns profiling on; hiding it turns it off again unless
+        # the records are being kept for export
+        self.overlay = not self.overlay
+        self.enable(self.overlay or self.exporting)
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.current.clear()
+        self.frame_start = self.last = time.perf_counter()
+
+    def lap(self, name):
+        # Charge the time since the previous lap (or begin_frame) to `name`
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self.last
+        self.last = now
+
+    def end_frame(self, snapshot):
+        # snapshot: the FrameSnapshot this frame drew. Its simulation phase times, collision tests and
+        # ticks are charged to the frame as far as they are past those of the previous frame's snapshot
+        if not self.enabled or not self.frame_start:
+            return
+        frame_time = time.perf_counter() - self.frame_start
+        current = dict(self.current)
+        totals = snapshot.phase_totals
+        now = (totals, snapshot.collision_tests, snapshot.ticks)
+        before = self.before or now
+        for name in SIM_PHASES:
+            current[name] = totals.get(name, 0.0) - before[0].get(name, 0.0)
+        self.before = now
+        self.frame_times.append(frame_time)
+        for name, values in self.phase_times.items():
+            values.append(current.get(name, 0.0))
+        row = [self.frames, snapshot.tick, frame_time * 1000]
+        row.extend(current.get(name, 0.0) * 1000 for name in LOOP_PHASES + SIM_PHASES)
+        boars = snapshot.boars
+        row.extend((len(snapshot.projectiles), len(snapshot.enemy_bullets), len(snapshot.child_bullets),
+                    int(np.count_nonzero(boars.adults())), int(np.count_nonzero(boars.babies())),
+                    snapshot.collision_tests - before[1]))
+        row.extend((snapshot.ticks - before[2], snapshot.skipped_frames, snapshot.lag * 1000))
+        self.records.append(row)
+        self.frames += 1
+        self.frame_start = 0.0
+
+    def percentiles(self, values=None):
+        # p50/p95/p99 in milliseconds of the rolling frame times, or of `values`
+        values = self.frame_times if values is None else values
+        if not values:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        p50, p95, p99 = np.percentile(np.fromiter(values, float, len(values)) * 1000, (50, 95, 99))
+        return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99)}
+
+    def summary(self):
+        result = {'frames': self.frames, 'frame': self.percentiles()}
+        for name, values in self.phase_times.items():
+            result[name] = self.percentiles(values)
+        return result
+
+    def draw_overlay(self, surface):
+        # Rolling percentiles plus the slowest phases; returns the screen rects it touched
+        if not self.overlay:
+            return []
+        if not self.overlay_lines or self.frames % OVERLAY_REFRESH == 0:
+            self._update_overlay()
+        lines = [text_cache.render(line, OVERLAY_FONT_SIZE, OVERLAY_COLOR) for line in self.overlay_lines]
+        width = max(line.get_width() for line in lines) + 12
+        height = sum(line.get_height() for line in lines) + 12
+        rect = pygame.Rect(10, surface.get_height() - height - 10, width, height)
+        surface.fill(OVERLAY_BACKGROUND, rect)
+        top = rect.y + 6
+        for line in lines:
+            surface.blit(line, (rect.x + 6, top))
+            top += line.get_height()
+        return [rect]
+
+    def _update_overlay(self):
+        frame = self.percentiles()
+        lines = [f"frame  p50 {frame['p50']:5.2f}  p95 {frame['p95']:5.2f}  p99 {frame['p99']:5.2f} ms"]
+        means = {name: sum(values) / len(values) for name, values in self.phase_times.items() if values}
+        for name in sorted(means, key=means.get, reverse=True)[:6]:
+            p = self.percentiles(self.phase_times[name])
+            lines.append(f"{name:22s} p50 {p['p50']:5.2f}  p95 {p['p95']:5.2f}  p99 {p['p99']:5.2f}")
+        if self.records:
+            counts = self.records[-1][-len(COUNTS + TIMESTEP_COUNTS):]
+            lines.append("  ".join(f"{name} {value}" for name, value in zip(COUNTS, counts)))
+            ticks, skipped, lag = counts[len(COUNTS):]
+            lines.append(f"ticks {ticks}  skipped_frames {skipped}  sim_lag {lag:.0f} ms")
+        self.overlay_lines = lines
+
+    def export(self, path):
+        # .json writes the summary plus every record; anything else is CSV, one row per frame
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'columns': COLUMNS, 'summary': self.summary(), 'records': list(self.records)}, f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(self.records)
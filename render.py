@@ -0,0 +1,164 @@
+import numpy as np
+import pygame
+
+
+class SpriteBatch:
+    # (surface, screen position) pairs collected per layer and submitted with one blits call each
+    def __init__(self):
+        self.layers = {}  # Layer name -> pairs; dict order is submission order
+        self.calls = 0
+        self.sprites = 0
+
+    def extend(self, layer, pairs):
+        self.layers.setdefault(layer, []).extend(pairs)
+
+    def add(self, layer, surface, pos):
+        self.layers.setdefault(layer, []).append((surface, pos))
+
+    def flush(self, target):
+        fblits = getattr(target, 'fblits', None)  # pygame-ce's faster variant
+        for pairs in self.layers.values():
+            if not pairs:
+                continue
+            if fblits:
+                fblits(pairs)
+            else:
+                target.blits(pairs, False)
+            self.calls += 1
+            self.sprites += len(pairs)
+        self.layers = {}
+
+
+class Renderer:
+    # Draws only what the camera can see, and in dirty-rect mode only pushes what changed
+    def __init__(self, screen, background, dirty_rects=False):
+        self.screen = screen
+        self.background = background
+        self.dirty_rects = dirty_rects
+        self.view = pygame.Rect(0, 0, screen.get_width(), screen.get_height())
+        self.last_camera = None
+        self.full_redraw = True
+        self.dirty = []  # Screen rects touched this frame
+        self.batch = SpriteBatch()
+        self.previous_dirty = []
+        self.drawn = 0  # Per-frame counters, reset by begin()
+        self.culled = 0
+
+    def set_background(self, background):
+        self.background = background
+        self.last_camera = None  # Forces a full redraw next frame
+
+    def begin(self, camera):
+        self.view.topleft = (camera.x, camera.y)
+        self.drawn = 0
+        self.culled = 0
+        self.dirty = []
+        self.batch.calls = 0
+        self.batch.sprites = 0
+        # Any camera movement shifts the whole picture, so only a still camera can go partial
+        self.full_redraw = not self.dirty_rects or (camera.x, camera.y) != self.last_camera
+        self.last_camera = (camera.x, camera.y)
+        if not isinstance(self.background, pygame.Surface):
+            self.background.update(self.view)  # world.ChunkedBackground: pin and prefetch chunks
+        self.draw_background(camera)
+
+    def draw_background(self, camera):
+        # background is a world-sized Surface or a world.ChunkedBackground with the same blit contract
+        blit = self.screen.blit if isinstance(self.background, pygame.Surface) else self._blit_chunks
+        if self.full_redraw:
+            # The camera is clamped to the world, so the visible area is always inside the background
+            blit(self.background, (0, 0), self.view)
+        else:
+            for rect in self.previous_dirty:
+                blit(self.background, rect.topleft, rect.move(camera.x, camera.y))
+
+    def _blit_chunks(self, background, dest, area):
+        background.blit_area(self.screen, dest, area)
+
+    def draw(self, entity, camera, at=None):
+        # at: world top-left to draw the entity at instead of its own (entities that take one, the player)
+        bounds = entity.bounds() if at is None else entity.bounds(at)
+        if not self.view.colliderect(bounds):
+            self.culled += 1
+            return
+        if at is None:
+            entity.draw(camera, self.screen)
+        else:
+            entity.draw(camera, self.screen, at)
+        self.drawn += 1
+        self.dirty.append(bounds.move(-camera.x, -camera.y))
+
+    def draw_all(self, entities, camera):
+        for entity in entities:
+            self.draw(entity, camera)
+
+    def draw_store(self, store, camera, kind, select=None, alpha=1.0):
+        # Cull a whole entity store (BulletStore, BoarStore, or their snapshots) against the view in one
+        # test, then queue its sprites as one layer. kind is the view class; kind.batch_sprites(store, idx)
+        # gives surfaces and world top-lefts. select masks slots [0, count) to draw, the live ones by
+        # default. alpha below 1 draws that far along the step from store.previous() to the current positions
+        n = store.count
+        x = store.x[:n]
+        y = store.y[:n]
+        if alpha < 1:
+            last_x, last_y = store.previous()
+            shift_x = (last_x - x) * (1 - alpha)
+            shift_y = (last_y - y) * (1 - alpha)
+            x = x + shift_x
+            y = y + shift_y
+        extent = kind.DRAW_EXTENT
+        view = self.view
+        alive = store.alive[:n] if select is None else select
+        visible = alive & (x > view.left - extent) & (x < view.right + extent) & (y > view.top - extent) & (y < view.bottom + extent)
+        idx = np.flatnonzero(visible)
+        self.culled += int(np.count_nonzero(alive)) - len(idx)
+        self.drawn += len(idx)
+        if not len(idx):
+            return
+        surfaces, left, top = kind.batch_sprites(store, idx)
+        if alpha < 1:
+            # batch_sprites may give several sprites per slot, one group after another (bodies, then bars)
+            repeat = len(left) // len(idx)
+            left = left + np.tile(shift_x[idx], repeat)
+            top = top + np.tile(shift_y[idx], repeat)
+        # Camera offset applied to the whole column at once; int() matches the old per-sprite blits
+        sx = (left - camera.x).astype(np.intp).tolist()
+        sy = (top - camera.y).astype(np.intp).tolist()
+        self.batch.extend(kind.__name__, zip(surfaces, zip(sx, sy)))
+        if self.dirty_rects:
+            self.dirty.extend(pygame.Rect(p, s.get_size()) for s, p in zip(surfaces, zip(sx, sy)))
+
+    def draw_sprites(self, layer, entities, camera):
+        # Queue entities that draw as one sprite; entity.sprite() gives (surface, world top-left)
+        view = self.view
+        pairs = []
+        for entity in entities:
+            surface, (wx, wy) = entity.sprite()
+            w, h = surface.get_size()
+            if wx + w <= view.left or wx >= view.right or wy + h <= view.top or wy >= view.bottom:
+                self.culled += 1
+                continue
+            pairs.append((surface, (int(wx - camera.x), int(wy - camera.y))))
+        self.drawn += len(pairs)
+        self.batch.extend(layer, pairs)
+        if self.dirty_rects:
+            self.dirty.extend(pygame.Rect(p, s.get_size()) for s, p in pairs)
+
+    def flush(self):
+        # Submit queued layers; call before drawing anything that must appear on top of them
+        self.batch.flush(self.screen)
+
+    def add_dirty(self, rects):
+        # Screen-space areas drawn outside draw()/draw_store(), e.g. the HUD
+        self.dirty.extend(rects)
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous_dirty + self.dirty)
+        self.previous_dirty = self.dirty
+
+    def stats(self):
+        return {'drawn': self.drawn, 'culled': self.culled, 'full_redraw': self.full_redraw, 'dirty_rects': len(self.dirty),
+                'blit_calls': self.batch.calls, 'batched_sprites': self.batch.sprites}
@@ -0,0 +1,281 @@
+# Session recording and playback with keyframes for seeking: python replay.py session.bhr [--seek N --render].
+# Keyframes are pickles, so only play back replays you trust
+import os
+import sys
+import time
+import zlib
+import pickle
+import struct
+import argparse
+
+import numpy as np
+
+from simulation import FrameInput
+
+MAGIC = b'BHRP'
+VERSION = 1
+KEYFRAME_INTERVAL = 600  # Ticks per block; a seek re-simulates at most this many ticks
+COMPRESSION_LEVEL = 6
+
+HEADER = struct.Struct('<4sHBBqHI')  # magic, version, compressed, has_seed, seed, tick rate, keyframe interval
+BLOCK = struct.Struct('<III')  # start tick, tick count, payload size
+KEYFRAME = struct.Struct('<I')
+INPUT = struct.Struct('<BffB')  # key bits, aim x, aim y, click count
+CLICK = struct.Struct('<ff')
+
+# Key bits of an input record
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
+FIRE = 16
+SHIELD = 32
+
+
+class ReplayError(Exception):
+    pass
+
+
+def encode_input(inputs):
+    bits = ((UP if inputs.up else 0) | (DOWN if inputs.down else 0) | (LEFT if inputs.left else 0)
+            | (RIGHT if inputs.right else 0) | (FIRE if inputs.fire else 0) | (SHIELD if inputs.shield else 0))
+    clicks = inputs.clicks[:255]
+    return INPUT.pack(bits, inputs.aim[0], inputs.aim[1], len(clicks)) + b''.join(CLICK.pack(*c) for c in clicks)
+
+
+def decode_input(data, offset):
+    # Returns the FrameInput at offset and the offset of the next record
+    bits, ax, ay, count = INPUT.unpack_from(data, offset)
+    offset += INPUT.size
+    clicks = [CLICK.unpack_from(data, offset + i * CLICK.size) for i in range(count)]
+    offset += count * CLICK.size
+    return FrameInput(up=bool(bits & UP), down=bool(bits & DOWN), left=bool(bits & LEFT), right=bool(bits & RIGHT),
+                      fire=bool(bits & FIRE), shield=bool(bits & SHIELD), aim=(ax, ay), clicks=clicks), offset
+
+
+def boar_digest(boars):
+    live = np.flatnonzero(boars.alive[:boars.count])
+    return (len(live), float(np.sum(boars.x[live])), float(np.sum(boars.y[live])), int(np.sum(boars.health[live])),
+            tuple(live.tolist()))
+
+
+def state_digest(sim):
+    # Cheap fingerprint of a Simulation for desync checks between a replayed state and a keyframe
+    stores = (sim.projectiles, sim.enemy_bullets, sim.child_bullets)
+    return (sim.tick, sim.exp, sim.damage_taken, sim.bullets_shot, sim.player.x, sim.player.y, sim.player.health,
+            boar_digest(sim.boars),
+            tuple(len(s) for s in stores), tuple(float(np.sum(s.x[:s.count])) for s in stores),
+            sim.rng.getstate())
+
+
+class ReplayRecorder:
+    # Appends each tick's input; blocks are written as they fill, so memory stays at one block
+    def __init__(self, path, sim, keyframe_interval=KEYFRAME_INTERVAL, compress=True):
+        self.file = open(path, 'wb')
+        self.sim = sim
+        self.keyframe_interval = keyframe_interval
+        self.compress = compress
+        self.block = []
+        self.block_start = 0
+        self.keyframe = None
+        self.ticks = 0
+        seed = sim.seed if isinstance(sim.seed, int) and -2 ** 63 <= sim.seed < 2 ** 63 else 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, compress, seed == sim.seed, seed, sim.tick_rate, keyframe_interval))
+
+    def record(self, inputs):
+        # Call right before sim.step(); step with the returned input, which carries aim and clicks
+        # at the stored float32 precision so the live game and its replay see identical values
+        if not self.block:
+            self.block_start = self.sim.tick
+            self.keyframe = pickle.dumps(self.sim, pickle.HIGHEST_PROTOCOL)
+        record = encode_input(inputs)
+        self.block.append(record)
+        self.ticks += 1
+        if len(self.block) >= self.keyframe_interval:
+            self.flush()
+        return decode_input(record, 0)[0]
+
+    def flush(self):
+        if not self.block:
+            return
+        payload = KEYFRAME.pack(len(self.keyframe)) + self.keyframe + b''.join(self.block)
+        if self.compress:
+            payload = zlib.compress(payload, COMPRESSION_LEVEL)
+        self.file.write(BLOCK.pack(self.block_start, len(self.block), len(payload)))
+        self.file.write(payload)
+        self.file.flush()
+        self.block = []
+        self.keyframe = None
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Replay:
+    # Reads block headers up front (payloads stay on disk) and decodes one block at a time
+    def __init__(self, path):
+        self.path = path
+        self.blocks = []  # (start tick, tick count, payload offset, payload size)
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ReplayError(f"{path}: not a replay")
+            magic, version, compressed, has_seed, seed, tick_rate, interval = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ReplayError(f"{path}: not a replay")
+            if version != VERSION:
+                raise ReplayError(f"{path}: replay version {version}, expected {VERSION}")
+            self.compressed = bool(compressed)
+            self.seed = seed if has_seed else None
+            self.tick_rate = tick_rate
+            self.keyframe_interval = interval
+            offset = HEADER.size
+            size = os.path.getsize(path)
+            while offset + BLOCK.size <= size:
+                f.seek(offset)
+                start, ticks, payload_size = BLOCK.unpack(f.read(BLOCK.size))
+                offset += BLOCK.size
+                if offset + payload_size > size:
+                    break  # Truncated last block, e.g. the game was killed mid-write
+                self.blocks.append((start, ticks, offset, payload_size))
+                offset += payload_size
+        self.start_tick = self.blocks[0][0] if self.blocks else 0
+        self.end_tick = self.blocks[-1][0] + self.blocks[-1][1] if self.blocks else 0
+
+    @property
+    def ticks(self):
+        return self.end_tick - self.start_tick
+
+    def read_block(self, i):
+        # Returns (keyframe Simulation, list of FrameInputs) for block i
+        start, ticks, offset, size = self.blocks[i]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            payload = f.read(size)
+        if self.compressed:
+            payload = zlib.decompress(payload)
+        (keyframe_size,) = KEYFRAME.unpack_from(payload, 0)
+        pos = KEYFRAME.size + keyframe_size
+        sim = pickle.loads(payload[KEYFRAME.size:pos])
+        inputs = []
+        for _ in range(ticks):
+            frame, pos = decode_input(payload, pos)
+            inputs.append(frame)
+        return sim, inputs
+
+    def block_for(self, tick):
+        if not self.start_tick <= tick <= self.end_tick:
+            raise ReplayError(f"tick {tick} outside replay [{self.start_tick}, {self.end_tick}]")
+        for i in range(len(self.blocks) - 1, -1, -1):
+            if self.blocks[i][0] <= tick:
+                return i
+        return 0
+
+    def seek(self, tick):
+        # Simulation as it was right before tick `tick` was stepped
+        i = self.block_for(tick)
+        sim, inputs = self.read_block(i)
+        for frame in inputs[:tick - sim.tick]:
+            sim.step(frame)
+        return sim
+
+    def play(self, tick=None, end=None, verify=False):
+        # Yields (sim, input) after each replayed step, from `tick` (default: start) up to `end`.
+        # With verify, the running state is checked against each later keyframe it reaches
+        tick = self.start_tick if tick is None else tick
+        end = self.end_tick if end is None else min(end, self.end_tick)
+        i = self.block_for(tick)
+        sim, inputs = self.read_block(i)
+        skip = tick - sim.tick
+        for frame in inputs[:skip]:
+            sim.step(frame)
+        while sim.tick < end:
+            for frame in inputs[skip:]:
+                if sim.tick >= end:
+                    return
+                sim.step(frame)
+                yield sim, frame
+            skip = 0
+            i += 1
+            if i >= len(self.blocks):
+                return
+            keyframe, inputs = self.read_block(i)
+            if verify and state_digest(keyframe) != state_digest(sim):
+                raise ReplayError(f"desync at tick {sim.tick}")
+
+
+def play_headless(replay, tick, end, verify):
+    sim = None
+    steps = 0
+    start = time.perf_counter()
+    for sim, _ in replay.play(tick, end, verify):
+        steps += 1
+    return sim, steps, time.perf_counter() - start
+
+
+def play_rendered(replay, tick, end, speed, verify):
+    # Draws every replayed tick with the game's own renderer; speed 0 is uncapped
+    import pygame
+    import main
+    from render import Renderer
+
+    main.load_assets()
+    renderer = Renderer(main.screen, main.world_background(), dirty_rects=main.DIRTY_RECTS)
+    clock = pygame.time.Clock()
+    camera = None
+    sim = None
+    steps = 0
+    start = time.perf_counter()
+    for sim, frame in replay.play(tick, end, verify):
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        if camera is None:
+            camera = main.Camera(sim.player)
+        camera.update(sim.player)
+        renderer.begin(camera)
+        main.draw_world(renderer, sim, camera, frame.aim)
+        renderer.add_dirty(main.draw_hud(main.screen, sim))
+        renderer.present()
+        steps += 1
+        if speed > 0:
+            clock.tick(replay.tick_rate * speed)
+    return sim, steps, time.perf_counter() - start
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate a recorded session")
+    parser.add_argument('path')
+    parser.add_argument('--seek', type=int, help="Start from this tick")
+    parser.add_argument('--until', type=int, help="Stop at this tick")
+    parser.add_argument('--render', action='store_true', help="Draw playback in a window")
+    parser.add_argument('--speed', type=float, default=1.0, help="Playback speed with --render; 0 is uncapped")
+    parser.add_argument('--verify', action='store_true', help="Check the replayed state against every keyframe")
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.path)
+    print(f"{args.path}: seed {replay.seed}, ticks {replay.start_tick}-{replay.end_tick}, {len(replay.blocks)} blocks, "
+          f"{os.path.getsize(args.path) / max(replay.ticks, 1):.2f} bytes/tick", file=sys.stderr)
+    if args.render:
+        sim, steps, elapsed = play_rendered(replay, args.seek, args.until, args.speed, args.verify)
+    else:
+        sim, steps, elapsed = play_headless(replay, args.seek, args.until, args.verify)
+    if sim is None:
+        print("nothing to play", file=sys.stderr)
+        return 1
+    print(f"{steps} ticks in {elapsed:.2f} s ({steps / max(elapsed, 1e-9):.0f} ticks/s); final tick {sim.tick}, "
+          f"exp {sim.exp}, health {sim.player.health}, damage taken {sim.damage_taken}, "
+          f"{'won' if sim.game_won else 'lost' if sim.game_lost else 'running'}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,386 @@
+# Authoritative co-op server over UDP (wire format in netcode.py):
+#   python server.py --port 7777 --tick-rate 30
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import deque
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # The server never opens a window
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+
+import netcode
+from boars import NO_PARENT, CHARGE, REST
+from player import Player
+from simulation import Simulation, FrameInput, GREEN, WORLD_WIDTH, WORLD_HEIGHT
+from timestep import FixedTimestep
+from world import WAKE_CHUNKS
+
+TICK_RATE = 30  # Server ticks per second; the simulation sweeps hits, so this only costs smoothness
+PORT = 7777
+MAX_QUEUED_INPUTS = 4  # Inputs a client can be ahead by; older ones are dropped to bound its latency
+TIMEOUT = 5.0  # Seconds without a packet before a client is dropped
+SPAWN_SPACING = 40  # Players join side by side at the usual spawn point
+IDLE = FrameInput()
+
+
+class CoopSimulation(Simulation):
+    # Simulation with a player per client. Per-player rules (clicks, movement, fire, pickups, hits) run
+    # once per standing player with self.player and self.spam_timer swapped in; boars go after whichever
+    # standing player is nearest. Exp is shared, a kill heals everyone, and the game is lost when nobody
+    # is left standing
+    def __init__(self, *args, **kwargs):
+        self.players = {}  # pid -> Player, in join order
+        self.spam_timers = {}
+        self.downed = set()  # pids
+        self.drop_serial = 0  # Drops get ids for snapshots
+        super().__init__(*args, **kwargs)
+        self.player = None
+
+    def add_player(self, pid, x=None, y=None):
+        if x is None:
+            x = self.world_width//2 + (len(self.players) % 9 - 4) * SPAWN_SPACING
+            y = self.world_height - 100
+        player = self.players[pid] = self.player = Player(x, y, self.world_width, self.world_height)
+        self.spam_timers[pid] = 0
+        return player
+
+    def remove_player(self, pid):
+        del self.players[pid]
+        del self.spam_timers[pid]
+        self.downed.discard(pid)
+
+    def standing(self):
+        return [(pid, player) for pid, player in self.players.items() if pid not in self.downed]
+
+    def targets(self):
+        return [player for _, player in self.standing()]
+
+    @property
+    def over(self):
+        return self.game_won or self.game_lost or not self.standing()
+
+    def step(self, inputs):
+        # inputs: pid -> FrameInput for this tick; standing players without one stand still
+        if not self.over:
+            self.spawn_waves()
+            standing = self.standing()
+            for pid, player in standing:
+                frame = inputs.get(pid, IDLE)
+                self.player = player
+                self.spam_timer = self.spam_timers[pid]
+                self.handle_clicks(frame)
+                self.move_player(frame)
+                self.fire(frame)
+                self.spam_timers[pid] = self.spam_timer
+            self.move_enemies()
+            self.enemies_shoot()
+            self.resolve_projectiles()
+            self.index_entities()
+            self.enemy_bullets.step()
+            self.enemy_bullets.index_into(self.enemy_bullet_grid)
+            self.child_bullets.step()
+            self.child_bullets.index_into(self.child_bullet_grid)
+            for pid, player in standing:
+                aim = inputs.get(pid, IDLE).aim
+                self.player = player
+                self.pickup_drops()
+                self.enemy_bullets_hit(player, aim)
+                self.child_bullets_hit(player, aim)
+        self.update_effects()
+        self.tick += 1
+
+    def wake_enemies(self):
+        # Awake near any standing player
+        boars = self.boars
+        awake = np.zeros(boars.count, dtype=bool)
+        for player in self.targets():
+            boars.wake(*player.get_center(), self.chunk_size, self.wake_chunks)
+            awake |= boars.awake[:boars.count]
+        boars.awake[:boars.count] = awake
+
+    def reward_kill(self, slot):
+        self.exp += 100
+        for _, player in self.standing():
+            player.health += 1
+            self.add_damage_text("+1", GREEN, player)
+        drop = self.boars.views[slot].spawn_drop()
+        if drop:
+            drop.serial = self.drop_serial
+            self.drop_serial += 1
+            self.lifecycle.admit('drops', self.drops, drop, self.tick)
+
+    def player_down(self, player):
+        self.downed.update(pid for pid, p in self.players.items() if p is player)
+        self.game_lost = not self.standing()
+
+
+class WorldTables:
+    # Every section of the world quantized once per tick (netcode.SECTIONS), plus float positions to cut
+    # each client's view out of them
+    def __init__(self, sim):
+        tick = sim.tick
+        players = sim.players
+        pids = np.array(list(players), dtype=np.int64)
+        flags = [(p.shield_active and netcode.SHIELD) | (pid in sim.downed and netcode.DOWN) for pid, p in players.items()]
+        self.players = self._section('players', pids, [
+            [p.x for p in players.values()], [p.y for p in players.values()],
+            [p.health for p in players.values()], [p.weapon_level for p in players.values()], flags])
+
+        boars = sim.boars
+        live = np.flatnonzero(boars.alive[:boars.count])
+        state = boars.state[live]
+        flags = (state | boars.flip[live] * netcode.FLIP | boars.is_mother[live] * netcode.MOTHER
+                 | (boars.parent[live] != NO_PARENT) * netcode.BABY
+                 | (boars.damage_boost[live] & ((state == CHARGE) | (state == REST))) * netcode.BOOSTED)
+        self.boars = self._section('boars', live, [boars.x[live], boars.y[live], boars.health[live],
+                                                   boars.size[live], flags])
+
+        self.projectiles = self._bullets('projectiles', sim.projectiles, tick)
+        self.enemy_bullets = self._bullets('enemy_bullets', sim.enemy_bullets, tick)
+        self.child_bullets = self._bullets('child_bullets', sim.child_bullets, tick)
+
+        drops = sim.drops
+        self.drops = self._section('drops', [drop.serial for drop in drops],
+                                   [[drop.x for drop in drops], [drop.y for drop in drops]])
+
+    def _section(self, section, ids, columns, x=None, y=None):
+        # (rows sorted by id, x, y): x and y are where each row is now, the first two fields by default
+        fields = netcode.SECTIONS[section]
+        rows = np.empty((len(ids), len(fields) + 1), dtype=np.int32)
+        rows[:, 0] = ids
+        for j, (name, column) in enumerate(zip(fields, columns), 1):
+            rows[:, j] = netcode.quantize(name, column)
+        order = np.argsort(rows[:, 0], kind='stable')
+        x = np.asarray(columns[0] if x is None else x, dtype=np.float64)
+        y = np.asarray(columns[1] if y is None else y, dtype=np.float64)
+        return rows[order], x[order], y[order]
+
+    def _bullets(self, section, store, tick):
+        # Straight bullets as their trajectory; numeric ones restart it every tick
+        live = np.flatnonzero(store.alive[:store.count])
+        numeric = store.numeric[live]
+        x = store.x[live]
+        y = store.y[live]
+        start = np.where(numeric, tick, tick - (store.tick - store.t0[live]))
+        return self._section(section, store.serial[live], [
+            np.where(numeric, x, store.x0[live]), np.where(numeric, y, store.y0[live]),
+            store.vx[live], store.vy[live], start, store.kind[live], store.damage[live]], x, y)
+
+    def view(self, rect, pid):
+        # section -> rows near rect, leaving out the player pid itself
+        x0, y0, x1, y1 = rect
+        tables = {}
+        for section in netcode.SECTIONS:
+            rows, x, y = getattr(self, section)
+            near = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+            if section == 'players':
+                near &= rows[:, 0] != pid
+            tables[section] = rows[near]
+        return tables
+
+
+class Client:
+    def __init__(self, pid, addr, now):
+        self.pid = pid
+        self.addr = addr
+        self.inputs = deque()  # (seq, FrameInput) not applied yet
+        self.last_seq = 0  # Newest input queued; 0 before the first
+        self.applied = 0  # Newest input applied, acked in snapshots
+        self.held = IDLE  # Repeated while the queue is empty
+        self.acked = netcode.FULL  # Newest snapshot tick the client decoded
+        self.sent = {}  # tick -> tables sent, baselines for deltas
+        self.seen = now
+
+
+class GameServer(asyncio.DatagramProtocol):
+    def __init__(self, sim, latency=0.0, jitter=0.0, loss=0.0, seed=None, spread=False):
+        self.sim = sim
+        self.clients = {}  # addr -> Client
+        self.next_pid = 1
+        self.transport = None
+        self.network = (latency, jitter, loss, seed)
+        self.spread = spread  # Join at random points instead of side by side, to exercise interest management
+        self.timestep = FixedTimestep(sim.tick_rate)
+        self.running = False
+        self.tick_ms = []  # Simulation step, per tick
+        self.encode_ms = []  # All clients' snapshots, per tick
+        self.tick_bytes = []  # Snapshot bytes sent, per tick
+        self.tick_clients = []
+        self.full_snapshots = 0
+        self.received_bytes = 0
+
+    def connection_made(self, transport):
+        latency, jitter, loss, seed = self.network
+        self.transport = netcode.LossyTransport(transport, asyncio.get_running_loop(), latency, jitter, loss, seed)
+
+    def datagram_received(self, data, addr):
+        self.received_bytes += len(data)
+        now = time.perf_counter()
+        client = self.clients.get(addr)
+        if data[:1] == netcode.JOIN:
+            if client is None:
+                client = self._join(addr, now)
+            sim = self.sim
+            self.transport.sendto(netcode.WELCOME.pack(b'W', client.pid, sim.tick_rate, sim.world_width,
+                                                       sim.world_height, sim.tick), addr)
+        elif data[:1] == b'I' and client is not None:
+            client.seen = now
+            ack, entries = netcode.decode_input(data)
+            if ack > client.acked:
+                client.acked = ack
+            for seq, buttons, dx, dy in entries:
+                if seq <= client.last_seq:
+                    continue  # Redundant copy of one already queued
+                client.last_seq = seq
+                client.inputs.append((seq, buttons, dx, dy))
+            while len(client.inputs) > MAX_QUEUED_INPUTS:
+                client.inputs.popleft()
+
+    def _join(self, addr, now):
+        sim = self.sim
+        pid = self.next_pid
+        self.next_pid += 1
+        client = self.clients[addr] = Client(pid, addr, now)
+        if self.spread:
+            sim.add_player(pid, sim.rng.uniform(0, sim.world_width - 20), sim.rng.uniform(0, sim.world_height - 20))
+        else:
+            sim.add_player(pid)
+        return client
+
+    def _frame_input(self, client, player):
+        # The client's next input, or the last one again while it has none queued
+        if client.inputs:
+            seq, buttons, dx, dy = client.inputs.popleft()
+            cx, cy = player.get_center()
+            pressed = {name: bool(buttons >> bit & 1) for bit, name in enumerate(netcode.BUTTONS)}
+            client.held = FrameInput(aim=(cx + dx, cy + dy), **pressed)
+            client.applied = seq
+        return client.held
+
+    def tick(self):
+        sim = self.sim
+        start = time.perf_counter()
+        inputs = {}
+        for client in self.clients.values():
+            player = sim.players.get(client.pid)
+            if player is not None:
+                inputs[client.pid] = self._frame_input(client, player)
+        sim.step(inputs)
+        encode = time.perf_counter()
+        sent = self.broadcast()
+        end = time.perf_counter()
+        self.tick_ms.append((encode - start) * 1000)
+        self.encode_ms.append((end - encode) * 1000)
+        self.tick_bytes.append(sent)
+        self.tick_clients.append(len(self.clients))
+
+    def broadcast(self):
+        # One snapshot per client; returns the bytes sent
+        sim = self.sim
+        world = WorldTables(sim)
+        won = sim.game_won and netcode.WON
+        lost = sim.over and not sim.game_won and netcode.LOST
+        sent = 0
+        for client in self.clients.values():
+            player = sim.players[client.pid]
+            tables = world.view(netcode.camera_rect(*player.get_center(), sim.world_width, sim.world_height),
+                                client.pid)
+            base = client.sent.get(client.acked)
+            baseline = client.acked if base is not None else netcode.FULL
+            self.full_snapshots += base is None
+            flags = ((player.shield_active and netcode.SHIELD) | (client.pid in sim.downed and netcode.DOWN)
+                     | won | lost)
+            own = (player.x, player.y, player.health, player.weapon_level, flags, sim.exp)
+            data = netcode.encode_snapshot(sim.tick, baseline, client.applied, own, tables, base)
+            self.transport.sendto(data, client.addr)
+            sent += len(data)
+            client.sent[sim.tick] = tables
+            client.sent.pop(sim.tick - netcode.HISTORY, None)
+        return sent
+
+    def drop_idle(self, now):
+        for addr, client in list(self.clients.items()):
+            if now - client.seen > TIMEOUT:
+                del self.clients[addr]
+                self.sim.remove_player(client.pid)
+
+    async def run(self, duration=None):
+        # Tick at the simulation's rate until stop(), or for duration seconds
+        self.running = True
+        timestep = self.timestep
+        end = None if duration is None else time.perf_counter() + duration
+        while self.running and (end is None or time.perf_counter() < end):
+            for _ in range(timestep.advance()):
+                self.tick()
+            self.drop_idle(time.perf_counter())
+            await asyncio.sleep(max(timestep.dt - timestep.accumulator, 0.0))
+
+    def stop(self):
+        self.running = False
+
+    def stats(self):
+        ticks = [i for i, clients in enumerate(self.tick_clients) if clients]  # Ticks with anyone to send to
+
+        def mean(values):
+            return float(np.mean([values[i] for i in ticks])) if ticks else 0.0
+        bytes_per_tick = mean(self.tick_bytes)
+        clients = mean(self.tick_clients)
+        return {
+            'ticks': len(self.tick_ms),
+            'clients': len(self.clients),
+            'bytes_per_tick': bytes_per_tick,
+            'bytes_per_client_tick': bytes_per_tick / clients if clients else 0.0,
+            'tick_ms': mean(self.tick_ms),
+            'encode_ms': mean(self.encode_ms),
+            'tick_p95_ms': float(np.percentile([self.tick_ms[i] + self.encode_ms[i] for i in ticks], 95)) if ticks else 0.0,
+            'full_snapshots': self.full_snapshots,
+            'received_bytes': self.received_bytes,
+            'dropped_packets': self.transport.dropped if self.transport else 0,
+            **{'timestep_' + key: value for key, value in self.timestep.stats().items()},
+        }
+
+
+async def serve(sim, host='127.0.0.1', port=PORT, **network):
+    # Binds the server; returns (GameServer, datagram transport). await server.run() to start ticking
+    loop = asyncio.get_running_loop()
+    transport, server = await loop.create_datagram_endpoint(lambda: GameServer(sim, **network), local_addr=(host, port))
+    return server, transport
+
+
+async def main_async(args):
+    sim = CoopSimulation(seed=args.seed, world_width=args.world[0], world_height=args.world[1],
+                         enemy_amount=args.enemies, wake_chunks=WAKE_CHUNKS, tick_rate=args.tick_rate)
+    server, transport = await serve(sim, args.host, args.port, latency=args.latency / 1000,
+                                    jitter=args.jitter / 1000, loss=args.loss)
+    print(f"Serving on {args.host}:{args.port} at {args.tick_rate} Hz", file=sys.stderr)
+    try:
+        await server.run()
+    finally:
+        transport.close()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Authoritative co-op game server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--tick-rate', type=int, default=TICK_RATE)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--enemies', type=int, default=20)
+    parser.add_argument('--world', type=int, nargs=2, default=(WORLD_WIDTH, WORLD_HEIGHT), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--latency', type=float, default=0.0, help="Added one-way latency for outgoing packets, ms")
+    parser.add_argument('--jitter', type=float, default=0.0, help="ms")
+    parser.add_argument('--loss', type=float, default=0.0, help="Fraction of outgoing packets dropped")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(main_async(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,362 @@
+import math
+import random
+import numpy as np
+import pygame
+
+from player import Player
+from enemy import Drop, ENEMY_SIZE
+from boars import BoarStore
+from flowfield import FlowField
+from lifecycle import Lifecycle
+from bullets import BulletStore, Projectile
+from spatial import SpatialGrid
+from text import text_cache
+from waves import WaveScheduler
+from world import CHUNK_SIZE
+
+# World settings
+WORLD_WIDTH = 1600  # Larger world dimensions
+WORLD_HEIGHT = 1200
+ENEMY_AMOUNT = 1
+TICK_RATE = 60  # Simulation ticks per simulated second; speeds and tick timers are tuned for this rate
+FIRE_DELAY = 5  # Ticks at TICK_RATE between volleys while SPACE is held
+# Initial bullet pool sizes; stores double when full, check pool_stats() high-water marks before changing
+PROJECTILE_CAPACITY = 256
+ENEMY_BULLET_CAPACITY = 512
+CHILD_BULLET_CAPACITY = 256
+BOAR_CAPACITY = 256
+
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+
+
+class DamageText:
+    def __init__(self, x, y, text, color):
+        self.x = x
+        self.y = y
+        self.text = text
+        self.color = color
+        self.lifetime = 60  # Ticks at TICK_RATE (1 second)
+        self.speed = -2  # Move upwards
+
+    def merge_into(self, texts):
+        # Over the damage_texts cap: add this number onto the newest text of the same color, which starts
+        # its second over (see lifecycle.py)
+        try:
+            amount = int(self.text)
+        except ValueError:
+            return None
+        for text in reversed(texts):
+            if text.color != self.color:
+                continue
+            try:
+                total = int(text.text) + amount
+            except ValueError:
+                continue
+            text.text = f"{total:+d}"
+            text.lifetime = self.lifetime
+            return text
+        return None
+
+    def update(self, scale=1.0):
+        # scale: ticks at TICK_RATE this update stands for, see Simulation.frame_scale
+        self.y += self.speed * scale  # Move up
+        self.lifetime -= scale
+        return self.lifetime > 0  # Return True if still alive
+
+    def draw(self, camera, surface=None):
+        text_surface, pos = self.sprite()
+        (surface or pygame.display.get_surface()).blit(text_surface, camera.apply(pos))
+
+    def sprite(self):
+        return text_cache.render(self.text, 36, self.color), (self.x, self.y)
+
+    def bounds(self):
+        return pygame.Rect((self.x, self.y), text_cache.render(self.text, 36, self.color).get_size())
+
+
+class FrameInput:
+    # Everything the player can do in one tick; aim and clicks are world coordinates
+    def __init__(self, up=False, down=False, left=False, right=False, fire=False, shield=False, aim=(0, 0), clicks=()):
+        self.up = up
+        self.down = down
+        self.left = left
+        self.right = right
+        self.fire = fire  # SPACE held
+        self.shield = shield  # K held
+        self.aim = aim
+        self.clicks = clicks
+
+    def keys(self):
+        # Key-state mapping in the shape Player.move expects from pygame.key.get_pressed()
+        return {
+            pygame.K_w: self.up,
+            pygame.K_s: self.down,
+            pygame.K_a: self.left,
+            pygame.K_d: self.right,
+            pygame.K_SPACE: self.fire,
+            pygame.K_k: self.shield,
+        }
+
+
+class Simulation:
+    # All game rules, stepped on a simulated clock with a seeded RNG and no display
+    # waves: (start_tick, count) pairs for the WaveScheduler; by default enemy_amount boars at tick 0.
+    # tick_rate below TICK_RATE (e.g. 20 or 30 for a server) makes each step cover more time; hits are
+    # swept along each bullet's step, so they don't depend on it. obstacles are (x, y, width, height) world
+    # rects that boars don't walk into and path around when charging or fleeing (see flowfield.py). budgets:
+    # entity class -> lifecycle.Budget, overriding those in lifecycle.BUDGETS
+    def __init__(self, seed=None, world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT, enemy_amount=ENEMY_AMOUNT,
+                 wake_chunks=None, chunk_size=CHUNK_SIZE, waves=None, tick_rate=TICK_RATE, obstacles=(),
+                 budgets=None):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.frame_scale = TICK_RATE / tick_rate  # TICK_RATE ticks per step
+        self.rng = random.Random(seed)
+        self.world_width = world_width
+        self.world_height = world_height
+        self.tick = 0
+        self.player = Player(world_width//2, world_height - 100, world_width, world_height)
+        self.boars = BoarStore(BOAR_CAPACITY, self.rng.getrandbits(64), self.frame_scale)
+        self.flow = FlowField(world_width, world_height, obstacles, clearance=ENEMY_SIZE / 2)
+        self.boars.flow = self.flow
+        self.waves = WaveScheduler([(0, enemy_amount)] if waves is None else waves)
+        self.projectiles = BulletStore(PROJECTILE_CAPACITY, world_width, world_height, self.frame_scale)
+        self.enemy_bullets = BulletStore(ENEMY_BULLET_CAPACITY, world_width, world_height, self.frame_scale)
+        self.child_bullets = BulletStore(CHILD_BULLET_CAPACITY, world_width, world_height, self.frame_scale)
+        self.lifecycle = Lifecycle(budgets, self.frame_scale)
+        for name in ('projectiles', 'enemy_bullets', 'child_bullets'):
+            getattr(self, name).limit(self.lifecycle.budgets[name])
+        self.entity_grid = SpatialGrid(world_width, world_height)
+        self.projectile_grid = SpatialGrid(world_width, world_height)
+        self.enemy_bullet_grid = SpatialGrid(world_width, world_height)
+        self.child_bullet_grid = SpatialGrid(world_width, world_height)
+        self.boar_grid = SpatialGrid(world_width, world_height)
+        self.drops = []  # Track active drops
+        self.damage_texts = []
+        self.message = None  # For "Stellanator unlocked"
+        self.message_timer = 3  # Display duration
+        self.game_won = False
+        self.game_lost = False
+        self.spam_timer = 0
+        self.exp = 0  # Experience points
+        self.bullets_shot = 0  # Track bullets fired
+        self.damage_taken = 0  # Health lost to enemy and child bullets
+        # Enemies (and their babies) more than wake_chunks chunks from the player neither move nor shoot;
+        # None keeps everyone awake
+        self.wake_chunks = wake_chunks
+        self.chunk_size = chunk_size
+        self.spawn_waves()  # The first batch is in place before the first tick
+
+    @property
+    def time(self):
+        return self.tick / self.tick_rate
+
+    @property
+    def over(self):
+        return self.game_won or self.game_lost
+
+    @property
+    def enemies(self):
+        # Live mothers and lone boars as Enemy views, e.g. for tooling; the game itself reads self.boars
+        views = self.boars.views
+        return [views[i] for i in np.flatnonzero(self.boars.adults())]
+
+    @property
+    def collision_tests(self):
+        # Running total of candidates checked against exact bounds in every grid
+        return (self.entity_grid.tested + self.projectile_grid.tested + self.enemy_bullet_grid.tested
+                + self.child_bullet_grid.tested + self.boar_grid.tested)
+
+    def __getstate__(self):
+        # Phase methods wrapped on the instance (profiler, benchmarks) are tooling, not game state
+        return {k: v for k, v in self.__dict__.items() if not (callable(v) and hasattr(Simulation, k))}
+
+    def pool_stats(self):
+        return {
+            'projectiles': self.projectiles.stats(),
+            'enemy_bullets': self.enemy_bullets.stats(),
+            'child_bullets': self.child_bullets.stats(),
+            'boars': self.boars.stats(),
+            'damage_texts': self.lifecycle.stats('damage_texts', self.damage_texts),
+            'drops': self.lifecycle.stats('drops', self.drops),
+        }
+
+    def step(self, inputs):
+        if not self.over:
+            self.spawn_waves()
+            self.handle_clicks(inputs)
+            self.move_player(inputs)
+            self.fire(inputs)
+            self.move_enemies()
+            self.enemies_shoot()
+            self.resolve_projectiles()
+            self.index_entities()
+            self.pickup_drops()
+            self.resolve_enemy_bullets(inputs)
+            self.resolve_child_bullets(inputs)
+        self.update_effects()
+        self.tick += 1
+
+    def add_damage_text(self, text, color, player=None):
+        player = player or self.player
+        self.lifecycle.admit('damage_texts', self.damage_texts,
+                             DamageText(player.x + player.size/2, player.y, text, color), self.tick)
+
+    def handle_clicks(self, inputs):
+        player = self.player
+        for world_mx, world_my in inputs.clicks:
+            dx = world_mx - (player.x + player.size/2)
+            dy = world_my - (player.y + player.size/2)
+            angle = math.atan2(dy, dx)
+            shot = self.projectiles.spawn(Projectile, player.x + player.size/2, player.y + player.size/2, angle)
+            if shot is not None:  # None when the projectile cap refused it
+                self.bullets_shot += 1  # Increment bullet count
+
+    def move_player(self, inputs):
+        self.player.move(inputs.keys(), self.frame_scale)
+
+    def fire(self, inputs):
+        self.spam_timer -= self.frame_scale
+        if inputs.fire and self.spam_timer <= 0:
+            self.bullets_shot += self.player.shoot(self.projectiles, inputs.aim)
+            # Carry this step's overshoot so long steps keep the same volleys per second
+            self.spam_timer = FIRE_DELAY + max(self.spam_timer, 1 - self.frame_scale)
+
+    def spawn_waves(self):
+        self.waves.update(self)
+
+    def targets(self):
+        # Who boars charge, flee and shoot at: the player, or a list of players to pick the nearest from
+        return self.player
+
+    def wake_enemies(self):
+        # Chebyshev chunk distance from the player decides who is simulated this tick
+        cx, cy = self.player.get_center()
+        self.boars.wake(cx, cy, self.chunk_size, self.wake_chunks)
+
+    def move_enemies(self):
+        self.projectiles.index_into(self.projectile_grid)  # Dodge checks see last tick's positions
+        self.wake_enemies()
+        self.flow.update(self.targets())  # Rebuilds only when a target moved to another cell
+        self.boars.update(self.projectile_grid, self.world_width, self.world_height, self.targets(), self.time)
+
+    def enemies_shoot(self):
+        # Awake boars only, as decided by move_enemies this tick
+        self.boars.shoot(self.targets(), self.time, self.enemy_bullets, self.child_bullets)
+
+    def resolve_projectiles(self):
+        boars = self.boars
+        projectiles = self.projectiles
+        projectiles.step()  # Retire projectiles that left the world, move the numeric ones
+        live = np.flatnonzero(projectiles.alive[:projectiles.count])
+        x0, y0 = projectiles.previous()
+        segment = (x0[live], y0[live], projectiles.x[live], projectiles.y[live])
+        # Each projectile hits at most one adult (mother or lone boar) and one baby along this step
+        point, slot = boars.hits(self.boar_grid, *segment, boars.adults())
+        hit_adult, dead = boars.damage(point, slot)
+        for i in dead.tolist():
+            self.reward_kill(i)
+        self.child_bullets.orphan(boars.kill(dead))  # Their babies go too
+        point, slot = boars.hits(self.boar_grid, *segment, boars.babies())
+        hit_baby, dead = boars.damage(point, slot)
+        self.child_bullets.orphan(boars.kill(dead))
+        projectiles.kill(live[np.union1d(hit_adult, hit_baby)])
+        self.game_won = self.waves.done and not boars.adults().any()
+
+    def reward_kill(self, slot):
+        # An adult boar in this slot died to a projectile (it is still in the store)
+        player = self.player
+        self.exp += 100
+        old_health = player.health
+        player.health += 1
+        if player.health > old_health:
+            self.add_damage_text("+1", GREEN)
+        drop = self.boars.views[slot].spawn_drop()
+        if drop:
+            self.lifecycle.admit('drops', self.drops, drop, self.tick)
+
+    def index_entities(self):
+        # Drops the player can pick up, inserted once per tick; boars are looked up in self.boars
+        grid = self.entity_grid
+        grid.clear()
+        for drop in self.drops:
+            grid.insert(drop, drop.x - drop.size/2, drop.y - drop.size/2, drop.size, drop.size)
+
+    def player_rect(self, player=None):
+        player = player or self.player
+        return pygame.Rect(player.x, player.y, player.size, player.size)
+
+    def pickup_drops(self):
+        player = self.player
+        for drop in self.entity_grid.query_rect(*self.player_rect()):
+            if not isinstance(drop, Drop) or drop not in self.drops:
+                continue  # In co-op another player may have taken it this tick; the grid is from before
+            self.drops.remove(drop)
+            player.weapon_level += 1  # One weapon level up
+            self.add_damage_text("+1", GREEN)
+            player.health += 1
+            self.message = f"Stellanator level {player.weapon_level} unlocked"
+            self.message_timer = 120  # Ticks at TICK_RATE (2 seconds)
+
+    def take_hit(self, player, damage):
+        self.damage_taken += damage
+        if player.take_damage(damage):
+            self.player_down(player)
+        else:
+            self.add_damage_text(f"-{damage}", RED, player)
+
+    def player_down(self, player):
+        self.game_lost = True
+
+    def resolve_enemy_bullets(self, inputs):
+        self.enemy_bullets.step()
+        self.enemy_bullets.index_into(self.enemy_bullet_grid)
+        self.enemy_bullets_hit(self.player, inputs.aim)
+
+    def enemy_bullets_hit(self, player, aim):
+        # Shielded bullets go back where they came from, the rest that reach the player hurt.
+        # Uses the grid resolve_enemy_bullets built this tick
+        enemy_bullets = self.enemy_bullets
+        grid = self.enemy_bullet_grid
+        shield = player.get_shield_box(aim)
+        shielded = grid.segments_in_rotated_rect(*shield) if shield else []
+        enemy_bullets.reflect(shielded)
+        for i in np.setdiff1d(grid.segments_in_rect(*self.player_rect(player)), shielded):
+            if not enemy_bullets.alive[i]:
+                continue  # Already spent on another player (co-op, see server.py)
+            self.take_hit(player, int(enemy_bullets.damage[i]))
+            enemy_bullets.kill(i)
+
+    def resolve_child_bullets(self, inputs):
+        self.child_bullets.step()
+        self.child_bullets.index_into(self.child_bullet_grid)
+        self.child_bullets_hit(self.player, inputs.aim)
+
+    def child_bullets_hit(self, player, aim):
+        # Like enemy_bullets_hit, but shielded bullets are knocked away from the player
+        child_bullets = self.child_bullets
+        grid = self.child_bullet_grid
+        shield = player.get_shield_box(aim)
+        shielded = set(grid.segments_in_rotated_rect(*shield).tolist()) if shield else set()
+        deflected = []
+        for i in sorted(shielded.union(grid.segments_in_rect(*self.player_rect(player)).tolist())):
+            if not child_bullets.alive[i]:
+                continue
+            # Skip collision with source baby and its mother
+            if self.boars.family_contains(child_bullets.source[i], child_bullets.x[i], child_bullets.y[i]):
+                continue  # Skip this bullet for now to avoid self-collision
+            if i in shielded:
+                deflected.append(i)
+            else:
+                self.take_hit(player, int(child_bullets.damage[i]))
+                child_bullets.kill(i)
+        child_bullets.deflect(deflected, player.x + player.size/2, player.y + player.size/2, 1.3)
+
+    def update_effects(self):
+        scale = self.frame_scale
+        self.damage_texts = [text for text in self.damage_texts if text.update(scale)]  # Drop expired texts
+        self.lifecycle.expire('damage_texts', self.damage_texts, self.tick)
+        self.lifecycle.expire('drops', self.drops, self.tick)
+        if self.message and self.message_timer > 0:
+            self.message_timer -= scale
@@ -0,0 +1,233 @@
+# Per-tick copies of what a frame draws, handed from the simulation thread to the renderer through a
+# triple buffer
+import copy
+import time
+import threading
+
+import numpy as np
+
+from boars import NO_PARENT
+from player import Player
+from profiler import PhaseTimer
+from simulation import FrameInput
+from timestep import FixedTimestep, MAX_CATCH_UP
+
+# Columns batch_sprites reads besides x and y, per store
+BULLET_COLUMNS = ('kind', 'angle')
+BOAR_COLUMNS = ('state', 'flip', 'size', 'health', 'is_mother', 'parent')
+
+
+class StoreSnapshot:
+    # Copies of a BulletStore's (or BoarStore's) live slots: alive, x, y, previous() and `columns`.
+    # Arrays are reused between captures and only grow, like the stores themselves
+    def __init__(self, columns):
+        self.columns = columns
+        self.count = 0
+
+    def _copy(self, name, values):
+        n = len(values)
+        column = self.__dict__.get(name)
+        if column is None or len(column) < n or column.dtype != values.dtype:
+            column = self.__dict__[name] = np.empty(max(n, 2 * len(column) if column is not None else 0, 16),
+                                                    dtype=values.dtype)
+        column[:n] = values
+
+    def capture(self, store):
+        n = store.count
+        self.count = n
+        self._copy('alive', store.alive[:n])
+        self._copy('x', store.x[:n])
+        self._copy('y', store.y[:n])
+        last_x, last_y = store.previous()
+        self._copy('last_x', last_x)
+        self._copy('last_y', last_y)
+        for name in self.columns:
+            self._copy(name, getattr(store, name)[:n])
+
+    def previous(self):
+        n = self.count
+        return self.last_x[:n], self.last_y[:n]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+
+class BoarSnapshot(StoreSnapshot):
+    def __init__(self):
+        super().__init__(BOAR_COLUMNS)
+
+    def adults(self):
+        n = self.count
+        return self.alive[:n] & (self.parent[:n] == NO_PARENT)
+
+    def babies(self):
+        n = self.count
+        return self.alive[:n] & (self.parent[:n] != NO_PARENT)
+
+
+class FrameSnapshot:
+    # What one frame draws, copied from a Simulation: the player (and where it was a tick earlier, for
+    # interpolation), boars, bullets, drops, damage texts and the HUD values, plus running totals for the
+    # profiler: seconds per simulation phase (while profiling), collision tests, ticks, skipped frames and lag
+    def __init__(self):
+        self.boars = BoarSnapshot()
+        self.projectiles = StoreSnapshot(BULLET_COLUMNS)
+        self.enemy_bullets = StoreSnapshot(BULLET_COLUMNS)
+        self.child_bullets = StoreSnapshot(BULLET_COLUMNS)
+        self.tick = -1
+        self.published = 0.0  # perf_counter() time the captured tick stands for, see SimulationThread.alpha
+        self.phase_totals = {}
+        self.collision_tests = 0
+        self.ticks = 0
+        self.skipped_frames = 0
+        self.lag = 0.0
+
+    def capture(self, sim, player_previous, published, timestep, phases):
+        player = Player.__new__(Player)  # Not copy.copy: Player's __getstate__ drops the shield sprites
+        player.__dict__.update(sim.player.__dict__)
+        self.player = player
+        self.player_previous = player_previous
+        self.boars.capture(sim.boars)
+        self.projectiles.capture(sim.projectiles)
+        self.enemy_bullets.capture(sim.enemy_bullets)
+        self.child_bullets.capture(sim.child_bullets)
+        self.drops = list(sim.drops)  # A Drop never changes once dropped
+        self.damage_texts = [copy.copy(text) for text in sim.damage_texts]
+        self.message = sim.message
+        self.message_timer = sim.message_timer
+        self.exp = sim.exp
+        self.bullets_shot = sim.bullets_shot
+        self.game_won = sim.game_won
+        self.game_lost = sim.game_lost
+        self.tick = sim.tick
+        self.published = published
+        self.phase_totals = dict(phases.totals)
+        self.collision_tests = sim.collision_tests
+        self.ticks = timestep.ticks
+        self.skipped_frames = timestep.skipped_frames
+        self.lag = timestep.lag
+
+    @property
+    def over(self):
+        return self.game_won or self.game_lost
+
+
+class TripleBuffer:
+    # One writer fills `back` and publishes it; one reader takes the newest published buffer with acquire().
+    # Neither waits for the other, and the writer never touches the buffer the reader holds
+    def __init__(self, factory):
+        self.back = factory()
+        self.middle = factory()
+        self.front = factory()
+        self.fresh = False  # middle holds a publish the reader hasn't taken
+        self.lock = threading.Lock()
+        self.published = 0
+        self.acquired = 0
+
+    def publish(self):
+        with self.lock:
+            self.back, self.middle = self.middle, self.back
+            self.fresh = True
+            self.published += 1
+
+    def acquire(self):
+        with self.lock:
+            if self.fresh:
+                self.front, self.middle = self.middle, self.front
+                self.fresh = False
+                self.acquired += 1
+            return self.front
+
+
+class SimulationThread:
+    # Steps a Simulation at its tick rate and publishes a FrameSnapshot after each batch of ticks.
+    # start() runs it on a worker thread; without start(), call run_due() once per frame instead.
+    # Input comes from the render side through set_input(); clicks queue until a tick takes them
+    def __init__(self, sim, recorder=None, max_catch_up=MAX_CATCH_UP):
+        self.sim = sim
+        self.recorder = recorder
+        self.timestep = FixedTimestep(sim.tick_rate, max_catch_up)
+        self.buffer = TripleBuffer(FrameSnapshot)
+        self.phases = PhaseTimer()
+        self.profiling = False  # Set from the render side by profile(); the simulation side wraps to match
+        self.lock = threading.Lock()
+        self.held = FrameInput()
+        self.clicks = []
+        self.thread = None
+        self.running = False
+        self.error = None
+        self._publish((sim.player.x, sim.player.y), time.perf_counter())  # Something to draw before the first tick
+
+    def set_input(self, inputs):
+        # Held keys and aim replace the previous ones; clicks add to the queue
+        with self.lock:
+            self.held = inputs
+            self.clicks.extend(inputs.clicks)
+
+    def profile(self, flag=True):
+        # Time the simulation's phases into the snapshots from the next run_due() on
+        self.profiling = flag
+
+    def _next_input(self):
+        with self.lock:
+            held = self.held
+            clicks = self.clicks
+            self.clicks = []
+        return FrameInput(up=held.up, down=held.down, left=held.left, right=held.right, fire=held.fire,
+                          shield=held.shield, aim=held.aim, clicks=clicks)
+
+    def _publish(self, player_previous, published):
+        self.buffer.back.capture(self.sim, player_previous, published, self.timestep, self.phases)
+        self.buffer.publish()
+
+    def run_due(self):
+        # Run the ticks that are due by now, then publish the last one; returns how many ran
+        if self.profiling != (self.phases.sim is not None):
+            if self.profiling:
+                self.phases.attach(self.sim)
+            else:
+                self.phases.detach()
+        ticks = self.timestep.advance()
+        if not ticks:
+            return 0
+        sim = self.sim
+        player = sim.player
+        for _ in range(ticks):
+            inputs = self._next_input()
+            if self.recorder:
+                inputs = self.recorder.record(inputs)
+            previous = (player.x, player.y)
+            sim.step(inputs)
+        # The last tick is due where the timestep's leftover real time began
+        self._publish(previous, self.timestep.last - self.timestep.accumulator)
+        return ticks
+
+    def alpha(self, snapshot):
+        # How far real time is past the snapshot's tick, in ticks, for render interpolation
+        return min(max((time.perf_counter() - snapshot.published) / self.timestep.dt, 0.0), 1.0)
+
+    def _run(self):
+        try:
+            while self.running:
+                self.run_due()
+                time.sleep(max(self.timestep.dt - self.timestep.accumulator, 0.0))  # Until the next tick is due
+        except BaseException as error:
+            self.error = error
+            self.running = False
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='simulation', daemon=True)
+        self.thread.start()
+
+    def check(self):
+        # Re-raise on the render side whatever stopped the simulation thread
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.check()
@@ -0,0 +1,201 @@
+import math
+import numpy as np
+
+CELL_SIZE = 100  # Roughly one mother boar plus its babies' orbit per cell
+
+
+def _slab(p, d, lo, hi):
+    # Segment parameters where p + t * d enters and leaves [lo, hi] on one axis
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t0 = (lo - p) / d
+        t1 = (hi - p) / d
+    near = np.minimum(t0, t1)
+    far = np.maximum(t0, t1)
+    flat = d == 0  # Parallel to the slab: inside for every t or for none
+    inside = (lo <= p) & (p <= hi)
+    near = np.where(flat, np.where(inside, -np.inf, np.inf), near)
+    far = np.where(flat, np.where(inside, np.inf, -np.inf), far)
+    return near, far
+
+
+def segments_hit_boxes(x0, y0, x1, y1, left, top, right, bottom):
+    # Slab test of segments (x0, y0)-(x1, y1) against axis-aligned boxes, all arrays broadcast together.
+    # Returns (hit mask, fraction of the segment travelled when it enters the box, 0 if it starts inside)
+    dx = x1 - x0
+    dy = y1 - y0
+    near_x, far_x = _slab(x0, dx, left, right)
+    near_y, far_y = _slab(y0, dy, top, bottom)
+    enter = np.maximum(np.maximum(near_x, near_y), 0)
+    leave = np.minimum(np.minimum(far_x, far_y), 1)
+    return enter <= leave, enter
+
+
+def segments_hit_rotated_box(x0, y0, x1, y1, cx, cy, width, height, angle):
+    # Like segments_hit_boxes for one width x height box centered on (cx, cy) and turned by angle
+    # radians, its width along (cos(angle), sin(angle)); the shield is drawn this way
+    cos = math.cos(angle)
+    sin = math.sin(angle)
+    ax = x0 - cx
+    ay = y0 - cy
+    bx = x1 - cx
+    by = y1 - cy
+    half_w = width / 2
+    half_h = height / 2
+    return segments_hit_boxes(ax * cos + ay * sin, ay * cos - ax * sin, bx * cos + by * sin, by * cos - bx * sin,
+                              -half_w, -half_h, half_w, half_h)
+
+
+class SpatialGrid:
+    # Uniform grid over the world; rect entities go in buckets, bullet points in a sorted index
+    def __init__(self, world_width, world_height, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(world_width / cell_size))
+        self.rows = max(1, math.ceil(world_height / cell_size))
+        self.cells = {}  # Cell index -> [(order, obj, x, y, w, h), ...]
+        self.inserted = 0
+        self.tested = 0  # Candidates handed to exact overlap tests, for profiling; never reset here
+        self.index_points(np.zeros(0), np.zeros(0))
+
+    def _col(self, x):
+        return min(max(int(x // self.cell_size), 0), self.cols - 1)
+
+    def _row(self, y):
+        return min(max(int(y // self.cell_size), 0), self.rows - 1)
+
+    def clear(self):
+        self.cells.clear()
+        self.inserted = 0
+
+    def insert(self, obj, x, y, w, h):
+        entry = (self.inserted, obj, x, y, w, h)
+        self.inserted += 1
+        for row in range(self._row(y), self._row(y + h) + 1):
+            for col in range(self._col(x), self._col(x + w) + 1):
+                self.cells.setdefault(row * self.cols + col, []).append(entry)
+
+    def query_point(self, x, y):
+        # Entities whose rect contains (x, y), in insertion order
+        bucket = self.cells.get(self._row(y) * self.cols + self._col(x), ())
+        self.tested += len(bucket)
+        return [obj for _, obj, ex, ey, ew, eh in bucket if ex <= x < ex + ew and ey <= y < ey + eh]
+
+    def query_rect(self, x, y, w, h):
+        # Entities whose rect overlaps (x, y, w, h), in insertion order
+        found = {}
+        for row in range(self._row(y), self._row(y + h) + 1):
+            for col in range(self._col(x), self._col(x + w) + 1):
+                bucket = self.cells.get(row * self.cols + col, ())
+                self.tested += len(bucket)
+                for order, obj, ex, ey, ew, eh in bucket:
+                    if ex < x + w and x < ex + ew and ey < y + h and y < ey + eh:
+                        found[order] = obj
+        return [found[order] for order in sorted(found)]
+
+    def index_points(self, xs, ys, mask=None):
+        # Bulk-insert points (e.g. BulletStore columns); queries return indices into xs/ys
+        self.xs = xs
+        self.ys = ys
+        ncells = self.cols * self.rows
+        cols = np.clip((xs // self.cell_size).astype(np.intp), 0, self.cols - 1)
+        rows = np.clip((ys // self.cell_size).astype(np.intp), 0, self.rows - 1)
+        cells = rows * self.cols + cols
+        if mask is not None:
+            cells[~mask] = ncells  # Park ignored points past the last cell
+        self.point_order = np.argsort(cells, kind='stable')
+        self.point_starts = np.searchsorted(cells[self.point_order], np.arange(ncells + 1))
+        self.x0s = xs  # Points are zero-length segments until index_segments says otherwise
+        self.y0s = ys
+        self.reach = 0.0
+
+    def index_segments(self, x0s, y0s, x1s, y1s, mask=None):
+        # index_points on the segments' ends (x1s, y1s), keeping their starts for the segment queries.
+        # reach, the longest segment, bounds how far outside a rect a crossing segment can end
+        self.index_points(x1s, y1s, mask)
+        self.x0s = x0s
+        self.y0s = y0s
+        dx = x1s - x0s
+        dy = y1s - y0s
+        self.reach = math.sqrt(np.max(dx * dx + dy * dy, where=True if mask is None else mask, initial=0.0))
+
+    def _point_candidates(self, x, y, w, h):
+        starts = self.point_starts
+        col0 = self._col(x)
+        col1 = self._col(x + w)
+        slices = []
+        for row in range(self._row(y), self._row(y + h) + 1):
+            base = row * self.cols
+            start = starts[base + col0]
+            end = starts[base + col1 + 1]
+            if end > start:
+                slices.append(self.point_order[start:end])
+        if not slices:
+            return self.point_order[:0]
+        idx = np.concatenate(slices) if len(slices) > 1 else slices[0]
+        self.tested += len(idx)
+        return idx
+
+    def points_in_rect(self, x, y, w, h):
+        # Sorted indices of points inside the rect (Rect.collidepoint semantics)
+        idx = self._point_candidates(x, y, w, h)
+        px = self.xs[idx]
+        py = self.ys[idx]
+        return np.sort(idx[(px >= x) & (px < x + w) & (py >= y) & (py < y + h)])
+
+    def segments_in_rect(self, x, y, w, h):
+        # Sorted indices of indexed segments that cross the rect at any point along their length
+        r = self.reach
+        idx = self._point_candidates(x - r, y - r, w + 2 * r, h + 2 * r)
+        hit, _ = segments_hit_boxes(self.x0s[idx], self.y0s[idx], self.xs[idx], self.ys[idx], x, y, x + w, y + h)
+        return np.sort(idx[hit])
+
+    def segments_in_rotated_rect(self, cx, cy, w, h, angle):
+        # segments_in_rect for a rect centered on (cx, cy) and turned by angle, see segments_hit_rotated_box
+        r = self.reach + math.hypot(w, h) / 2
+        idx = self._point_candidates(cx - r, cy - r, 2 * r, 2 * r)
+        hit, _ = segments_hit_rotated_box(self.x0s[idx], self.y0s[idx], self.xs[idx], self.ys[idx], cx, cy, w, h, angle)
+        return np.sort(idx[hit])
+
+    def points_within(self, x, y, r):
+        # Sorted indices of points strictly closer than r to (x, y)
+        idx = self._point_candidates(x - r, y - r, 2 * r, 2 * r)
+        dx = self.xs[idx] - x
+        dy = self.ys[idx] - y
+        return np.sort(idx[dx * dx + dy * dy < r * r])
+
+    def point_pairs_in_rects(self, x, y, w, h):
+        # points_in_rect for many rects at once (arrays x, y, w, h): (rect, point) index pairs, grouped by rect
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        w = np.broadcast_to(w, x.shape)
+        h = np.broadcast_to(h, x.shape)
+        size = self.cell_size
+        col0 = np.clip((x // size).astype(np.intp), 0, self.cols - 1)
+        col1 = np.clip(((x + w) // size).astype(np.intp), 0, self.cols - 1)
+        row0 = np.clip((y // size).astype(np.intp), 0, self.rows - 1)
+        row1 = np.clip(((y + h) // size).astype(np.intp), 0, self.rows - 1)
+        # One run of cells per (rect, row); a run's points are contiguous in point_order
+        rows = row1 - row0 + 1
+        rect = np.repeat(np.arange(len(x)), rows)
+        row = row0[rect] + np.arange(len(rect)) - np.repeat(np.cumsum(rows) - rows, rows)
+        start = self.point_starts[row * self.cols + col0[rect]]
+        counts = self.point_starts[row * self.cols + col1[rect] + 1] - start
+        rect = np.repeat(rect, counts)
+        offsets = np.arange(len(rect)) - np.repeat(np.cumsum(counts) - counts, counts)
+        point = self.point_order[np.repeat(start, counts) + offsets]
+        self.tested += len(point)
+        px = self.xs[point]
+        py = self.ys[point]
+        inside = (px >= x[rect]) & (px < x[rect] + w[rect]) & (py >= y[rect]) & (py < y[rect] + h[rect])
+        return rect[inside], point[inside]
+
+    def cell_counts_in_rects(self, x0, y0, x1, y1):
+        # Indexed points in the cells each rect touches, for many rects at once; 0 means none can be inside
+        counts = np.diff(self.point_starts).reshape(self.rows, self.cols)
+        table = np.zeros((self.rows + 1, self.cols + 1), dtype=np.intp)
+        table[1:, 1:] = counts.cumsum(0).cumsum(1)
+        size = self.cell_size
+        c0 = np.clip((np.asarray(x0) // size).astype(np.intp), 0, self.cols - 1)
+        c1 = np.clip((np.asarray(x1) // size).astype(np.intp), 0, self.cols - 1) + 1
+        r0 = np.clip((np.asarray(y0) // size).astype(np.intp), 0, self.rows - 1)
+        r1 = np.clip((np.asarray(y1) // size).astype(np.intp), 0, self.rows - 1) + 1
+        return table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
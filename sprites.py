@@ -0,0 +1,128 @@
+import math
+import numpy as np
+import pygame
+
+ROTATION_STEPS = 64  # Angular resolution of pre-rotated sprites (5.6 degrees per step)
+TAU = 2 * math.pi
+
+
+class RotationCache:
+    # Copies of one sprite pre-rotated at `steps` evenly spaced angles, rendered lazily or up front
+    def __init__(self, surface, steps=ROTATION_STEPS, prerender=False):
+        self.surface = surface
+        self.steps = steps
+        self.frames = [None] * steps
+        if prerender:
+            self.prerender()
+
+    def _render(self, i):
+        # Same convention as the old per-frame code: rotate(surface, -degrees(angle))
+        frame = self.frames[i] = pygame.transform.rotate(self.surface, -math.degrees(i * TAU / self.steps))
+        return frame
+
+    def prerender(self):
+        for i in range(self.steps):
+            if self.frames[i] is None:
+                self._render(i)
+
+    def get(self, angle):
+        # Nearest pre-rotated frame for an angle in radians
+        i = round(angle * self.steps / TAU) % self.steps
+        return self.frames[i] or self._render(i)
+
+    def get_many(self, angles):
+        # Frames for an array of angles, e.g. a BulletStore column
+        steps = np.rint(angles * self.steps / TAU).astype(np.intp) % self.steps
+        frames = self.frames
+        return [frames[i] or self._render(i) for i in steps.tolist()]
+
+    def memory_bytes(self):
+        return sum(f.get_width() * f.get_height() * f.get_bytesize() for f in self.frames if f is not None)
+
+
+DISCS = {}  # (radius, color) -> pre-rendered filled circle
+
+
+def disc(radius, color):
+    # Filled circle sprite equivalent to pygame.draw.circle(..., center, radius), blit at center - radius
+    key = (radius, tuple(color))
+    surface = DISCS.get(key)
+    if surface is None:
+        surface = DISCS[key] = pygame.Surface((2 * radius, 2 * radius), pygame.SRCALPHA)
+        pygame.draw.circle(surface, color, (radius, radius), radius)
+    return surface
+
+
+BARS = {}  # (width, height, color) -> solid rectangle
+
+
+def bar(width, height, color):
+    # Solid rectangle sprite equivalent to pygame.draw.rect(..., (x, y, width, height)), e.g. health bars
+    key = (width, height, tuple(color))
+    surface = BARS.get(key)
+    if surface is None:
+        surface = BARS[key] = pygame.Surface((width, height))
+        surface.fill(color)
+    return surface
+
+
+def tint_multiply(color):
+    # Tint that multiplies every pixel by color (RGBA), e.g. the red enrage wash
+    def apply(surface):
+        surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+    return apply
+
+
+TINTS = {
+    'enraged': tint_multiply((255, 0, 0, 128)),
+}
+
+
+def register_tint(name, apply):
+    # New enemy states (hit-flash, frozen, ...) add a tint here and ask for it by name
+    TINTS[name] = apply
+
+
+class SpriteVariants:
+    # Base sprites by name plus every (facing, tint, size) variant derived from them, each built once
+    def __init__(self):
+        self.loaders = {}
+        self.variants = {}
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+        self.invalidate(name)
+
+    def invalidate(self, name):
+        for key in [k for k in self.variants if k[0] == name]:
+            del self.variants[key]
+
+    def get(self, name, flip=False, tint=None, size=None):
+        key = (name, flip, tint, size)
+        sprite = self.variants.get(key)
+        if sprite is None:
+            sprite = self.variants[key] = self._build(name, flip, tint, size)
+        return sprite
+
+    def prewarm(self, name, tints=(None,), size=None):
+        # Build both facings for each tint up front so the first sighting doesn't hitch
+        for tint in tints:
+            for flip in (False, True):
+                self.get(name, flip, tint, size)
+
+    def _build(self, name, flip, tint, size):
+        sprite = self.loaders[name]()
+        if size is not None and size != sprite.get_size():
+            sprite = pygame.transform.scale(sprite, size)
+        if flip:
+            sprite = pygame.transform.flip(sprite, True, False)
+        if tint is not None:
+            sprite = sprite.copy()
+            TINTS[tint](sprite)
+        return sprite
+
+    def memory_bytes(self):
+        return sum(s.get_width() * s.get_height() * s.get_bytesize() for s in self.variants.values())
+
+
+sprite_variants = SpriteVariants()  # Shared registry; enemy.py registers the boar sprites
@@ -0,0 +1,17 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from enemy import Drop
+from server import CoopSimulation
+
+
+def test_overlapping_players_take_a_drop_once():
+    # Both players' pickup passes see the drop in the same tick's grid; only the first gets it
+    sim = CoopSimulation(seed=1, enemy_amount=0)
+    first = sim.add_player(1, 500, 500)
+    second = sim.add_player(2, 505, 505)
+    sim.drops.append(Drop(515, 515))
+    sim.step({})
+    assert sim.drops == []
+    assert first.weapon_level + second.weapon_level == 3
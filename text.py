@@ -0,0 +1,61 @@
+from collections import OrderedDict
+import pygame
+
+MAX_CACHED_SURFACES = 256  # Damage numbers, HUD counters and banners fit comfortably
+
+
+class TextCache:
+    # One Font per size, rendered text surfaces kept in an LRU keyed by (text, size, color)
+    def __init__(self, max_entries=MAX_CACHED_SURFACES):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+
+    def render(self, text, size, color, antialias=True):
+        # Returned surfaces are shared, so callers must not draw on them
+        key = (text, size, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.font(size).render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'cached_surfaces': len(self.surfaces),
+            'fonts': len(self.fonts),
+        }
+
+
+text_cache = TextCache()  # Shared by DamageText and the HUD
@@ -0,0 +1,56 @@
+# Fixed-timestep driver for game_loop: whole ticks of 1 / tick_rate seconds, frames drawn in between
+import time
+
+MAX_CATCH_UP = 5  # Ticks run for one rendered frame before the simulation is allowed to slow down
+MAX_FRAME_TIME = 0.25  # Seconds; a longer gap (window dragged, tab hidden, debugger) is dropped, not caught up
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate, max_catch_up=MAX_CATCH_UP, clock=time.perf_counter):
+        self.dt = 1 / tick_rate
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.last = None
+        self.accumulator = 0.0  # Real time not yet simulated, always under one tick after advance()
+        self.frames = 0
+        self.ticks = 0
+        self.skipped_frames = 0  # Ticks that didn't get a rendered frame of their own
+        self.lag = 0.0  # Seconds of real time the simulation never caught up on
+        self.lagged_frames = 0  # Frames that hit max_catch_up or MAX_FRAME_TIME
+
+    def advance(self):
+        # Call once per frame; returns how many ticks to simulate before drawing it
+        now = self.clock()
+        if self.last is None:
+            self.last = now - self.dt  # The first frame runs one tick
+        elapsed = now - self.last
+        self.last = now
+        dropped = max(elapsed - MAX_FRAME_TIME, 0.0)
+        self.accumulator += elapsed - dropped
+        ticks = int(self.accumulator / self.dt)
+        if ticks > self.max_catch_up:
+            dropped += (ticks - self.max_catch_up) * self.dt
+            self.accumulator -= (ticks - self.max_catch_up) * self.dt
+            ticks = self.max_catch_up
+        if dropped:
+            self.lag += dropped
+            self.lagged_frames += 1
+        self.accumulator -= ticks * self.dt
+        self.frames += 1
+        self.ticks += ticks
+        self.skipped_frames += max(ticks - 1, 0)
+        return ticks
+
+    @property
+    def alpha(self):
+        # Where this frame falls between the last tick (0) and the next (1), for render interpolation
+        return min(self.accumulator / self.dt, 1.0)
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'ticks': self.ticks,
+            'skipped_frames': self.skipped_frames,
+            'lag_ms': self.lag * 1000,
+            'lagged_frames': self.lagged_frames,
+        }
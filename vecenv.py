@@ -0,0 +1,232 @@
+# Batched, headless game instances for agent training, Gym-style: VecEnv(16, seed=0, workers=4), then
+# reset() and step(actions) -> obs, rewards, terminated, truncated, info
+import os
+import math
+import multiprocessing
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Simulations never open a window
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+
+from boars import NO_PARENT
+from simulation import Simulation, FrameInput, TICK_RATE
+
+MAX_ENEMIES = 8  # Nearest boars (mothers and babies) in each observation
+MAX_BULLETS = 64  # Nearest enemy and child bullets in each observation
+MAX_TICKS = 60 * TICK_RATE  # Episodes are truncated after a simulated minute
+EXP_REWARD = 0.01  # 100 exp per kill -> +1
+DAMAGE_PENALTY = 1.0  # Per point of health lost
+AIM_DISTANCE = 100  # Aim point is this far from the player along the action's aim angle
+
+# Action columns: move_x and move_y in {-1, 0, 1}, fire and shield as 0/1, aim angle in radians
+ACTION_SIZE = 5
+# Observation columns
+PLAYER_FEATURES = 6  # x, y, health, weapon_level, shield_active, spam_timer
+ENEMY_FEATURES = 5  # dx, dy, health, is_baby, present
+BULLET_FEATURES = 6  # dx, dy, vx, vy, damage, present
+
+
+class GameEnv:
+    # One Simulation behind reset()/step(); positions in observations are relative to the player
+    def __init__(self, seed=None, max_ticks=MAX_TICKS, enemy_amount=None):
+        self.seed = seed
+        self.episode = 0
+        self.max_ticks = max_ticks
+        self.enemy_amount = enemy_amount
+        self.sim = None
+
+    def reset(self):
+        # Each episode gets its own seed so a batch doesn't replay the same game
+        seed = None if self.seed is None else self.seed * 100003 + self.episode
+        self.episode += 1
+        if self.enemy_amount is None:
+            self.sim = Simulation(seed=seed)
+        else:
+            self.sim = Simulation(seed=seed, enemy_amount=self.enemy_amount)
+        return self.observe()
+
+    def frame_input(self, action):
+        move_x, move_y, fire, shield, aim = action
+        cx, cy = self.sim.player.get_center()
+        return FrameInput(up=move_y < 0, down=move_y > 0, left=move_x < 0, right=move_x > 0,
+                          fire=fire > 0.5, shield=shield > 0.5,
+                          aim=(cx + math.cos(aim) * AIM_DISTANCE, cy + math.sin(aim) * AIM_DISTANCE))
+
+    def step(self, action):
+        sim = self.sim
+        exp = sim.exp
+        damage = sim.damage_taken
+        sim.step(self.frame_input(action))
+        reward = (sim.exp - exp) * EXP_REWARD - (sim.damage_taken - damage) * DAMAGE_PENALTY
+        terminated = sim.over
+        truncated = not terminated and sim.tick >= self.max_ticks
+        return self.observe(), reward, terminated, truncated
+
+    def observe(self):
+        sim = self.sim
+        player = sim.player
+        cx, cy = player.get_center()
+        player_obs = np.array([player.x, player.y, player.health, player.weapon_level, player.shield_active, sim.spam_timer],
+                              dtype=np.float32)
+
+        enemy_obs = np.zeros((MAX_ENEMIES, ENEMY_FEATURES), dtype=np.float32)
+        boars = sim.boars
+        live = np.flatnonzero(boars.alive[:boars.count])
+        half = boars.size[live] / 2
+        near = np.stack([boars.x[live] + half - cx, boars.y[live] + half - cy, boars.health[live],
+                         boars.parent[live] != NO_PARENT], 1)
+        if len(near) > MAX_ENEMIES:
+            near = near[np.argpartition(near[:, 0] ** 2 + near[:, 1] ** 2, MAX_ENEMIES)[:MAX_ENEMIES]]
+        if len(near):
+            near = near[np.argsort(near[:, 0] ** 2 + near[:, 1] ** 2, kind='stable')]
+            enemy_obs[:len(near), :4] = near
+            enemy_obs[:len(near), 4] = 1
+
+        bullet_obs = np.zeros((MAX_BULLETS, BULLET_FEATURES), dtype=np.float32)
+        columns = []
+        for store in (sim.enemy_bullets, sim.child_bullets):
+            live = np.flatnonzero(store.alive[:store.count])
+            columns.append(np.stack([store.x[live] - cx, store.y[live] - cy, store.vx[live], store.vy[live], store.damage[live]], 1))
+        near = np.concatenate(columns)
+        if len(near) > MAX_BULLETS:
+            near = near[np.argpartition(near[:, 0] ** 2 + near[:, 1] ** 2, MAX_BULLETS)[:MAX_BULLETS]]
+        if len(near):
+            near = near[np.argsort(near[:, 0] ** 2 + near[:, 1] ** 2, kind='stable')]
+            bullet_obs[:len(near), :5] = near
+            bullet_obs[:len(near), 5] = 1
+
+        return {'player': player_obs, 'enemies': enemy_obs, 'bullets': bullet_obs}
+
+    def stats(self):
+        sim = self.sim
+        return sim.exp, sim.damage_taken, sim.tick
+
+
+def stack(observations):
+    return {key: np.stack([obs[key] for obs in observations]) for key in observations[0]}
+
+
+def concat(batches):
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+class EnvBatch:
+    # A list of GameEnvs stepped together, auto-resetting finished episodes.
+    # Used in-process by VecEnv(workers=0) and inside each worker process otherwise
+    def __init__(self, seeds, max_ticks=MAX_TICKS, enemy_amount=None):
+        self.envs = [GameEnv(seed, max_ticks, enemy_amount) for seed in seeds]
+
+    def reset(self):
+        return stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        n = len(self.envs)
+        observations = []
+        rewards = np.zeros(n, dtype=np.float32)
+        terminated = np.zeros(n, dtype=bool)
+        truncated = np.zeros(n, dtype=bool)
+        # Episode totals at the end of this step, taken before any auto-reset
+        exp = np.zeros(n, dtype=np.int64)
+        damage = np.zeros(n, dtype=np.int64)
+        ticks = np.zeros(n, dtype=np.int64)
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            obs, rewards[i], terminated[i], truncated[i] = env.step(action)
+            exp[i], damage[i], ticks[i] = env.stats()
+            if terminated[i] or truncated[i]:
+                obs = env.reset()  # The returned observation starts the next episode
+            observations.append(obs)
+        info = {'exp': exp, 'damage_taken': damage, 'episode_ticks': ticks}
+        return stack(observations), rewards, terminated, truncated, info
+
+
+def _worker(conn, seeds, max_ticks, enemy_amount):
+    batch = EnvBatch(seeds, max_ticks, enemy_amount)
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'step':
+                conn.send(batch.step(data))
+            elif command == 'reset':
+                conn.send(batch.reset())
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        conn.close()
+
+
+class VecEnv:
+    # num_envs independent games split across `workers` processes (0 runs them in this process)
+    def __init__(self, num_envs, seed=0, workers=None, max_ticks=MAX_TICKS, enemy_amount=None, start_method=None):
+        self.num_envs = num_envs
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, num_envs)
+        seeds = [None if seed is None else seed + i for i in range(num_envs)]
+        self.local = None
+        self.conns = []
+        self.processes = []
+        if workers == 0:
+            self.local = EnvBatch(seeds, max_ticks, enemy_amount)
+            self.splits = [num_envs]
+            return
+        chunks = np.array_split(np.arange(num_envs), workers)
+        self.splits = [len(chunk) for chunk in chunks]
+        context = multiprocessing.get_context(start_method)
+        for chunk in chunks:
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, [seeds[i] for i in chunk], max_ticks, enemy_amount),
+                                      daemon=True)
+            process.start()
+            child.close()
+            self.conns.append(parent)
+            self.processes.append(process)
+
+    def reset(self):
+        if self.local is not None:
+            return self.local.reset()
+        for conn in self.conns:
+            conn.send(('reset', None))
+        return concat([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        # actions: (num_envs, ACTION_SIZE) array
+        actions = np.asarray(actions, dtype=np.float64).reshape(self.num_envs, ACTION_SIZE)
+        if self.local is not None:
+            return self.local.step(actions)
+        start = 0
+        for conn, size in zip(self.conns, self.splits):
+            conn.send(('step', actions[start:start + size]))
+            start += size
+        results = [conn.recv() for conn in self.conns]
+        obs = concat([r[0] for r in results])
+        rewards, terminated, truncated = (np.concatenate([r[k] for r in results]) for k in (1, 2, 3))
+        info = concat([r[4] for r in results])
+        return obs, rewards, terminated, truncated, info
+
+    def sample_actions(self, rng):
+        # Uniformly random actions, e.g. for smoke tests and the throughput benchmark
+        actions = np.empty((self.num_envs, ACTION_SIZE))
+        actions[:, :2] = rng.integers(-1, 2, size=(self.num_envs, 2))
+        actions[:, 2:4] = rng.integers(0, 2, size=(self.num_envs, 2))
+        actions[:, 4] = rng.uniform(-math.pi, math.pi, self.num_envs)
+        return actions
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(('close', None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        self.conns = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
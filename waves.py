@@ -0,0 +1,61 @@
+# Enemy waves streamed into the BoarStore over time: a wave's boars queue up when it starts and only
+# a few are placed per tick, so a wave of thousands never lands in one frame.
+from enemy import Enemy, BabyBoar
+from boars import MOTHER_HEALTH
+
+SPAWN_PER_TICK = 32  # Queued boars placed per tick; a mother arrives together with her babies
+SPAWN_MARGIN = 50  # Keep new boars this far inside the world edges
+MOTHER_CHANCE = 0.9
+BABIES = (1, 3)  # A mother has this many babies (inclusive)
+
+
+def add_family(store, enemy, babies=0):
+    # Add a detached Enemy; with babies it becomes a mother at MOTHER_HEALTH with that many babies orbiting it
+    if babies:
+        enemy.is_mother = True
+        enemy.initial_babies = babies
+        enemy.health = MOTHER_HEALTH
+    store.add(enemy)
+    for _ in range(babies):
+        store.add(BabyBoar(enemy))
+    return enemy
+
+
+def spawn_random(store, world_width, world_height, rng, now):
+    # Anywhere in the world; most boars come as mothers
+    x = rng.randint(SPAWN_MARGIN, world_width - SPAWN_MARGIN)
+    y = rng.randint(SPAWN_MARGIN, world_height - SPAWN_MARGIN)
+    enemy = Enemy(x, y, rng, now)
+    babies = rng.randint(*BABIES) if rng.random() < MOTHER_CHANCE else 0
+    return add_family(store, enemy, babies)
+
+
+class WaveScheduler:
+    # waves are (start_tick, count) pairs, count being boars as spawn_random makes them (mothers with
+    # their babies, or lone boars); at most spawn_per_tick queued ones are placed per tick
+    def __init__(self, waves, spawn_per_tick=SPAWN_PER_TICK):
+        self.waves = sorted(waves)
+        self.next_wave = 0
+        self.pending = 0
+        self.spawn_per_tick = spawn_per_tick
+        self.spawned = 0
+
+    @property
+    def done(self):
+        return self.next_wave == len(self.waves) and self.pending == 0
+
+    def update(self, sim):
+        # Queue every wave that has started by sim.tick, then place the next batch; returns how many
+        waves = self.waves
+        while self.next_wave < len(waves) and waves[self.next_wave][0] <= sim.tick:
+            self.pending += waves[self.next_wave][1]
+            self.next_wave += 1
+        batch = min(self.pending, self.spawn_per_tick)
+        for _ in range(batch):
+            spawn_random(sim.boars, sim.world_width, sim.world_height, sim.rng, sim.time)
+        self.pending -= batch
+        self.spawned += batch
+        return batch
+
+    def stats(self):
+        return {'waves_started': self.next_wave, 'waves': len(self.waves), 'pending': self.pending, 'spawned': self.spawned}
@@ -0,0 +1,130 @@
+# The world background as fixed-size chunks built on demand around the camera, so memory depends on
+# the view and a byte budget rather than on WORLD_WIDTH x WORLD_HEIGHT.
+from collections import OrderedDict
+
+import pygame
+
+CHUNK_SIZE = 512  # World pixels per chunk side
+CHUNK_BUDGET_BYTES = 48 * 1024 * 1024  # About 48 full chunks; a 1440x800 view touches at most 12
+PREFETCH_PER_FRAME = 1  # Chunks built ahead of the camera per frame, to spread the cost
+LOOKAHEAD_FRAMES = 30  # How far ahead of the camera's motion to prefetch
+WAKE_CHUNKS = 2  # Enemies further than this many chunks from the player sleep (see Simulation)
+
+
+def chunk_of(x, y, chunk_size=CHUNK_SIZE):
+    return int(x // chunk_size), int(y // chunk_size)
+
+
+def tiled(tile):
+    # Chunk generator repeating one tile across the world, e.g. the existing background art
+    tile_width, tile_height = tile.get_size()
+
+    def generate(surface, x0, y0):
+        for ty in range(y0 - y0 % tile_height, y0 + surface.get_height(), tile_height):
+            for tx in range(x0 - x0 % tile_width, x0 + surface.get_width(), tile_width):
+                surface.blit(tile, (tx - x0, ty - y0))
+    return generate
+
+
+class ChunkedBackground:
+    # Drop-in for a world-sized background Surface in Renderer. generate(surface, x0, y0) paints the
+    # chunk whose top-left is world (x0, y0); hand-made maps can load a file there instead
+    def __init__(self, world_width, world_height, generate, chunk_size=CHUNK_SIZE, budget_bytes=CHUNK_BUDGET_BYTES):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.chunk_size = chunk_size
+        self.cols = -(-world_width // chunk_size)
+        self.rows = -(-world_height // chunk_size)
+        self.budget_bytes = budget_bytes
+        self.generate = generate
+        self.chunks = OrderedDict()  # (cx, cy) -> Surface, least recently used first
+        self.bytes = 0
+        self.pinned = set()  # Chunks the current view needs; never evicted
+        self.last_view = None
+        self.built = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def reset(self, generate=None):
+        # Drop every chunk, e.g. when the tile art finishes loading
+        if generate is not None:
+            self.generate = generate
+        self.chunks.clear()
+        self.bytes = 0
+
+    def chunks_in(self, rect):
+        x0, y0 = chunk_of(max(rect.left, 0), max(rect.top, 0), self.chunk_size)
+        x1, y1 = chunk_of(min(rect.right, self.world_width) - 1, min(rect.bottom, self.world_height) - 1, self.chunk_size)
+        return [(cx, cy) for cy in range(max(y0, 0), min(y1, self.rows - 1) + 1)
+                for cx in range(max(x0, 0), min(x1, self.cols - 1) + 1)]
+
+    def get(self, cx, cy):
+        key = (cx, cy)
+        surface = self.chunks.get(key)
+        if surface is None:
+            surface = self._build(cx, cy)
+        else:
+            self.chunks.move_to_end(key)
+        return surface
+
+    def _build(self, cx, cy):
+        x0 = cx * self.chunk_size
+        y0 = cy * self.chunk_size
+        size = (min(self.chunk_size, self.world_width - x0), min(self.chunk_size, self.world_height - y0))
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.generate(surface, x0, y0)
+        self.chunks[(cx, cy)] = surface
+        self.bytes += size[0] * size[1] * surface.get_bytesize()
+        self.built += 1
+        self._evict()
+        return surface
+
+    def _evict(self):
+        for key in list(self.chunks):
+            if self.bytes <= self.budget_bytes:
+                break
+            if key in self.pinned:
+                continue
+            surface = self.chunks.pop(key)
+            self.bytes -= surface.get_width() * surface.get_height() * surface.get_bytesize()
+            self.evictions += 1
+
+    def update(self, view):
+        # Called once per frame with the camera's world rect: pins what is visible and prefetches
+        # along the direction the camera is moving
+        self.pinned = set(self.chunks_in(view))
+        if self.last_view is not None:
+            dx = view.x - self.last_view[0]
+            dy = view.y - self.last_view[1]
+            if dx or dy:
+                ahead = view.move(dx * LOOKAHEAD_FRAMES, dy * LOOKAHEAD_FRAMES).union(view)
+                budget = PREFETCH_PER_FRAME
+                for key in self.chunks_in(ahead):
+                    if budget == 0:
+                        break
+                    if key not in self.chunks:
+                        self._build(*key)
+                        self.prefetched += 1
+                        budget -= 1
+        self.last_view = view.topleft
+
+    def blit_area(self, screen, dest, area):
+        # Same contract as screen.blit(world_surface, dest, area)
+        area = pygame.Rect(area)
+        size = self.chunk_size
+        for cx, cy in self.chunks_in(area):
+            chunk_rect = pygame.Rect(cx * size, cy * size, size, size)
+            part = area.clip(chunk_rect)
+            screen.blit(self.get(cx, cy), (dest[0] + part.x - area.x, dest[1] + part.y - area.y),
+                        part.move(-chunk_rect.x, -chunk_rect.y))
+
+    def stats(self):
+        return {
+            'chunks': len(self.chunks),
+            'bytes': self.bytes,
+            'built': self.built,
+            'prefetched': self.prefetched,
+            'evictions': self.evictions,
+        }